@@ -4,8 +4,17 @@ Compares our brain's BM25 approach against HNSW-style vector search
 on a synthetic corpus matching our brain's scale (~64-200 documents).
 
 Tests: latency, build time, memory overhead, and retrieval quality.
+
+With --scale, also runs a NumPy-vectorized HNSW (heap-based layer search,
+heuristic neighbour selection, M0 = 2M) against brain.py's real BM25 path
+and its brute-force embedding stage at N = 100 / 1k / 10k / 100k synthetic
+entries. HNSW's ef is raised until it returns 90% of the exact top-10, and
+its latency only counts toward the crossover at that recall.
+
+Usage: python benchmarks/bm25_vs_hnsw.py [--scale [n,n,...]]
 """
 
+import heapq
 import time
 import math
 import random
@@ -13,6 +22,7 @@ import statistics
 import sys
 from collections import Counter
 from dataclasses import dataclass, field
+from pathlib import Path
 
 # ─── Corpus: synthetic brain-like documents ────────────────────────────
 
@@ -247,6 +257,261 @@ class HNSWIndex:
         return [(idx, 1.0 - dist) for dist, idx in results[:k]]
 
 
+# ─── Vectorized HNSW (NumPy) ──────────────────────────────────────────
+
+class VectorHNSWIndex:
+    """HNSW over a contiguous float32 matrix of unit vectors.
+
+    Same graph as HNSWIndex, minus its Python-level costs: every expansion
+    scores all unvisited neighbours with one matrix-vector product and the
+    candidate/result sets are heaps. Neighbours are chosen with the paper's
+    heuristic (Algorithm 4) on insertion and when pruning, each node keeps
+    up to M links per upper layer and M0 = 2M on layer 0.
+    """
+
+    def __init__(self, dims: int, M: int = 16, ef_construction: int = 100, ef_search: int = 64, seed: int = 42):
+        import numpy as np
+
+        self.np = np
+        self.M = M
+        self.M0 = 2 * M  # layer 0 holds twice the links, as in the paper
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.level_mult = 1.0 / math.log(M)
+        self.rng = random.Random(seed)
+        self.vectors = np.zeros((1024, dims), dtype=np.float32)
+        self.links: list[list[list[int]]] = []  # node -> level -> neighbour ids
+        self.entry_point = -1
+        self.max_level = -1
+
+    def _dists(self, query, ids: list[int]):
+        return 1.0 - self.vectors[ids] @ query
+
+    def _search_layer(self, query, entries: list[tuple[float, int]], ef: int, level: int) -> list[tuple[float, int]]:
+        visited = {i for _, i in entries}
+        candidates = list(entries)  # min-heap by distance
+        heapq.heapify(candidates)
+        results = [(-d, i) for d, i in entries]  # max-heap (negated) of the best ef
+        heapq.heapify(results)
+        while candidates:
+            dist, node = heapq.heappop(candidates)
+            if dist > -results[0][0] and len(results) >= ef:
+                break
+            fresh = [n for n in self.links[node][level] if n not in visited]
+            if not fresh:
+                continue
+            visited.update(fresh)
+            for d, n in zip(self._dists(query, fresh).tolist(), fresh):
+                if len(results) < ef or d < -results[0][0]:
+                    heapq.heappush(candidates, (d, n))
+                    heapq.heappush(results, (-d, n))
+                    if len(results) > ef:
+                        heapq.heappop(results)
+        return sorted((-d, i) for d, i in results)
+
+    def _select(self, candidates: list[tuple[float, int]], cap: int) -> list[int]:
+        """Heuristic neighbour selection over (distance, id) sorted by distance.
+
+        A candidate is kept only if it is closer to the base node than to
+        every neighbour kept so far, so links spread across directions
+        instead of piling into one cluster.
+        """
+        if len(candidates) <= cap:
+            return [i for _, i in candidates]
+        ids = [i for _, i in candidates]
+        pairwise = 1.0 - self.vectors[ids] @ self.vectors[ids].T
+        kept: list[int] = []  # positions in `candidates`
+        for j, (dist, _) in enumerate(candidates):
+            if not kept or pairwise[j, kept].min() > dist:
+                kept.append(j)
+                if len(kept) == cap:
+                    break
+        return [ids[j] for j in kept]
+
+    def _prune(self, node: int, level: int):
+        cap = self.M0 if level == 0 else self.M
+        neighbours = self.links[node][level]
+        if len(neighbours) > cap:
+            dists = self._dists(self.vectors[node], neighbours).tolist()
+            self.links[node][level] = self._select(sorted(zip(dists, neighbours)), cap)
+
+    def add(self, vector):
+        np = self.np
+        node = len(self.links)
+        if node == len(self.vectors):
+            self.vectors = np.concatenate([self.vectors, np.zeros_like(self.vectors)])
+        self.vectors[node] = vector
+        level = int(-math.log(1.0 - self.rng.random()) * self.level_mult)
+        self.links.append([[] for _ in range(level + 1)])
+        if self.entry_point == -1:
+            self.entry_point, self.max_level = node, level
+            return
+
+        ep = [(float(self._dists(vector, [self.entry_point])[0]), self.entry_point)]
+        for lev in range(self.max_level, level, -1):
+            ep = self._search_layer(vector, ep, 1, lev)[:1]
+        for lev in range(min(level, self.max_level), -1, -1):
+            found = self._search_layer(vector, ep, self.ef_construction, lev)
+            neighbours = self._select(found, self.M)
+            self.links[node][lev] = neighbours
+            for n in neighbours:
+                self.links[n][lev].append(node)
+                self._prune(n, lev)
+            ep = found
+        if level > self.max_level:
+            self.entry_point, self.max_level = node, level
+
+    def build(self, matrix):
+        for vector in matrix:
+            self.add(vector)
+        self.vectors = self.vectors[:len(self.links)]
+        return self
+
+    def search(self, query, k: int = 10) -> list[tuple[int, float]]:
+        if self.entry_point == -1:
+            return []
+        ep = [(float(self._dists(query, [self.entry_point])[0]), self.entry_point)]
+        for lev in range(self.max_level, 0, -1):
+            ep = self._search_layer(query, ep, 1, lev)[:1]
+        found = self._search_layer(query, ep, max(k, self.ef_search), 0)
+        return [(i, 1.0 - d) for d, i in found[:k]]
+
+    def memory_bytes(self) -> int:
+        edges = sum(len(level) for node in self.links for level in node)
+        return self.vectors.nbytes + edges * 4  # int32 adjacency lists
+
+
+# ─── Scaling comparison against brain.py ──────────────────────────────
+
+SCALE_SIZES = [100, 1_000, 10_000, 100_000]
+SCALE_QUERIES = 50
+SCALE_TOPICS = 200
+SCALE_EF_SEARCH = (16, 32, 64, 128, 256, 512, 1024, 2048)  # swept in order
+SCALE_MIN_RECALL = 0.9  # HNSW latency only counts at this ANN recall vs brute force
+
+
+def make_scaled_entries(n: int, seed: int = 42) -> tuple[list[dict], list[tuple[str, str]]]:
+    """Synthetic fat-index entries with topical structure, plus (query, target id) pairs.
+
+    Each entry draws most words from one of SCALE_TOPICS topic vocabularies
+    and the rest from a shared background, so lexical and vector rankers
+    have real structure to find. Queries are 4 words sampled from a target.
+    """
+    rng = random.Random(seed)
+    background = [f"w{i}" for i in range(2_000)]
+    topics = [[f"t{t}x{i}" for i in range(40)] for t in range(SCALE_TOPICS)]
+    entries = []
+    for i in range(n):
+        topic = topics[rng.randrange(SCALE_TOPICS)]
+        words = rng.sample(topic, 12) + rng.sample(background, 18)
+        tags = ",".join(words[:4])
+        entries.append({
+            "id": f"LEARN-{i + 1:06d}", "type": "LEARN", "tags": tags, "links": "",
+            "summary": " ".join(rng.sample(words, len(words))), "file": f"knowledge/LEARN-{i + 1:06d}",
+        })
+    queries = []
+    for _ in range(SCALE_QUERIES):
+        target = entries[rng.randrange(n)]
+        queries.append((" ".join(rng.sample(target["summary"].split(), 4)), target["id"]))
+    return entries, queries
+
+
+def _p50_us(fn, queries, repeat: int = 1) -> tuple[float, list]:
+    times, out = [], []
+    for q in queries:
+        for _ in range(repeat):
+            t0 = time.perf_counter_ns()
+            res = fn(q)
+            times.append(time.perf_counter_ns() - t0)
+        out.append(res)
+    return statistics.median(times) / 1e3, out
+
+
+def run_scaling(sizes: list[int] | None = None):
+    import numpy as np
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "project-brain"))
+    import brain
+
+    sizes = sizes or SCALE_SIZES
+    k = 10
+    print("=" * 96)
+    print("Scaling: brain.py BM25 vs brute-force embeddings vs vectorized HNSW")
+    print(f"{SCALE_QUERIES} queries per size, top-{k}, {brain.EMBED_DIMS}-dim hashed embeddings (brain.embed_text)")
+    print("=" * 96)
+    print(f"{'N':>8} {'Stage':<22} {'Build':>10} {'p50 query':>11} {'Memory':>10} {'Hit@10':>7} {'ANN recall':>11}")
+    print("-" * 96)
+    rows = []
+    for n in sizes:
+        entries, queries = make_scaled_entries(n)
+        targets = {e["id"]: i for i, e in enumerate(entries)}
+
+        t0 = time.perf_counter()
+        bm25 = brain.build_bm25_index(entries)
+        bm25_build = time.perf_counter() - t0
+        bm25_us, bm25_res = _p50_us(
+            lambda q: [e["id"] for _, e in brain.score_entries_bm25(entries, q.split(), bm25)[:k]],
+            [q for q, _ in queries],
+        )
+
+        t0 = time.perf_counter()
+        matrix = np.stack([brain.embed_text(brain._entry_embed_text(e)) for e in entries])
+        embed_build = time.perf_counter() - t0
+        qvecs = [brain.embed_text(q) for q, _ in queries]
+
+        def brute(qv):
+            sims = matrix @ qv
+            top = np.argpartition(-sims, min(k, n) - 1)[:k]
+            return top[np.argsort(-sims[top])].tolist()
+
+        brute_us, brute_res = _p50_us(brute, qvecs, repeat=3)
+
+        t0 = time.perf_counter()
+        hnsw = VectorHNSWIndex(brain.EMBED_DIMS).build(matrix)
+        hnsw_build = time.perf_counter() - t0
+
+        def hit(results, as_ids):
+            return sum((t if as_ids else targets[t]) in r for r, (_, t) in zip(results, queries)) / len(queries)
+
+        postings_bytes = sum(len(doc) for doc in bm25.doc_freqs) * 8  # ~8 B per posting
+        stages = [
+            ("BM25 (score_entries)", bm25_build, bm25_us, postings_bytes, hit(bm25_res, True), None),
+            ("brute-force vectors", embed_build, brute_us, matrix.nbytes, hit(brute_res, False), 1.0),
+        ]
+        # Raise ef until HNSW returns SCALE_MIN_RECALL of the exact top-k
+        hnsw_at = None  # (p50, ef, recall) at the first ef reaching it
+        for ef in SCALE_EF_SEARCH:
+            hnsw.ef_search = ef
+            hnsw_us, hnsw_res = _p50_us(lambda qv: [i for i, _ in hnsw.search(qv, k)], qvecs, repeat=3)
+            ann_recall = statistics.mean(len(set(h) & set(b)) / len(b) for h, b in zip(hnsw_res, brute_res) if b)
+            stages.append((f"HNSW ef={ef}", embed_build + hnsw_build, hnsw_us, hnsw.memory_bytes(),
+                           hit(hnsw_res, False), ann_recall))
+            if ann_recall >= SCALE_MIN_RECALL or ef >= n:
+                hnsw_at = (hnsw_us, ef, ann_recall)
+                break
+        for stage, build, p50, mem, hit_rate, recall in stages:
+            recall_label = f"{recall:>11.0%}" if recall is not None else f"{'-':>11}"
+            print(f"{n:>8,} {stage:<22} {build * 1e3:>8.0f}ms {p50:>9.0f}us "
+                  f"{mem / 1024:>8,.0f}KB {hit_rate:>7.0%} {recall_label}")
+        rows.append((n, bm25_us, brute_us, hnsw_at or (hnsw_us, ef, ann_recall)))
+        print("-" * 96)
+
+    print(f"\nQuery latency crossover (p50; recall = share of the exact top-{k}; "
+          f"HNSW at the lowest ef reaching {SCALE_MIN_RECALL:.0%}):")
+    for n, bm25_us, brute_us, (hnsw_us, ef, recall) in rows:
+        contenders = [(bm25_us, "BM25"), (brute_us, "brute-force")]
+        if recall >= SCALE_MIN_RECALL:
+            contenders.append((hnsw_us, "HNSW"))
+            note = ""
+        else:
+            note = f"  (below {SCALE_MIN_RECALL:.0%} recall: not counted)"
+        print(f"  N={n:>7,}: BM25 {bm25_us:>9.0f}us  brute {brute_us:>8.0f}us (100%)  "
+              f"HNSW {hnsw_us:>7.0f}us ({recall:.0%}, ef={ef})  → {min(contenders)[1]}{note}")
+    print(f"No HNSW crossover is claimed below {SCALE_MIN_RECALL:.0%} recall: a faster but lossier "
+          "index is not answering the same query.")
+    print("=" * 96)
+
+
 # ─── Benchmark runner ─────────────────────────────────────────────────
 
 def run_benchmark():
@@ -367,6 +632,8 @@ def run_benchmark():
     print(f"  expensive vector distance computations at each hop.")
     print(f"At N=10000: log2(10000)={math.log2(10000):.1f} hops vs 10000 BM25 score computations.")
     print(f"  HNSW wins at scale. BM25 wins at brain-scale (<200 docs).")
+    print("  (Projection only: the HNSWIndex above is pure Python — run with --scale")
+    print("   for measured crossover against a vectorized HNSW and brain.py's BM25.)")
 
     print("\n" + "=" * 70)
     print("VERDICT: At brain-scale (20-200 docs), BM25 is faster AND more precise.")
@@ -376,4 +643,8 @@ def run_benchmark():
 
 
 if __name__ == "__main__":
-    run_benchmark()
+    if "--scale" in sys.argv:
+        rest = sys.argv[sys.argv.index("--scale") + 1:]
+        run_scaling([int(n) for n in rest[0].split(",")] if rest else None)
+    else:
+        run_benchmark()
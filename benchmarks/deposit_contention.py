@@ -0,0 +1,120 @@
+"""
+Benchmark: parallel `brain deposit` contention
+Launches N concurrent `brain.py deposit` processes against one fresh brain
+and checks that INDEX-MASTER and .content-hashes.json end up consistent:
+every created file has exactly one index entry and one manifest record,
+no ID is handed out twice, and both files still parse (no torn writes).
+
+POSIX only: deposit opens $EDITOR, which is set to `true` here.
+
+Usage: python benchmarks/deposit_contention.py [n_processes] [rounds]
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BRAIN_PY = Path(__file__).resolve().parent.parent / "project-brain" / "brain.py"
+sys.path.insert(0, str(BRAIN_PY.parent))
+import brain  # noqa: E402
+
+
+def deposit(workdir: Path, title: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ, EDITOR="true", VISUAL="true")
+    return subprocess.run(
+        [sys.executable, str(BRAIN_PY), "deposit", "--type", "LEARN", "--tags", "bench,contention"],
+        input=f"{title}\n", capture_output=True, text=True, cwd=workdir, env=env,
+    )
+
+
+def check_consistency(brain_root: Path) -> dict:
+    files = sorted((brain_root / "knowledge").glob("LEARN-*.md"))
+    master_text = (brain_root / brain.INDEX_MASTER).read_text(encoding="utf-8")
+    entries = brain.parse_index_entries(master_text)
+    manifest = json.loads((brain_root / brain.HASH_MANIFEST).read_text(encoding="utf-8"))
+    file_ids = Counter(f.stem.split("_")[0] for f in files)
+    entry_ids = Counter(e["id"] for e in entries)
+    total = int(brain.re.search(r"<!-- total-files: (\d+) -->", master_text).group(1))
+    return {
+        "files": len(files),
+        "index_entries": len(entries),
+        "manifest_records": sum(1 for rel in manifest if rel.startswith("knowledge/LEARN-")),
+        "total_files_header": total,
+        "missing_manifest": [f.name for f in files if f"knowledge/{f.name}" not in manifest],
+        "duplicate_file_ids": sorted(i for i, c in file_ids.items() if c > 1),
+        "duplicate_entry_ids": sorted(i for i, c in entry_ids.items() if c > 1),
+    }
+
+
+def run_benchmark(n_procs: int = 16, rounds: int = 3):
+    print("=" * 70)
+    print("Deposit contention benchmark")
+    print(f"{n_procs} parallel deposit processes x {rounds} rounds")
+    print("=" * 70)
+
+    all_ok = True
+    for rnd in range(1, rounds + 1):
+        tmp = Path(tempfile.mkdtemp(prefix="brain-contention-"))
+        try:
+            subprocess.run(
+                [sys.executable, str(BRAIN_PY), "init", "Contention Bench"],
+                cwd=tmp, capture_output=True, check=True,
+            )
+            brain_root = tmp / brain.BRAIN_DIR_NAME
+
+            t0 = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=n_procs) as pool:
+                results = list(pool.map(
+                    lambda i: deposit(tmp, f"contention entry {rnd}-{i}"), range(n_procs)
+                ))
+            wall = time.perf_counter() - t0
+
+            # Deposits journal their entries; fold them in before checking
+            t1 = time.perf_counter()
+            brain.compact_index_journal(brain_root)
+            compact_wall = time.perf_counter() - t1
+
+            failed = [r for r in results if r.returncode != 0]
+            report = check_consistency(brain_root)
+            lost = report["files"] - report["index_entries"]
+            ok = (
+                not failed
+                and lost == 0
+                and report["manifest_records"] == report["files"]
+                and report["total_files_header"] == report["files"]
+                and not report["duplicate_file_ids"]
+                and not report["duplicate_entry_ids"]
+            )
+            all_ok &= ok
+            print(f"\nRound {rnd}: {wall:.2f}s wall, {n_procs / wall:.1f} deposits/s, "
+                  f"compaction {compact_wall * 1e3:.0f}ms")
+            print(f"  processes failed:      {len(failed)}")
+            print(f"  files created:         {report['files']}")
+            print(f"  index entries:         {report['index_entries']}  (lost: {lost})")
+            print(f"  manifest records:      {report['manifest_records']}")
+            print(f"  total-files header:    {report['total_files_header']}")
+            if report["duplicate_file_ids"]:
+                print(f"  duplicate IDs issued:  {', '.join(report['duplicate_file_ids'])}")
+            for r in failed[:3]:
+                print(f"  stderr: {r.stderr.strip().splitlines()[-1] if r.stderr.strip() else '?'}")
+            print(f"  consistent:            {'YES' if ok else 'NO'}")
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    print("\n" + "=" * 70)
+    print(f"VERDICT: {'no lost updates, unique IDs' if all_ok else 'INCONSISTENT INDEX, MANIFEST OR IDS'}")
+    print("=" * 70)
+    return all_ok
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    r = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    sys.exit(0 if run_benchmark(n, r) else 1)
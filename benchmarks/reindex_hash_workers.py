@@ -0,0 +1,100 @@
+"""
+Benchmark: reindex wall time vs hashing worker count
+Builds a synthetic brain of ~20k files and times brain.py's build_manifest
+(the engine behind `brain reindex` / `brain status`) with a cold stat cache
+(--full) at several thread-pool sizes, plus one warm stat-cached run.
+
+Usage: python benchmarks/reindex_hash_workers.py [n_files] [workers,...]
+"""
+
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "project-brain"))
+import brain  # noqa: E402
+
+# ─── Synthetic brain ──────────────────────────────────────────────────
+
+WORDS = (
+    "index fat summary link backlink hub session handoff deposit recall search "
+    "bm25 token budget schema validate reindex manifest hash cluster space "
+    "identity knowledge ops spec learn code rule log reset agent memory"
+).split()
+
+# Roughly the brain's real mix: mostly LEARN, a tail of big ingested sources.
+TYPE_MIX = [("LEARN", 0.70), ("SPEC", 0.08), ("CODE", 0.08), ("RULE", 0.07), ("LOG", 0.07)]
+
+
+def make_synthetic_brain(root: Path, n_files: int, seed: int = 42) -> Path:
+    rng = random.Random(seed)
+    brain_root = root / brain.BRAIN_DIR_NAME
+    for d in brain.DIRECTORIES:
+        (brain_root / d).mkdir(parents=True, exist_ok=True)
+    (brain_root / brain.INDEX_MASTER).write_text("# INDEX-MASTER\n", encoding="utf-8")
+
+    counters = {t: 0 for t, _ in TYPE_MIX}
+    types = [t for t, _ in TYPE_MIX]
+    weights = [w for _, w in TYPE_MIX]
+    for _ in range(n_files):
+        file_type = rng.choices(types, weights)[0]
+        counters[file_type] += 1
+        file_id = f"{file_type}-{counters[file_type]:05d}"
+        # 2% of files are large ingested sources (~1 MB), the rest 2-12 KB
+        n_words = rng.randint(150_000, 200_000) if rng.random() < 0.02 else rng.randint(300, 2000)
+        body = " ".join(rng.choice(WORDS) for _ in range(n_words))
+        path = brain_root / brain.FILE_TYPES[file_type]["dir"] / f"{file_id}_synthetic.md"
+        path.write_text(f"# {file_id}\n<!-- type: {file_type} -->\n\n{body}\n", encoding="utf-8")
+    return brain_root
+
+
+# ─── Benchmark runner ─────────────────────────────────────────────────
+
+def time_build(brain_root: Path, workers: int, full: bool, previous: dict | None, runs: int = 3) -> float:
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        brain.build_manifest(brain_root, previous, full=full, workers=workers)
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def run_benchmark(n_files: int = 20_000, worker_counts: list[int] | None = None):
+    worker_counts = worker_counts or [1, 2, 4, 8, 16, 32]
+    tmp = Path(tempfile.mkdtemp(prefix="brain-bench-"))
+    try:
+        print("=" * 70)
+        print("Reindex hashing benchmark")
+        print(f"Synthetic brain: {n_files:,} files")
+        print("=" * 70)
+
+        t0 = time.perf_counter()
+        brain_root = make_synthetic_brain(tmp, n_files)
+        total_bytes = sum(f.stat().st_size for f in brain_root.rglob("*.md"))
+        print(f"Generated in {time.perf_counter() - t0:.1f}s ({total_bytes / 1e6:,.0f} MB)\n")
+
+        print(f"{'Workers':>8} {'Full reindex':>14} {'MB/s':>10} {'Speedup':>9}")
+        print("-" * 45)
+        baseline = None
+        for workers in worker_counts:
+            wall = time_build(brain_root, workers, full=True, previous=None)
+            baseline = baseline or wall
+            print(f"{workers:>8} {wall * 1e3:>12.0f}ms {total_bytes / 1e6 / wall:>10.0f} {baseline / wall:>8.2f}x")
+
+        manifest = brain.build_manifest(brain_root)
+        warm = time_build(brain_root, worker_counts[-1], full=False, previous=manifest)
+        print("-" * 45)
+        print(f"{'cached':>8} {warm * 1e3:>12.0f}ms   (stat cache hit, no files read)")
+        print("=" * 70)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    counts = [int(w) for w in sys.argv[2].split(",")] if len(sys.argv) > 2 else None
+    run_benchmark(n, counts)
@@ -0,0 +1,311 @@
+"""
+Benchmark: retrieval quality and latency, labeled from the brain itself
+Derives labeled queries from a brain's own fat index and link graph and
+scores several ranking configurations with brain.py's real stages.
+
+Queries per entry (each labeled with that entry as the target) are held
+out from what the target is indexed by, so a ranker cannot score them by
+looking the query up in the target's own fields:
+  tags     two of its tags; the target's tags are masked while ranking
+  summary  the most frequent words of its summary; its summary is masked
+  body     the most frequent words of its file body (never indexed) that
+           appear nowhere in its indexed fields
+Relevant set: the target (gain 2) plus its LINK-INDEX neighbours in either
+direction (gain 1).
+
+Reports MRR, nDCG@10 and recall@k next to p50/p95/p99 scoring latency for
+each configuration (BM25 parameters, boosts, link propagation, hybrid).
+--json writes the results; --compare BASELINE fails (exit 1) if any
+configuration's MRR, nDCG@10 or recall@k dropped by more than --max-drop,
+so a speed-up can be checked for ranking regressions automatically.
+
+Read-only: the brain's sidecar caches are neither read nor written.
+
+Usage: python benchmarks/search_eval.py [--brain PATH] [--k 10]
+           [--configs full,hybrid,...] [--json out.json] [--compare baseline.json]
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "project-brain"))
+import brain  # noqa: E402
+
+# name -> (k1, b, structural boosts, link propagation, hybrid vectors)
+CONFIGS = {
+    "bm25": (brain.BM25_K1, brain.BM25_B, False, False, False),
+    "bm25-classic": (1.2, 0.75, False, False, False),
+    "boosts": (brain.BM25_K1, brain.BM25_B, True, False, False),
+    "full": (brain.BM25_K1, brain.BM25_B, True, True, False),
+    "hybrid": (brain.BM25_K1, brain.BM25_B, True, True, True),
+}
+NDCG_K = 10
+
+
+# ─── Labeled queries ──────────────────────────────────────────────────
+
+def file_paths(brain_root: Path) -> dict[str, Path]:
+    """ID -> file path for every brain file (no manifest needed)."""
+    paths = {}
+    for path in brain_root.rglob("*.md"):
+        match = re.match(r"^([A-Z]+-\d+)_", path.name)
+        if match:
+            paths.setdefault(match.group(1), path)
+    return paths
+
+
+def held_out_words(text: str, indexed: set[str], n: int) -> list[str]:
+    """The `n` most frequent words of `text` whose tokens are not in `indexed`."""
+    words = brain.salient_words(text, 10 * n)
+    return [w for w in words if not set(brain.tokenize(w)) & indexed][:n]
+
+
+def make_queries(brain_root: Path, entries: list[dict], seed: int = 42) -> list[dict]:
+    """[{kind, query, target, mask, relevant: {id: gain}}] from entries + LINK-INDEX.
+
+    `mask` names the target field to blank before ranking (None for body
+    queries, whose words the target's index entry does not contain).
+    """
+    rng = random.Random(seed)
+    neighbours: dict[str, set[str]] = {}
+    for edge in brain.parse_link_index(brain_root):
+        neighbours.setdefault(edge["source"], set()).add(edge["target"])
+        neighbours.setdefault(edge["target"], set()).add(edge["source"])
+    paths = file_paths(brain_root)
+    ids = {e["id"] for e in entries}
+
+    queries = []
+    for entry in entries:
+        target = entry["id"]
+        relevant = {n: 1 for n in neighbours.get(target, ()) if n in ids}
+        relevant[target] = 2
+        tags = [t.strip() for t in entry.get("tags", "").split(",") if t.strip()]
+        body = brain.read_file(paths[target]) if target in paths else ""
+        candidates = {
+            "tags": (" ".join(rng.sample(tags, min(2, len(tags)))), "tags"),
+            "summary": (" ".join(brain.salient_words(entry.get("summary", ""), 5)), "summary"),
+            "body": (" ".join(held_out_words(body, set(brain.entry_to_corpus_doc(entry)), 5)), None),
+        }
+        for kind, (query, mask) in candidates.items():
+            if query.strip():
+                queries.append({"kind": kind, "query": query, "target": target, "mask": mask,
+                                "relevant": relevant})
+    return queries
+
+
+def masked_entries(entries: list[dict], target: str, field: str) -> list[dict]:
+    """`entries` with `field` blanked on the target entry."""
+    return [{**e, field: ""} if e["id"] == target else e for e in entries]
+
+
+# ─── Scoring configurations ───────────────────────────────────────────
+
+def make_ranker(entries: list[dict], config: tuple, vectors=None):
+    """A query -> ranked IDs function built from brain.py's stages."""
+    k1, b, boosts, propagate, hybrid = config
+    bm25 = brain.build_bm25_index(entries, k1=k1, b=b)
+
+    def rank(query: str) -> list[str]:
+        terms = [t for t in re.split(r"[\s,]+", query) if t]
+        tokens = brain.tokenize(" ".join(terms))
+        if not tokens:
+            return []
+        raw = bm25.get_scores(tokens)
+        if boosts:
+            scored = brain.apply_structural_boosts(entries, raw, terms)
+        else:
+            scored = [(float(raw[i]), e) for i, e in enumerate(entries)]
+        if propagate:
+            scored = brain.propagate_link_scores(scored)
+        else:
+            scored = sorted(((s, e) for s, e in scored if s > 0), key=lambda x: x[0], reverse=True)
+        if hybrid:
+            scored = brain.fuse_hybrid(scored, brain.vector_search(vectors, entries, terms))
+        return [e["id"] for _, e in scored]
+
+    return rank
+
+
+def embed_entry(entry: dict, paths: dict[str, Path]):
+    """One entry's vector as `brain reindex --vectors` would build it."""
+    body = brain.read_file(paths[entry["id"]]) if entry["id"] in paths else ""
+    return brain.embed_text(brain._entry_embed_text(entry), body)
+
+
+def embed_entries(brain_root: Path, entries: list[dict]):
+    """Vectors for every entry, kept in memory."""
+    import numpy as np
+
+    paths = file_paths(brain_root)
+    return np.stack([embed_entry(e, paths) for e in entries])
+
+
+# ─── Metrics ──────────────────────────────────────────────────────────
+
+def reciprocal_rank(ranked: list[str], relevant: dict[str, int]) -> float:
+    for i, file_id in enumerate(ranked, 1):
+        if file_id in relevant:
+            return 1.0 / i
+    return 0.0
+
+
+def ndcg(ranked: list[str], relevant: dict[str, int], k: int = NDCG_K) -> float:
+    dcg = sum((2 ** relevant.get(f, 0) - 1) / math.log2(i + 1) for i, f in enumerate(ranked[:k], 1))
+    ideal = sorted(relevant.values(), reverse=True)[:k]
+    idcg = sum((2 ** g - 1) / math.log2(i + 1) for i, g in enumerate(ideal, 1))
+    return dcg / idcg if idcg else 0.0
+
+
+def recall_at(ranked: list[str], relevant: dict[str, int], k: int) -> float:
+    return len(set(ranked[:k]) & set(relevant)) / len(relevant)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def score_queries(brain_root: Path, entries: list[dict], config: tuple, queries: list[dict],
+                  k: int, vectors=None) -> list[dict]:
+    """Per-query {kind, mrr, ndcg, recall, ms}.
+
+    Masked queries are ranked over entries with the target's source field
+    blanked (and, for hybrid, its vector re-embedded without it). Those
+    rankers are built outside the timed region, once per (target, field).
+    """
+    paths = file_paths(brain_root) if vectors is not None else {}
+    rankers = {None: make_ranker(entries, config, vectors)}
+    rows = []
+    for q in queries:
+        key = (q["target"], q["mask"]) if q["mask"] else None
+        if key not in rankers:
+            view = masked_entries(entries, *key)
+            view_vectors = None
+            if vectors is not None:
+                view_vectors = vectors.copy()
+                row = next(i for i, e in enumerate(view) if e["id"] == q["target"])
+                view_vectors[row] = embed_entry(view[row], paths)
+            rankers[key] = make_ranker(view, config, view_vectors)
+        t0 = time.perf_counter()
+        ranked = rankers[key](q["query"])
+        rows.append({
+            "kind": q["kind"],
+            "ms": (time.perf_counter() - t0) * 1e3,
+            "mrr": reciprocal_rank(ranked, q["relevant"]),
+            "ndcg": ndcg(ranked, q["relevant"]),
+            "recall": recall_at(ranked, q["relevant"], k),
+        })
+    return rows
+
+
+def summarize(rows: list[dict], k: int) -> dict:
+    lat = [r["ms"] for r in rows]
+    return {
+        "mrr": statistics.mean(r["mrr"] for r in rows),
+        f"ndcg@{NDCG_K}": statistics.mean(r["ndcg"] for r in rows),
+        f"recall@{k}": statistics.mean(r["recall"] for r in rows),
+        "p50_ms": percentile(lat, 50),
+        "p95_ms": percentile(lat, 95),
+        "p99_ms": percentile(lat, 99),
+    }
+
+
+def compare(results: dict, baseline: dict, max_drop: float) -> list[str]:
+    """Quality metrics that dropped by more than max_drop (absolute) vs the baseline."""
+    drops = []
+    for name, metrics in results["configs"].items():
+        before = baseline.get("configs", {}).get(name, {})
+        for metric, value in metrics.items():
+            if metric.endswith("_ms") or metric not in before:
+                continue
+            if before[metric] - value > max_drop:
+                drops.append(f"{name} {metric}: {before[metric]:.3f} → {value:.3f}")
+    return drops
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retrieval quality + latency eval from the brain's own graph")
+    parser.add_argument("--brain", default=str(Path(__file__).resolve().parent.parent / "project-brain"),
+                        help="Brain root to evaluate (default: this repo's project-brain)")
+    parser.add_argument("--k", type=int, default=10, help="Cut-off for recall@k")
+    parser.add_argument("--configs", default=",".join(CONFIGS), help="Comma-separated configurations")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier --json run")
+    parser.add_argument("--max-drop", type=float, default=0.01, help="Allowed absolute drop per quality metric")
+    args = parser.parse_args()
+
+    brain_root = Path(args.brain)
+    entries = brain.collect_all_entries(brain_root)
+    if not entries:
+        print(f"ERROR: No index entries under {brain_root}")
+        sys.exit(1)
+    queries = make_queries(brain_root, entries)
+    names = [n.strip() for n in args.configs.split(",") if n.strip()]
+    unknown = [n for n in names if n not in CONFIGS]
+    if unknown:
+        print(f"ERROR: Unknown config(s): {', '.join(unknown)} (choose from {', '.join(CONFIGS)})")
+        sys.exit(1)
+
+    vectors = None
+    if any(CONFIGS[n][4] for n in names):
+        try:
+            vectors = embed_entries(brain_root, entries)
+        except ImportError:
+            print("NumPy not installed — skipping hybrid configurations.")
+            names = [n for n in names if not CONFIGS[n][4]]
+
+    kinds = sorted({q["kind"] for q in queries})
+    per_kind = ", ".join(f"{sum(q['kind'] == k for q in queries)} {k}" for k in kinds)
+    print("=" * 92)
+    print("Search eval: held-out queries from the brain's own index, files and LINK-INDEX")
+    print(f"{len(entries)} entries, {len(queries)} queries ({per_kind})")
+    print("=" * 92)
+    recall_key = f"recall@{args.k}"
+    print(f"{'Config':<14} {'MRR':>7} {f'nDCG@{NDCG_K}':>8} {recall_key:>10} {'p50':>9} {'p95':>9} {'p99':>9}")
+    print("-" * 92)
+
+    results = {"meta": {"brain": str(brain_root), "entries": len(entries), "queries": len(queries)},
+               "configs": {}, "by_kind": {}}
+    for name in names:
+        rows = score_queries(brain_root, entries, CONFIGS[name], queries, args.k, vectors)
+        metrics = summarize(rows, args.k)
+        results["configs"][name] = metrics
+        results["by_kind"][name] = {
+            kind: statistics.mean(r["mrr"] for r in rows if r["kind"] == kind) for kind in kinds
+        }
+        print(f"{name:<14} {metrics['mrr']:>7.3f} {metrics[f'ndcg@{NDCG_K}']:>8.3f} {metrics[recall_key]:>10.3f} "
+              f"{metrics['p50_ms']:>7.2f}ms {metrics['p95_ms']:>7.2f}ms {metrics['p99_ms']:>7.2f}ms")
+
+    print("-" * 92)
+    print("MRR by query kind: " + "; ".join(
+        f"{name} " + ", ".join(f"{k}={v:.2f}" for k, v in by_kind.items())
+        for name, by_kind in results["by_kind"].items()
+    ))
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+        print(f"\nResults written to {args.json}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        drops = compare(results, baseline, args.max_drop)
+        print("\n" + "=" * 92)
+        if drops:
+            print(f"RANKING REGRESSIONS vs {args.compare} (drop > {args.max_drop}):")
+            for line in drops:
+                print(f"  - {line}")
+            print("=" * 92)
+            sys.exit(1)
+        print(f"No ranking regressions vs {args.compare}.")
+        print("=" * 92)
+
+
+if __name__ == "__main__":
+    main()
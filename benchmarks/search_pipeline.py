@@ -0,0 +1,301 @@
+"""
+Benchmark: brain.py's real search pipeline, stage by stage
+Generates synthetic compressed-v1 brains (INDEX-MASTER with @SUB refs,
+sub-indexes and LINK-INDEX) at several scales and times every stage of
+`brain search` through brain.py's own functions:
+
+  parse      collect_all_entries (index files + journal)
+  tokenize   entry_to_corpus_doc over every entry, plus the query
+  build      build_bm25_index
+  score      BM25 get_scores
+  boost      apply_structural_boosts
+  propagate  propagate_link_scores
+  format     format_search_results
+  cached     cached_bm25_index + score_entries_bm25 (what search/recall/MCP run)
+
+Cold runs clear brain.py's in-process memos and the BM25 sidecar before
+every repetition; warm runs reuse them. Results go to stdout and, with
+--json, to a file that a later run can --compare against: any stage whose
+warm median is more than --threshold slower than the baseline (and slower
+by more than --min-ms, to ignore timer noise) fails the run.
+
+Usage: python benchmarks/search_pipeline.py [--scales 100,1000,10000]
+           [--repeats 5] [--json out.json] [--compare baseline.json] [--threshold 0.25]
+"""
+
+import argparse
+import json
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "project-brain"))
+import brain  # noqa: E402
+
+# ─── Synthetic brain ──────────────────────────────────────────────────
+
+WORDS = (
+    "index fat summary link backlink hub session handoff deposit recall search "
+    "bm25 token budget schema validate reindex manifest hash cluster space "
+    "identity knowledge ops spec learn code rule log reset agent memory hook "
+    "skill subagent context window compaction plugin workflow cost latency "
+    "embedding vector graph edge journal lock atomic stub ingest pdf chunk"
+).split()
+TYPE_MIX = [("LEARN", 0.70), ("SPEC", 0.08), ("CODE", 0.08), ("RULE", 0.07), ("LOG", 0.07)]
+ABBREV = {"SPEC": "S", "CODE": "C", "RULE": "R", "LEARN": "L", "LOG": "G"}
+RELATIONS = ["extends", "validates", "informs", "implements", "grounds"]
+SUB_INDEX_SHARE = 0.3  # fraction of entries that live in sub-indexes
+SUB_INDEX_COUNT = 4
+QUERIES = 20
+STAGES = ["parse", "tokenize", "build", "score", "boost", "propagate", "format", "cached"]
+
+
+def _abbrev(file_id: str) -> str:
+    prefix, _, num = file_id.partition("-")
+    return ABBREV[prefix] + num
+
+
+def make_synthetic_brain(root: Path, n_files: int, seed: int = 42) -> Path:
+    """Write a compressed-v1 brain with n_files index entries; returns brain_root."""
+    rng = random.Random(seed)
+    brain_root = root / brain.BRAIN_DIR_NAME
+    for d in brain.DIRECTORIES:
+        (brain_root / d).mkdir(parents=True, exist_ok=True)
+
+    types, weights = zip(*TYPE_MIX)
+    counters = {t: 0 for t in types}
+    ids = []
+    for _ in range(n_files):
+        file_type = rng.choices(types, weights)[0]
+        ids.append(f"{file_type}-{counters[file_type]:03d}")
+        counters[file_type] += 1
+
+    links = {fid: rng.sample(ids, min(len(ids), rng.randint(1, 5))) for fid in ids}
+    backlinks: dict[str, list[str]] = {}
+    for source, targets in links.items():
+        for target in targets:
+            if target != source:
+                backlinks.setdefault(target, []).append(source)
+
+    def entry_line(fid: str) -> str:
+        tags = ",".join(rng.sample(WORDS, 5))
+        out = ",".join(_abbrev(t) for t in links[fid] if t != fid) or "∅"
+        inc = ",".join(_abbrev(s) for s in backlinks.get(fid, [])) or "∅"
+        summary = " ".join(rng.choice(WORDS) for _ in range(rng.randint(25, 60)))
+        return f"{_abbrev(fid)}|{tags}|→{out}|←{inc}|{summary}.|d:{rng.choice(WORDS)}>{rng.choice(WORDS)}|!none"
+
+    n_sub = int(n_files * SUB_INDEX_SHARE)
+    sub_ids = ids[-n_sub:] if n_sub else []
+    master_ids = ids[:len(ids) - n_sub]
+    subs = {f"cluster{i}": sub_ids[i::SUB_INDEX_COUNT] for i in range(SUB_INDEX_COUNT) if sub_ids[i::SUB_INDEX_COUNT]}
+
+    master = [
+        "# INDEX-MASTER",
+        "<!-- type: INDEX -->",
+        f"<!-- updated: {brain.TODAY} -->",
+        f"<!-- total-files: {n_files} -->",
+        "<!-- format: compressed-v1 (LEARN-046) -->",
+        "<!-- entry: ID|tags|→outlinks|←inlinks|summary|d:decisions|i:interface|!issues -->",
+        "",
+        "## Sub-Indexes",
+        "",
+    ]
+    for name, members in subs.items():
+        master.append(f"@SUB:{name}|INDEX-{name}.md|{len(members)}|"
+                      f"{','.join(_abbrev(m) for m in members)}|Synthetic cluster {name}.")
+    for file_type in types:
+        master += ["", "---", "", f"## {file_type} Files", ""]
+        for fid in master_ids:
+            if fid.startswith(file_type + "-"):
+                master += [entry_line(fid), ""]
+    (brain_root / brain.INDEX_MASTER).write_text("\n".join(master), encoding="utf-8")
+
+    index_dir = brain_root / "knowledge" / "indexes"
+    for name, members in subs.items():
+        lines = [
+            f"# INDEX — {name}",
+            "<!-- type: SUB-INDEX -->",
+            f"<!-- cluster-tag: {name} -->",
+            f"<!-- member-count: {len(members)} -->",
+            "<!-- format: compressed-v1 (LEARN-046) -->",
+            "",
+            "---",
+            "",
+        ]
+        for fid in members:
+            lines += [entry_line(fid), ""]
+        (index_dir / f"INDEX-{name}.md").write_text("\n".join(lines), encoding="utf-8")
+
+    edges = [f"{s}|{t}|{rng.choice(RELATIONS)}|1" for s, targets in links.items() for t in targets if t != s]
+    link_lines = [
+        "# LINK-INDEX",
+        "<!-- type: LINK-INDEX -->",
+        f"<!-- total-edges: {len(edges)} -->",
+        "<!-- format: source|target|type|hop-depth -->",
+        "",
+        "## Edges",
+        "",
+    ] + edges
+    (brain_root / brain.LINK_INDEX).write_text("\n".join(link_lines) + "\n", encoding="utf-8")
+    return brain_root
+
+
+def make_queries(n: int, seed: int = 7) -> list[list[str]]:
+    rng = random.Random(seed)
+    return [rng.sample(WORDS, rng.randint(1, 4)) for _ in range(n)]
+
+
+# ─── Stage timing ─────────────────────────────────────────────────────
+
+def _reset_caches(brain_root: Path):
+    brain._BM25_MEMO.clear()
+    (brain_root / brain.BM25_CACHE).unlink(missing_ok=True)
+
+
+def run_pipeline(brain_root: Path, queries: list[list[str]]) -> dict[str, float]:
+    """One pass over every stage; returns seconds per stage (per query for query stages)."""
+    times = {}
+    t0 = time.perf_counter()
+    entries = brain.collect_all_entries(brain_root)
+    times["parse"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    corpus = [brain.entry_to_corpus_doc(e) for e in entries]
+    query_tokens = [brain.tokenize(" ".join(q)) for q in queries]
+    times["tokenize"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    bm25 = brain.build_bm25_index(entries, corpus)
+    times["build"] = time.perf_counter() - t0
+
+    per_query = {"score": 0.0, "boost": 0.0, "propagate": 0.0, "format": 0.0, "cached": 0.0}
+    for terms, tokens in zip(queries, query_tokens):
+        t0 = time.perf_counter()
+        raw = bm25.get_scores(tokens)
+        t1 = time.perf_counter()
+        boosted = brain.apply_structural_boosts(entries, raw, terms)
+        t2 = time.perf_counter()
+        final = brain.propagate_link_scores(boosted)
+        t3 = time.perf_counter()
+        brain.format_search_results(" ".join(terms), final)
+        t4 = time.perf_counter()
+        per_query["score"] += t1 - t0
+        per_query["boost"] += t2 - t1
+        per_query["propagate"] += t3 - t2
+        per_query["format"] += t4 - t3
+
+    for terms in queries:
+        t0 = time.perf_counter()
+        cached_entries, cached_bm25 = brain.cached_bm25_index(brain_root)
+        brain.score_entries_bm25(cached_entries, terms, cached_bm25)
+        per_query["cached"] += time.perf_counter() - t0
+
+    times.update({stage: total / len(queries) for stage, total in per_query.items()})
+    return times
+
+
+def bench_scale(n_files: int, repeats: int) -> dict:
+    tmp = Path(tempfile.mkdtemp(prefix="brain-pipeline-"))
+    try:
+        brain_root = make_synthetic_brain(tmp, n_files)
+        queries = make_queries(QUERIES)
+        cold, warm = [], []
+        for _ in range(repeats):
+            _reset_caches(brain_root)
+            cold.append(run_pipeline(brain_root, queries))
+        run_pipeline(brain_root, queries)  # prime memos and sidecar
+        for _ in range(repeats):
+            warm.append(run_pipeline(brain_root, queries))
+        return {
+            stage: {
+                "cold_ms": statistics.median(r[stage] for r in cold) * 1e3,
+                "warm_ms": statistics.median(r[stage] for r in warm) * 1e3,
+                "warm_max_ms": max(r[stage] for r in warm) * 1e3,
+            }
+            for stage in STAGES
+        }
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+        brain._BM25_MEMO.clear()
+
+
+# ─── Regression comparison ────────────────────────────────────────────
+
+def compare(results: dict, baseline: dict, threshold: float, min_ms: float) -> list[str]:
+    """Stages whose warm median regressed beyond threshold (relative) and min_ms (absolute)."""
+    regressions = []
+    for scale, stages in results["scales"].items():
+        for stage, now in stages.items():
+            before = baseline.get("scales", {}).get(scale, {}).get(stage)
+            if not before:
+                continue
+            delta = now["warm_ms"] - before["warm_ms"]
+            if delta > min_ms and now["warm_ms"] > before["warm_ms"] * (1 + threshold):
+                regressions.append(
+                    f"N={scale} {stage}: {before['warm_ms']:.3f}ms → {now['warm_ms']:.3f}ms "
+                    f"(+{delta / before['warm_ms']:.0%})"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stage-by-stage benchmark of brain.py search")
+    parser.add_argument("--scales", default="100,1000,10000", help="Comma-separated entry counts")
+    parser.add_argument("--repeats", type=int, default=5, help="Cold and warm runs per scale")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier --json run")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--min-ms", type=float, default=0.05, help="Ignore regressions smaller than this")
+    args = parser.parse_args()
+
+    scales = [int(n) for n in args.scales.split(",")]
+    print("=" * 78)
+    print("brain.py search pipeline benchmark")
+    print(f"Scales: {', '.join(f'{n:,}' for n in scales)} entries — {args.repeats} cold + "
+          f"{args.repeats} warm runs, {QUERIES} queries (query stages are per query)")
+    print("=" * 78)
+
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeats": args.repeats,
+            "queries": QUERIES,
+        },
+        "scales": {},
+    }
+    for n in scales:
+        stages = bench_scale(n, args.repeats)
+        results["scales"][str(n)] = stages
+        print(f"\nN = {n:,}")
+        print(f"  {'Stage':<10} {'Cold':>11} {'Warm':>11} {'Warm max':>11}")
+        for stage in STAGES:
+            r = stages[stage]
+            print(f"  {stage:<10} {r['cold_ms']:>9.3f}ms {r['warm_ms']:>9.3f}ms {r['warm_max_ms']:>9.3f}ms")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+        print(f"\nResults written to {args.json}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.threshold, args.min_ms)
+        print("\n" + "=" * 78)
+        if regressions:
+            print(f"REGRESSIONS vs {args.compare} (>{args.threshold:.0%}):")
+            for line in regressions:
+                print(f"  - {line}")
+            print("=" * 78)
+            sys.exit(1)
+        print(f"No regressions vs {args.compare} (threshold {args.threshold:.0%}).")
+        print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
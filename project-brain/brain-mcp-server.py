@@ -5,25 +5,35 @@ Register: claude mcp add --scope user brain -- uv --directory <brain-dir> run br
 Test:     uv run mcp dev brain-mcp-server.py
 
 Tools:
-  search_brain(query, space, limit)              — BM25 search with space pre-filter
+  search_brain(query, space, limit, explain)      — BM25 search with space pre-filter
   search_linked(source_query, target_query, rel)  — Link index edge query
   search_path(start, end, max_hops)               — BFS shortest path
   read_file(file_id, section)                     — Read a brain file by ID
   get_index()                                     — Return INDEX-MASTER for orientation
+  get_metrics(reset, dump)                        — Per-stage latency percentiles (BRAIN_METRICS=1)
 
 Resources:
   @brain:brain://index          — Master index
   @brain:brain://file/{file_id} — Any brain file by ID
   @brain:brain://handoff        — Latest session handoff
+  @brain:brain://memory         — Per-stage memory profile (BRAIN_PROFILE_MEMORY=1)
+  @brain:brain://metrics        — Per-stage latency histograms (BRAIN_METRICS=1)
 
 Prompts:
   /mcp__brain__search <query>   — Search and format results
   /mcp__brain__status           — Brain health overview
 """
 
+import bisect
+import contextlib
+import contextvars
+import functools
+import json
 import logging
+import os
 import re
 import sys
+import time
 from pathlib import Path
 
 from mcp.server.fastmcp import FastMCP
@@ -49,16 +59,135 @@ mcp = FastMCP(
 sys.path.insert(0, str(Path(__file__).parent))
 from brain import (  # noqa: E402
     find_brain_root,
-    collect_all_entries,
+    cached_bm25_index,
+    cached_embeddings,
+    build_bm25_index,
+    explain_search,
+    format_explanation,
+    record_stage_timings,
     score_entries_bm25,
     parse_link_index,
     read_file as brain_read_file,
     estimate_tokens,
+    file_stats,
+    add_stage_observer,
+    memory_report,
+    pipeline_stage,
+    read_index_master,
+    start_memory_profile,
     FILE_TYPES,
     INDEX_MASTER,
 )
 
 
+# Long-lived server: trace allocations per pipeline stage when asked to
+if os.environ.get("BRAIN_PROFILE_MEMORY", "").lower() in ("1", "true", "yes"):
+    start_memory_profile()
+    logger.info("Memory profiling enabled (brain://memory)")
+
+
+# ---------------------------------------------------------------------------
+# Metrics — per-stage latency histograms
+# ---------------------------------------------------------------------------
+#
+# With BRAIN_METRICS=1, every tool call is timed as a "total" span plus one
+# span per pipeline stage it runs (root discovery, parse, bm25 build, boost,
+# propagate, format, ...), reported through brain.py's stage observers.
+# Spans land in fixed log-spaced histograms, so memory stays constant no
+# matter how long the server runs. Disabled, tools are left unwrapped and
+# no observer is registered: pipeline stages stay bare generator steps.
+# BRAIN_METRICS_FILE names the JSONL file get_metrics(dump=True) appends to
+# (default: .mcp-metrics.jsonl in the brain root).
+
+METRICS_ENABLED = os.environ.get("BRAIN_METRICS", "").lower() in ("1", "true", "yes")
+METRICS_FILE = os.environ.get("BRAIN_METRICS_FILE", "")
+# 8 buckets per decade from 1µs to 100s; percentiles are read off bucket edges
+_BUCKET_BOUNDS = [1e-6 * 10 ** (i / 8) for i in range(8 * 8 + 1)]
+_METRICS: dict[str, dict[str, dict]] = {}  # tool -> stage -> histogram
+_CURRENT_TOOL: contextvars.ContextVar[str] = contextvars.ContextVar("brain_tool", default="other")
+
+
+def _record_span(stage: str, seconds: float, tool: str | None = None):
+    hist = _METRICS.setdefault(tool or _CURRENT_TOOL.get(), {}).setdefault(
+        stage, {"count": 0, "sum": 0.0, "max": 0.0, "buckets": [0] * (len(_BUCKET_BOUNDS) + 1)}
+    )
+    hist["count"] += 1
+    hist["sum"] += seconds
+    hist["max"] = max(hist["max"], seconds)
+    hist["buckets"][bisect.bisect_left(_BUCKET_BOUNDS, seconds)] += 1
+
+
+def _percentile(hist: dict, q: float) -> float:
+    """Upper edge of the bucket holding the q-quantile (capped at the max seen)."""
+    rank = q * hist["count"]
+    seen = 0
+    for i, n in enumerate(hist["buckets"]):
+        seen += n
+        if seen >= rank and n:
+            return min(_BUCKET_BOUNDS[i] if i < len(_BUCKET_BOUNDS) else hist["max"], hist["max"])
+    return hist["max"]
+
+
+def _metrics_summary() -> list[dict]:
+    return [
+        {
+            "tool": tool,
+            "stage": stage,
+            "count": hist["count"],
+            "mean_ms": hist["sum"] / hist["count"] * 1e3,
+            "p50_ms": _percentile(hist, 0.50) * 1e3,
+            "p95_ms": _percentile(hist, 0.95) * 1e3,
+            "p99_ms": _percentile(hist, 0.99) * 1e3,
+            "max_ms": hist["max"] * 1e3,
+        }
+        for tool, stages in sorted(_METRICS.items())
+        for stage, hist in sorted(stages.items(), key=lambda kv: -kv[1]["sum"])
+    ]
+
+
+def _metrics_report() -> str:
+    if not METRICS_ENABLED:
+        return "Metrics are off. Start the server with BRAIN_METRICS=1 to record per-stage latency."
+    rows = _metrics_summary()
+    if not rows:
+        return "No tool calls recorded yet."
+    lines = [
+        f"{'Tool':<14} {'Stage':<16} {'Calls':>6} {'Mean':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'Max':>9}",
+        "-" * 88,
+    ]
+    for r in rows:
+        lines.append(
+            f"{r['tool']:<14} {r['stage']:<16} {r['count']:>6} {r['mean_ms']:>7.2f}ms {r['p50_ms']:>7.2f}ms "
+            f"{r['p95_ms']:>7.2f}ms {r['p99_ms']:>7.2f}ms {r['max_ms']:>7.2f}ms"
+        )
+    lines.append("\nPercentiles are histogram bucket edges (±15%). Stages nest: total ⊇ score ⊇ boost.")
+    return "\n".join(lines)
+
+
+def _instrumented(fn):
+    """Time a tool call as its "total" span; stage spans inside attach to it."""
+    if not METRICS_ENABLED:
+        return fn
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = _CURRENT_TOOL.set(fn.__name__)
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _record_span("total", time.perf_counter() - started)
+            _CURRENT_TOOL.reset(token)
+
+    return wrapper
+
+
+if METRICS_ENABLED:
+    add_stage_observer(_record_span)
+    logger.info("Latency metrics enabled (brain://metrics, get_metrics)")
+
+
+@pipeline_stage("root discovery")
 def _get_brain_root() -> Path:
     """Find brain root, raising clear error if not found."""
     root = find_brain_root(Path(__file__).parent)
@@ -106,6 +235,7 @@ def _extract_section(content: str, section_name: str) -> str | None:
     return "\n".join(lines[start_idx:end_idx]).strip()
 
 
+@pipeline_stage("resolve")
 def _resolve_file_id(brain_root: Path, file_id: str) -> Path | None:
     """Resolve a file ID (e.g., 'LEARN-013') to its full path."""
     file_id_upper = file_id.upper()
@@ -133,7 +263,9 @@ def _resolve_file_id(brain_root: Path, file_id: str) -> Path | None:
 
 
 @mcp.tool()
-def search_brain(query: str, space: str = "all", limit: int = 10) -> str:
+@_instrumented
+def search_brain(query: str, space: str = "all", limit: int = 10, hybrid: bool = False,
+                 explain: bool = False) -> str:
     """Search the Project Brain using BM25 ranking with structural boosts.
 
     Returns ranked results with file IDs, scores, tags, and summary excerpts.
@@ -144,54 +276,77 @@ def search_brain(query: str, space: str = "all", limit: int = 10) -> str:
         query: Search terms (e.g., "hooks configuration", "MCP server")
         space: Pre-filter by space: "identity", "knowledge", "ops", or "all" (default)
         limit: Maximum number of results to return (default 10)
+        hybrid: Fuse BM25 with the vector cache built by `brain reindex --vectors`
+                (default False: lexical ranking only)
+        explain: Append each result's score breakdown (BM25 per term, tag/ID
+                 boosts, link propagation by source, vector rank) and stage timings
     """
-    brain_root = _get_brain_root()
-    entries = collect_all_entries(brain_root)
-
-    if not entries:
-        return "No brain files found. The brain is empty."
-
-    # Deduplicate entries by ID (sub-index overlap)
-    seen = set()
-    unique = []
-    for e in entries:
-        eid = e.get("id", "")
-        if eid not in seen:
-            seen.add(eid)
-            unique.append(e)
-    entries = unique
-
-    # Space pre-filter: narrow entries before scoring
-    if space != "all":
-        space_types = {
-            s for s, info in FILE_TYPES.items() if info.get("space") == space
-        }
-        if space_types:
-            entries = [
-                e for e in entries
-                if e.get("type", e.get("id", "").split("-")[0]) in space_types
-            ]
-
-    if not entries:
-        return f'No entries in space "{space}".'
-
-    query_terms = [t.strip() for t in query.split() if t.strip()]
-    scored = score_entries_bm25(entries, query_terms)
-
-    if not scored:
-        return f'No results for "{query}" across {len(entries)} brain files (space: {space}).'
-
-    results = scored[:limit]
+    trace = {} if explain else None
+    with record_stage_timings() if explain else contextlib.nullcontext([]) as timings:
+        brain_root = _get_brain_root()
+        entries, bm25 = cached_bm25_index(brain_root)
+
+        if not entries:
+            return "No brain files found. The brain is empty."
+        vectors = cached_embeddings(brain_root, entries) if hybrid else None
+
+        # Deduplicate entries by ID (sub-index overlap)
+        seen = set()
+        keep = []
+        for i, e in enumerate(entries):
+            eid = e.get("id", "")
+            if eid not in seen:
+                seen.add(eid)
+                keep.append(i)
+
+        # Space pre-filter: narrow entries before scoring
+        if space != "all":
+            space_types = {
+                s for s, info in FILE_TYPES.items() if info.get("space") == space
+            }
+            if space_types:
+                keep = [
+                    i for i in keep
+                    if entries[i].get("type", entries[i].get("id", "").split("-")[0]) in space_types
+                ]
+
+        if not keep:
+            return f'No entries in space "{space}".'
+
+        # The cached BM25 index and vectors cover every entry; a narrowed
+        # entry list gets its own BM25 index and the matching vector rows
+        if len(keep) < len(entries):
+            entries = [entries[i] for i in keep]
+            bm25 = build_bm25_index(entries)
+            vectors = vectors[keep] if vectors is not None else None
+
+        query_terms = [t.strip() for t in query.split() if t.strip()]
+        scored = score_entries_bm25(entries, query_terms, bm25, vectors, trace)
+        if not scored:
+            return f'No results for "{query}" across {len(entries)} brain files (space: {space}).'
+
+        with pipeline_stage("format"):
+            output = _format_search_results(brain_root, query, space, scored[:limit], len(scored))
+    if explain:
+        payload = explain_search(entries, query_terms, scored, bm25, trace, timings, top=limit)
+        output += "\n\n" + format_explanation(payload)
+    return output
+
+
+def _format_search_results(brain_root: Path, query: str, space: str, results: list, total: int) -> str:
+    stats = file_stats(brain_root)
     space_label = f" [space: {space}]" if space != "all" else ""
-    lines = [f'Search: "{query}"{space_label} — {len(results)} of {len(scored)} matches\n']
+    lines = [f'Search: "{query}"{space_label} — {len(results)} of {total} matches\n']
 
     for rank, (score, entry) in enumerate(results, 1):
         summary = entry.get("summary", "No summary")
         if len(summary) > 200:
             summary = summary[:197] + "..."
         tags = entry.get("tags", "")
+        size = stats.get(entry["id"])
+        size_label = f", ~{size['tokens']:,} tokens, {size['lines']} lines" if size else ""
         lines.append(
-            f"{rank}. **{entry['id']}** (score: {score:.1f})\n"
+            f"{rank}. **{entry['id']}** (score: {score:.2f}{size_label})\n"
             f"   Tags: {tags}\n"
             f"   {summary}\n"
         )
@@ -203,6 +358,7 @@ def search_brain(query: str, space: str = "all", limit: int = 10) -> str:
 
 
 @mcp.tool()
+@_instrumented
 def search_linked(
     source_query: str = "",
     target_query: str = "",
@@ -264,6 +420,7 @@ def search_linked(
 
 
 @mcp.tool()
+@_instrumented
 def search_path(start: str, end: str, max_hops: int = 3) -> str:
     """Find shortest path between two brain files via the link index.
 
@@ -294,6 +451,7 @@ def search_path(start: str, end: str, max_hops: int = 3) -> str:
         adj[e["target"]].append((e["source"], e["type"]))
 
     # BFS for shortest path
+    bfs_started = time.perf_counter()
     if start not in adj:
         return f"Start node {start} not found in link index."
     if end not in adj:
@@ -318,6 +476,9 @@ def search_path(start: str, end: str, max_hops: int = 3) -> str:
                 if depth <= max_hops:
                     queue.append(neighbor)
 
+    if METRICS_ENABLED:
+        _record_span("bfs", time.perf_counter() - bfs_started)
+
     if end not in visited:
         return f"No path found from {start} to {end} within {max_hops} hops."
 
@@ -338,6 +499,7 @@ def search_path(start: str, end: str, max_hops: int = 3) -> str:
 
 
 @mcp.tool()
+@_instrumented
 def read_file(file_id: str, section: str = "") -> str:
     """Read a specific brain file by its ID.
 
@@ -354,7 +516,9 @@ def read_file(file_id: str, section: str = "") -> str:
     if path is None:
         return f"File not found: {file_id}. Use search_brain to find valid IDs."
 
-    content = brain_read_file(path)
+    with pipeline_stage("read"):
+        # INDEX-MASTER includes entries still pending in the index journal
+        content = read_index_master(brain_root) if path == brain_root / INDEX_MASTER else brain_read_file(path)
     tokens = estimate_tokens(content)
 
     if section:
@@ -374,6 +538,7 @@ def read_file(file_id: str, section: str = "") -> str:
 
 
 @mcp.tool()
+@_instrumented
 def get_index() -> str:
     """Return the full INDEX-MASTER fat index for brain orientation.
 
@@ -386,11 +551,36 @@ def get_index() -> str:
     if not master_path.exists():
         return "INDEX-MASTER.md not found."
 
-    content = brain_read_file(master_path)
+    with pipeline_stage("read"):
+        content = read_index_master(brain_root)
     tokens = estimate_tokens(content)
     return f"# INDEX-MASTER (~{tokens} tokens)\n---\n{content}"
 
 
+@mcp.tool()
+def get_metrics(reset: bool = False, dump: bool = False) -> str:
+    """Per-stage latency of every tool call: count, mean, p50/p95/p99, max.
+
+    Requires the server to run with BRAIN_METRICS=1.
+
+    Args:
+        reset: Clear the histograms after reporting
+        dump: Also append the summary as JSON lines (one per tool/stage) to
+              BRAIN_METRICS_FILE, or .mcp-metrics.jsonl in the brain root
+    """
+    report = _metrics_report()
+    if METRICS_ENABLED and dump:
+        path = Path(METRICS_FILE) if METRICS_FILE else _get_brain_root() / ".mcp-metrics.jsonl"
+        stamp = time.strftime("%Y-%m-%dT%H:%M:%S")
+        with open(path, "a", encoding="utf-8") as fh:
+            for row in _metrics_summary():
+                fh.write(json.dumps({"at": stamp, **row}) + "\n")
+        report += f"\n\nDumped to {path}"
+    if reset:
+        _METRICS.clear()
+    return report
+
+
 # ---------------------------------------------------------------------------
 # Resources
 # ---------------------------------------------------------------------------
@@ -400,7 +590,7 @@ def get_index() -> str:
 def resource_index() -> str:
     """The full INDEX-MASTER fat index — brain orientation map."""
     brain_root = _get_brain_root()
-    return brain_read_file(brain_root / INDEX_MASTER)
+    return read_index_master(brain_root)
 
 
 @mcp.resource("brain://file/{file_id}")
@@ -423,6 +613,18 @@ def resource_handoff() -> str:
     return "No SESSION-HANDOFF.md found — this may be a fresh brain."
 
 
+@mcp.resource("brain://metrics")
+def resource_metrics() -> str:
+    """Per-tool, per-stage latency percentiles since start (or last reset)."""
+    return _metrics_report()
+
+
+@mcp.resource("brain://memory")
+def resource_memory() -> str:
+    """Memory per pipeline stage, top live allocators, growth and peak RSS."""
+    return memory_report()
+
+
 # ---------------------------------------------------------------------------
 # Prompts
 # ---------------------------------------------------------------------------
@@ -7,25 +7,48 @@ Runs OUTSIDE the LLM context window to find relevant files without consuming tok
 Commands:
     brain init "<project name>"       Initialize a project-brain directory
     brain deposit --type TYPE --tags "tags"  Add a new knowledge file
+    brain deposit --from entries.jsonl       Bulk-add files from a JSONL stream
     brain search "<query>"            Search fat indexes by tags and summary
     brain recall "<task description>" Generate a RESET file for a task
     brain status                      Project overview and health check
+    brain compact                     Fold the index journal into INDEX-MASTER
     brain ingest "<source file>"      Process source material into LTM files
+    brain serve                       Keep indexes warm for the commands above
 """
 
 import argparse
+import codecs
+import contextlib
 import datetime
 import hashlib
 import io
 import json
+import math
 import os
+import random
 import re
 import shutil
+import signal
+import socket
+import stat
 import subprocess
 import sys
+import tempfile
 import textwrap
+import threading
+import time
+import traceback
+import zlib
 from pathlib import Path
 
+import brain_client
+from brain_client import DAEMON_COMMANDS, daemon_call, daemon_socket_path, recv_message
+
+# `python brain.py search ...` hands read commands to a running `brain serve`
+# before the rest of this module runs, as the `brain` entry point does
+if __name__ == "__main__" and (_served := brain_client.run_via_daemon(sys.argv[1:])) is not None:
+    sys.exit(_served)
+
 # Ensure UTF-8 output on Windows (avoids charmap encoding errors)
 # Only when running as CLI — wrapping stdout breaks MCP stdio transport
 if __name__ == "__main__" and sys.stdout.encoding != "utf-8":
@@ -39,6 +62,8 @@ if __name__ == "__main__" and sys.stdout.encoding != "utf-8":
 BRAIN_DIR_NAME = "project-brain"
 INDEX_MASTER = "knowledge/indexes/INDEX-MASTER.md"
 HASH_MANIFEST = ".content-hashes.json"
+LOCK_FILE = ".brain.lock"
+ID_RESERVATIONS_DIR = ".ids"
 
 FILE_TYPES = {
     "SPEC":  {"dir": "identity",    "space": "identity",  "purpose": "Design decisions, architecture"},
@@ -61,6 +86,54 @@ DIRECTORIES = [
 
 TODAY = datetime.date.today().isoformat()
 
+
+# ---------------------------------------------------------------------------
+# Pipeline stages — stage observers
+# ---------------------------------------------------------------------------
+#
+# pipeline_stage() marks the stages the profilers and the MCP latency
+# histograms report on. Off by default: it is then a bare generator step.
+# The memory and CPU profilers live with the CLI (see Profiling below).
+
+# Callables invoked as observer(stage name, seconds) after every pipeline
+# stage, e.g. the MCP server's latency histograms. Unlike memory accounting,
+# timed stages nest: "score" includes its "boost" and "propagate" stages.
+_STAGE_OBSERVERS: list = []
+
+
+def add_stage_observer(observer):
+    """Register observer(name, seconds) to be called after each pipeline stage."""
+    if observer not in _STAGE_OBSERVERS:
+        _STAGE_OBSERVERS.append(observer)
+
+
+def remove_stage_observer(observer):
+    with contextlib.suppress(ValueError):
+        _STAGE_OBSERVERS.remove(observer)
+
+
+@contextlib.contextmanager
+def pipeline_stage(name: str):
+    """Mark a pipeline stage for memory profiling and stage observers.
+
+    A no-op unless profiling is on or an observer is registered.
+    """
+    if _MEMORY_PROFILE is None and not _STAGE_OBSERVERS:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        if _MEMORY_PROFILE is None:
+            yield
+        else:
+            with _memory_stage(name):
+                yield
+    finally:
+        elapsed = time.perf_counter() - started
+        for observer in _STAGE_OBSERVERS:
+            observer(name, elapsed)
+
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
@@ -89,27 +162,259 @@ def require_brain_root() -> Path:
     return root
 
 
-def next_id(brain_root: Path, file_type: str) -> str:
+# Directories never scanned for brain files (tooling, caches, virtualenvs)
+SCAN_SKIP_DIRS = {"__pycache__", "node_modules"}
+
+
+def scan_brain(brain_root: Path) -> dict:
+    """Walk the brain once with os.scandir and stat each markdown file once.
+
+    Returns a snapshot dict shared by status, reindex, validate and next_id:
+      files:   {relative_path: {path, id, type, stat}} for typed brain files
+               (TYPE-*.md inside FILE_TYPES[TYPE]["dir"])
+      by_type: {file_type: [relative_path, ...]}
+      by_id:   {file_id: relative_path}
+      newest:  (path, mtime) of the most recently modified .md anywhere, or None
+    Hidden directories (.venv, .git, ...) and SCAN_SKIP_DIRS are not entered.
+    """
+    type_dirs = {}
+    for file_type, info in FILE_TYPES.items():
+        type_dirs.setdefault(info["dir"], set()).add(file_type)
+
+    files: dict[str, dict] = {}
+    by_type: dict[str, list[str]] = {file_type: [] for file_type in FILE_TYPES}
+    by_id: dict[str, str] = {}
+    newest: tuple[Path, float] | None = None
+
+    stack = [(brain_root, "")]
+    while stack:
+        dir_path, rel_dir = stack.pop()
+        try:
+            it = os.scandir(dir_path)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if not entry.name.startswith(".") and entry.name not in SCAN_SKIP_DIRS:
+                        stack.append((Path(entry.path), f"{rel_dir}/{entry.name}".lstrip("/")))
+                    continue
+                if not entry.name.endswith(".md"):
+                    continue
+                st = entry.stat()
+                if newest is None or st.st_mtime > newest[1]:
+                    newest = (Path(entry.path), st.st_mtime)
+                file_type = entry.name.split("-", 1)[0]
+                if file_type not in type_dirs.get(rel_dir, ()):
+                    continue
+                rel = f"{rel_dir}/{entry.name}"
+                file_id = entry.name[:-3].split("_")[0]
+                files[rel] = {"path": Path(entry.path), "id": file_id, "type": file_type, "stat": st}
+                by_type[file_type].append(rel)
+                by_id.setdefault(file_id, rel)
+
+    for rels in by_type.values():
+        rels.sort()
+    return {"files": files, "by_type": by_type, "by_id": by_id, "newest": newest}
+
+
+def next_id(brain_root: Path, file_type: str, snapshot: dict | None = None) -> str:
     """Find the next available ID number for a given file type."""
-    type_dir = brain_root / FILE_TYPES[file_type]["dir"]
-    existing = list(type_dir.glob(f"{file_type}-*.md"))
-    if not existing:
-        return f"{file_type}-001"
+    if snapshot is not None:
+        stems = [snapshot["files"][rel]["id"] for rel in snapshot["by_type"][file_type]]
+    else:
+        type_dir = brain_root / FILE_TYPES[file_type]["dir"]
+        try:
+            with os.scandir(type_dir) as it:
+                stems = [e.name[:-3] for e in it if e.name.startswith(f"{file_type}-") and e.name.endswith(".md")]
+        except OSError:
+            stems = []
     numbers = []
-    for f in existing:
-        match = re.match(rf"{file_type}-(\d+)", f.stem)
+    for stem_name in stems:
+        match = re.match(rf"{file_type}-(\d+)", stem_name)
         if match:
             numbers.append(int(match.group(1)))
     next_num = max(numbers) + 1 if numbers else 1
     return f"{file_type}-{next_num:03d}"
 
 
+def _type_dir_mtime(brain_root: Path, file_type: str) -> int | None:
+    try:
+        return (brain_root / FILE_TYPES[file_type]["dir"]).stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _read_id_hint(hint_path: Path) -> tuple[int | None, int | None]:
+    """(next number, type-dir mtime it was reconciled at) from `.ids/<TYPE>/next`."""
+    try:
+        fields = read_file(hint_path).split()
+        return int(fields[0]), int(fields[1]) if len(fields) > 1 else None
+    except (OSError, ValueError, IndexError):
+        return None, None
+
+
+def allocate_id(brain_root: Path, file_type: str, snapshot: dict | None = None) -> str:
+    """Atomically reserve the next ID for `file_type`, safe across processes.
+
+    Each ID is claimed by creating `.ids/<TYPE>/<NNN>` with O_CREAT|O_EXCL,
+    so two concurrent deposits can never receive the same number. A hint
+    file (`.ids/<TYPE>/next`) holds the next number and the type directory's
+    mtime when it was last reconciled with disk. While that mtime is
+    unchanged, allocation is a stat plus one O_EXCL create; once files are
+    added by hand, git pulls or other machines, the directory is rescanned
+    (via next_id). Deposits of a sibling type sharing the directory keep
+    this hint valid through note_id_written(). Reserved IDs are never reused, even if the deposit is
+    later aborted; `brain reindex` prunes the stale reservation files.
+    """
+    res_dir = brain_root / ID_RESERVATIONS_DIR / file_type
+    res_dir.mkdir(parents=True, exist_ok=True)
+    hint_path = res_dir / "next"
+    num, reconciled_at = _read_id_hint(hint_path)
+
+    dir_mtime = _type_dir_mtime(brain_root, file_type)
+    if num is None or dir_mtime is None or reconciled_at != dir_mtime:
+        on_disk = int(next_id(brain_root, file_type, snapshot).split("-")[1])
+        num = max(num or 1, on_disk)
+
+    while True:
+        try:
+            fd = os.open(res_dir / f"{num:03d}", os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            num += 1
+            continue
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            fh.write(f"pid {os.getpid()} {TODAY}\n")
+        break
+
+    # Hint is advisory — a lost race here only costs extra O_EXCL probes
+    with contextlib.suppress(OSError):
+        write_file(hint_path, f"{num + 1} {dir_mtime or 0}\n")
+    return f"{file_type}-{num:03d}"
+
+
+def note_id_written(brain_root: Path, file_type: str):
+    """Re-stamp the ID hints after writing a freshly allocated file.
+
+    The write bumps the type directory's mtime; without this the next
+    allocate_id would rescan a directory whose only change is our own file.
+    Types sharing the directory (LEARN and CODE live in knowledge/) are
+    re-stamped too, but only if their hint was reconciled at the same mtime
+    this type's was — a sibling hint that was already stale stays stale.
+    """
+    hint_path = brain_root / ID_RESERVATIONS_DIR / file_type / "next"
+    num, reconciled_at = _read_id_hint(hint_path)
+    dir_mtime = _type_dir_mtime(brain_root, file_type)
+    if num is None or dir_mtime is None:
+        return
+    with contextlib.suppress(OSError):
+        write_file(hint_path, f"{num} {dir_mtime}\n")
+    type_dir = FILE_TYPES[file_type]["dir"]
+    for sibling, info in FILE_TYPES.items():
+        if sibling == file_type or info["dir"] != type_dir:
+            continue
+        sibling_hint = brain_root / ID_RESERVATIONS_DIR / sibling / "next"
+        sibling_num, sibling_at = _read_id_hint(sibling_hint)
+        if sibling_num is not None and sibling_at == reconciled_at:
+            with contextlib.suppress(OSError):
+                write_file(sibling_hint, f"{sibling_num} {dir_mtime}\n")
+
+
+def prune_id_reservations(brain_root: Path, snapshot: dict | None = None) -> int:
+    """Delete reservation files below each type's highest ID on disk.
+
+    allocate_id never goes back below the on-disk maximum, so those
+    reservations can no longer guard anything. Returns the number removed.
+    """
+    removed = 0
+    for file_type in FILE_TYPES:
+        res_dir = brain_root / ID_RESERVATIONS_DIR / file_type
+        if not res_dir.is_dir():
+            continue
+        highest = int(next_id(brain_root, file_type, snapshot).split("-")[1]) - 1
+        with os.scandir(res_dir) as it:
+            stale = [e.path for e in it if e.name.isdigit() and int(e.name) < highest]
+        for path in stale:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(path)
+                removed += 1
+    return removed
+
+
 def read_file(path: Path) -> str:
     return path.read_text(encoding="utf-8")
 
 
 def write_file(path: Path, content: str):
-    path.write_text(content, encoding="utf-8")
+    """Write atomically: temp file in the same directory, fsync, os.replace.
+
+    Readers see either the old or the new file, never a torn one.
+    """
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            fh.write(content)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.chmod(tmp, stat.S_IMODE(path.stat().st_mode) if path.exists() else 0o644)
+        for attempt in range(10):
+            try:
+                os.replace(tmp, path)
+                break
+            except PermissionError:
+                # Windows refuses to replace a file another process has open
+                if os.name != "nt" or attempt == 9:
+                    raise
+                time.sleep(0.05)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+@contextlib.contextmanager
+def brain_lock(brain_root: Path, timeout: float = 30.0):
+    """Advisory exclusive lock on the brain (fcntl.flock / msvcrt.locking).
+
+    Hold it around every read-modify-write of INDEX files or the manifest.
+    Not re-entrant. Raises TimeoutError if not acquired within `timeout`.
+    """
+    lock_path = brain_root / LOCK_FILE
+    fh = open(lock_path, "a+b")
+    try:
+        if os.name == "nt":
+            import msvcrt
+
+            def try_lock():
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_NBLCK, 1)
+
+            def unlock():
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            def try_lock():
+                fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+            def unlock():
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                try_lock()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Timed out waiting for brain lock: {lock_path}")
+                time.sleep(0.01)
+        try:
+            yield
+        finally:
+            unlock()
+    finally:
+        fh.close()
 
 
 def get_editor() -> str:
@@ -126,11 +431,34 @@ def estimate_tokens(text: str) -> int:
     return len(text) // 4
 
 
+# Read size for streaming hashes. hashlib releases the GIL on updates larger
+# than 2 KiB, so threads hashing different files genuinely run in parallel.
+HASH_CHUNK_SIZE = 1 << 20
+
+
 def hash_file(path: Path) -> str:
-    """SHA-256 hash of file content."""
-    return hashlib.sha256(path.read_bytes()).hexdigest()
+    """SHA-256 hash of file content, streamed in HASH_CHUNK_SIZE chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        while chunk := fh.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
 
+def hash_files(paths: list[Path], workers: int | None = None) -> dict[Path, str]:
+    """Hash many files on a thread pool. Returns {path: sha256}.
 
+    `workers` defaults to the ThreadPoolExecutor default; 1 hashes serially.
+    """
+    if workers == 1 or len(paths) <= 1:
+        return {p: hash_file(p) for p in paths}
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(paths, pool.map(hash_file, paths)))
+
+
+@pipeline_stage("manifest")
 def load_manifest(brain_root: Path) -> dict:
     """Load .content-hashes.json or return empty dict."""
     manifest_path = brain_root / HASH_MANIFEST
@@ -140,35 +468,453 @@ def load_manifest(brain_root: Path) -> dict:
 
 
 def save_manifest(brain_root: Path, manifest: dict):
-    """Write .content-hashes.json."""
-    manifest_path = brain_root / HASH_MANIFEST
-    manifest_path.write_text(
-        json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8"
-    )
+    """Write .content-hashes.json (atomically; callers hold brain_lock)."""
+    write_file(brain_root / HASH_MANIFEST, json.dumps(manifest, indent=2, sort_keys=True))
 
 
-def build_manifest(brain_root: Path) -> dict:
-    """Scan all brain files and compute hashes. Returns {relative_path: {hash, id, updated}}."""
-    manifest = {}
-    for file_type, info in FILE_TYPES.items():
-        type_dir = brain_root / info["dir"]
-        if not type_dir.exists():
+def _stat_signature(st: os.stat_result) -> dict:
+    """Cache key for a file's content hash: size, mtime_ns and inode."""
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "inode": st.st_ino}
+
+
+# Content-derived manifest fields, all produced by fingerprint_file() from one
+# streamed read and cached together under the stat signature. Bump
+# FINGERPRINT_VERSION when fingerprint_file() changes how it counts, so cached
+# records are recomputed on the next reindex instead of keeping stale numbers.
+FINGERPRINT_VERSION = 2
+FINGERPRINT_FIELDS = ("fingerprint", "hash", "chars", "tokens", "lines", "sections")
+
+
+def _cached_fingerprint(cached: dict | None, signature: dict) -> dict | None:
+    """Return the cached FINGERPRINT_FIELDS if the stat signature is unchanged, else None."""
+    if (
+        cached and all(k in cached for k in FINGERPRINT_FIELDS)
+        and cached["fingerprint"] == FINGERPRINT_VERSION
+        and all(cached.get(k) == v for k, v in signature.items())
+    ):
+        return {k: cached[k] for k in FINGERPRINT_FIELDS}
+    return None
+
+
+def _manifest_record(path: Path, st: os.stat_result, fingerprint: dict) -> dict:
+    return {
+        **fingerprint,
+        "id": path.stem.split("_")[0],
+        "updated": datetime.date.fromtimestamp(st.st_mtime).isoformat(),
+        **_stat_signature(st),
+    }
+
+
+def manifest_record(path: Path, cached: dict | None = None, full: bool = False) -> dict:
+    """Build one manifest record: FINGERPRINT_FIELDS + {id, updated, size, mtime_ns, inode}.
+
+    The stat signature (size, mtime_ns, inode) acts as a cache key: if it
+    matches `cached`, the cached fingerprint is reused without
+    reading the file. `full=True` forces a re-hash regardless.
+    """
+    st = path.stat()
+    fingerprint = None if full else _cached_fingerprint(cached, _stat_signature(st))
+    return _manifest_record(path, st, fingerprint or fingerprint_file(path))
+
+
+def build_manifest(
+    brain_root: Path,
+    previous: dict | None = None,
+    full: bool = False,
+    workers: int | None = None,
+    snapshot: dict | None = None,
+) -> dict:
+    """Scan all brain files and compute content hashes and size stats.
+
+    Returns {relative_path: {hash, chars, tokens, lines, sections, id, ...}}.
+    Files whose stat signature matches their record in `previous` keep the
+    cached fingerprint; only new or changed files are re-read (in parallel
+    on `workers` threads) unless `full`. Reuses `snapshot` from scan_brain()
+    when given instead of walking the tree again.
+    """
+    previous = previous or {}
+    snapshot = snapshot or scan_brain(brain_root)
+    scanned = []  # (rel, path, stat, cached fingerprint or None)
+    for rel, rec in snapshot["files"].items():
+        st = rec["stat"]
+        cached = None if full else _cached_fingerprint(previous.get(rel), _stat_signature(st))
+        scanned.append((rel, rec["path"], st, cached))
+
+    fingerprints = fingerprint_files([f for _, f, _, cached in scanned if cached is None], workers)
+    return {
+        rel: _manifest_record(f, st, cached or fingerprints[f])
+        for rel, f, st, cached in scanned
+    }
+
+
+def disk_hashes(
+    brain_root: Path,
+    manifest: dict,
+    full: bool = False,
+    workers: int | None = None,
+    snapshot: dict | None = None,
+) -> dict[str, str]:
+    """{relative_path: sha256} of the brain's files, for read-only checks.
+
+    The hash-only counterpart of build_manifest(): a file whose stat
+    signature matches its manifest record keeps the recorded hash, the
+    rest are streamed through hash_files(). Nothing else is computed.
+    """
+    snapshot = snapshot or scan_brain(brain_root)
+    hashes = {}
+    to_hash = {}
+    for rel, rec in snapshot["files"].items():
+        cached = manifest.get(rel)
+        if not full and cached and "hash" in cached and all(
+            cached.get(k) == v for k, v in _stat_signature(rec["stat"]).items()
+        ):
+            hashes[rel] = cached["hash"]
+        else:
+            to_hash[rec["path"]] = rel
+    for path, file_hash in hash_files(list(to_hash), workers).items():
+        hashes[to_hash[path]] = file_hash
+    return hashes
+
+
+_STATS_MEMO: dict[Path, tuple[tuple, dict]] = {}
+
+
+def file_stats(brain_root: Path) -> dict[str, dict]:
+    """Size stats per file ID from the manifest, without reading file bodies.
+
+    Returns {id: {path, chars, tokens, lines, sections}} where sections are
+    dicts keyed by SECTION_FIELDS. Memoized on the manifest's stat so
+    long-lived callers (MCP server) parse it only when it changes. Records
+    written before stats were tracked are skipped until the next reindex.
+    """
+    manifest_path = brain_root / HASH_MANIFEST
+    try:
+        st = manifest_path.stat()
+    except FileNotFoundError:
+        return {}
+    key = (st.st_size, st.st_mtime_ns)
+    memo = _STATS_MEMO.get(brain_root)
+    if memo and memo[0] == key:
+        return memo[1]
+    stats = {}
+    for rel, info in load_manifest(brain_root).items():
+        if not all(k in info for k in FINGERPRINT_FIELDS):
             continue
-        for f in type_dir.glob(f"{file_type}-*.md"):
-            rel = f"{info['dir']}/{f.name}"
-            manifest[rel] = {
-                "hash": hash_file(f),
-                "id": f.stem.split("_")[0],
-                "updated": datetime.date.fromtimestamp(f.stat().st_mtime).isoformat(),
-            }
-    return manifest
+        stats[info["id"]] = {
+            "path": rel,
+            "chars": info["chars"],
+            "tokens": info["tokens"],
+            "lines": info["lines"],
+            "sections": [dict(zip(SECTION_FIELDS, row)) for row in info["sections"]],
+        }
+    _STATS_MEMO[brain_root] = (key, stats)
+    return stats
+
+
+def find_content_duplicates(
+    brain_root: Path, paths: list[Path], workers: int | None = None
+) -> dict[Path, list[str]]:
+    """Hash `paths` in parallel and match them against the manifest.
+
+    Returns {path: [matching relative paths]} for paths with at least one match.
+    """
+    by_hash: dict[str, list[str]] = {}
+    for rel, info in load_manifest(brain_root).items():
+        by_hash.setdefault(info["hash"], []).append(rel)
+    duplicates = {}
+    for path, file_hash in hash_files(paths, workers).items():
+        if file_hash in by_hash:
+            duplicates[path] = by_hash[file_hash]
+    return duplicates
 
 
 def check_content_duplicate(brain_root: Path, new_file_path: Path) -> list[str]:
     """Check if a file's content hash matches any existing file. Returns list of matching relative paths."""
-    manifest = load_manifest(brain_root)
-    new_hash = hash_file(new_file_path)
-    return [path for path, info in manifest.items() if info["hash"] == new_hash]
+    return find_content_duplicates(brain_root, [new_file_path]).get(new_file_path, [])
+
+
+# ---------------------------------------------------------------------------
+# Near-duplicate detection — MinHash signatures with LSH banding
+# ---------------------------------------------------------------------------
+
+# Word 3-gram shingles, 64 hash permutations stored as 32-bit hex (512 chars
+# per manifest record). LSH splits the signature into 16 bands of 4 rows: two
+# files become candidates when any band matches, which happens with
+# probability ~1-(1-J^4)^16 — about 0.5 at J=0.5 and >0.999 at J=0.8.
+SHINGLE_SIZE = 3
+MINHASH_PERMS = 64
+MINHASH_BANDS = 16
+MINHASH_MIN_SHINGLES = 8  # shorter bodies (fresh template stubs) get no signature
+NEAR_DUP_THRESHOLD = 0.8
+MINHASH_MAX_BYTES = 256 * 1024  # larger files are left out of near-duplicate checks
+MINHASH_BLOCK = 4096            # shingles per vectorised (perms x block) product
+
+# (a*x + b) mod p with p = 2^31-1: for 32-bit shingles every intermediate fits
+# in a uint64, so NumPy and the pure-Python fallback give identical signatures
+_MINHASH_PRIME = (1 << 31) - 1
+_minhash_rng = random.Random(20240917)  # fixed seed: signatures must be stable across runs
+MINHASH_PARAMS = [
+    (_minhash_rng.randrange(1, _MINHASH_PRIME), _minhash_rng.randrange(0, _MINHASH_PRIME))
+    for _ in range(MINHASH_PERMS)
+]
+del _minhash_rng
+# Signatures and their LSH buckets are cached in a sidecar keyed by content
+# hash and computed on first use by a near-duplicate check, not by manifest
+# builds
+MINHASH_CACHE = ".minhash-cache.json"
+MINHASH_SCHEME = f"mod31:{MINHASH_PERMS}:{SHINGLE_SIZE}"
+
+
+def shingle_words(text: str) -> list[str]:
+    """Lowercased body words, ignoring HTML comments, headings and [placeholder] lines.
+
+    Template scaffolding is dropped so two stubs from the same template do
+    not look alike; only what the author actually wrote is compared.
+    """
+    text = re.sub(r"<!--.*?-->", " ", text, flags=re.DOTALL)
+    body = [
+        line for line in text.splitlines()
+        if not line.lstrip().startswith("#") and not re.fullmatch(r"\s*\[[^\]]*\]\s*", line)
+    ]
+    return re.findall(r"[a-z0-9]+", "\n".join(body).lower())
+
+
+def minhash_signature(text: str) -> str:
+    """MinHash signature of `text` over word shingles, as a hex string.
+
+    Returns "" when the text has fewer than MINHASH_MIN_SHINGLES shingles.
+    """
+    words = shingle_words(text)
+    shingles = {
+        zlib.crc32(" ".join(words[i:i + SHINGLE_SIZE]).encode("utf-8"))
+        for i in range(len(words) - SHINGLE_SIZE + 1)
+    }
+    if len(shingles) < MINHASH_MIN_SHINGLES:
+        return ""
+    try:
+        import numpy as np
+    except ImportError:
+        return "".join(f"{min((a * x + b) % _MINHASH_PRIME for x in shingles):08x}" for a, b in MINHASH_PARAMS)
+
+    a = np.array([a for a, _ in MINHASH_PARAMS], dtype=np.uint64)[:, None]
+    b = np.array([b for _, b in MINHASH_PARAMS], dtype=np.uint64)[:, None]
+    x = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+    mins = np.full(MINHASH_PERMS, _MINHASH_PRIME, dtype=np.uint64)
+    for start in range(0, len(x), MINHASH_BLOCK):
+        block = (a * x[start:start + MINHASH_BLOCK] + b) % np.uint64(_MINHASH_PRIME)
+        np.minimum(mins, block.min(axis=1), out=mins)
+    return "".join(f"{v:08x}" for v in mins.tolist())
+
+
+def minhash_index(brain_root: Path, manifest: dict) -> tuple[dict[str, dict], dict[str, list[str]]]:
+    """({relative_path: {hash, id, minhash}}, LSH buckets) for the manifest's files.
+
+    Both live in the MINHASH_CACHE sidecar and are updated incrementally:
+    only files whose manifest hash changed are read, signed and re-bucketed,
+    records of files gone from the manifest are unbucketed, and the sidecar
+    is rewritten only when something changed. Files over MINHASH_MAX_BYTES
+    get an empty signature and no buckets.
+    """
+    cache_path = brain_root / MINHASH_CACHE
+    try:
+        cached = json.loads(read_file(cache_path))
+        if cached.get("scheme") != MINHASH_SCHEME:
+            raise ValueError(cached.get("scheme"))
+        records = {
+            # Sidecars from before the buckets were stored held [hash, signature]
+            rel: {"hash": entry[0], "id": manifest.get(rel, {}).get("id", ""), "minhash": entry[1]}
+            if isinstance(entry, list) else entry
+            for rel, entry in cached["files"].items()
+        }
+        lsh = cached["buckets"] if "buckets" in cached else build_lsh_index(records)
+        changed = "buckets" not in cached
+    except (OSError, ValueError, KeyError, AttributeError, TypeError, IndexError):
+        records, lsh, changed = {}, {}, True
+
+    def unbucket(rel: str):
+        signature = records.pop(rel)["minhash"]
+        for band in _lsh_bands(signature) if signature else ():
+            members = lsh.get(band, [])
+            with contextlib.suppress(ValueError):
+                members.remove(rel)
+            if not members:
+                lsh.pop(band, None)
+
+    for rel in [rel for rel in records if rel not in manifest]:
+        unbucket(rel)
+        changed = True
+    for rel, info in manifest.items():
+        content_hash = info.get("hash")
+        record = records.get(rel)
+        if record and record["hash"] == content_hash:
+            continue
+        path = brain_root / rel
+        try:
+            size = info["size"] if "size" in info else path.stat().st_size
+            signature = minhash_signature(read_file(path)) if size <= MINHASH_MAX_BYTES else ""
+        except (OSError, UnicodeDecodeError):
+            continue
+        if record:
+            unbucket(rel)
+        records[rel] = {"hash": content_hash, "id": info.get("id", ""), "minhash": signature}
+        lsh_add(lsh, rel, signature)
+        changed = True
+    if changed:
+        with contextlib.suppress(OSError):
+            write_file(cache_path, json.dumps({"scheme": MINHASH_SCHEME, "files": records, "buckets": lsh}))
+    return records, lsh
+
+
+def minhash_similarity(sig_a: str, sig_b: str) -> float:
+    """Estimated Jaccard similarity: the fraction of matching signature slots."""
+    if not sig_a or len(sig_a) != len(sig_b):
+        return 0.0
+    slots = range(0, len(sig_a), 8)
+    return sum(sig_a[i:i + 8] == sig_b[i:i + 8] for i in slots) / len(slots)
+
+
+# Layout of each manifest "sections" row (lists keep the manifest compact).
+SECTION_FIELDS = ("heading", "line", "lines", "chars", "tokens")
+
+
+_SECTION_SPLIT = re.compile(r"(?m)^(?=## )")
+
+
+def section_stats(text: str) -> list[list]:
+    """Per "## " section size rows, laid out as SECTION_FIELDS.
+
+    `line` is the 1-based line the section starts on; the title/frontmatter
+    preamble before the first "## " is the section with heading "".
+    """
+    sections = []
+    line = 1
+    for chunk in _SECTION_SPLIT.split(text):
+        if not chunk:
+            continue
+        heading = chunk.split("\n", 1)[0][3:].strip() if chunk.startswith("## ") else ""
+        newlines = chunk.count("\n")
+        lines = newlines + (0 if chunk.endswith("\n") else 1)
+        sections.append([heading, line, lines, len(chunk), estimate_tokens(chunk)])
+        line += newlines
+    return sections
+
+
+def fingerprint_file(path: Path) -> dict:
+    """SHA-256 and size stats of a file, streamed in HASH_CHUNK_SIZE reads.
+
+    Same numbers as hashing the whole file and running section_stats() on
+    its text, without holding the file in memory.
+    """
+    digest = hashlib.sha256()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    rows: list[list] = []  # [heading, line, newlines, chars] per section
+    newlines = chars = 0
+    last = ""
+
+    def extend(text: str):
+        nonlocal newlines, chars, last
+        for piece in _SECTION_SPLIT.split(text):
+            if not piece:
+                continue
+            if piece.startswith("## ") or not rows:
+                heading = piece.split("\n", 1)[0][3:].strip() if piece.startswith("## ") else ""
+                rows.append([heading, newlines + 1, 0, 0])
+            rows[-1][2] += piece.count("\n")
+            rows[-1][3] += len(piece)
+            newlines += piece.count("\n")
+            chars += len(piece)
+            last = piece[-1]
+
+    tail = ""
+    with open(path, "rb") as fh:
+        while chunk := fh.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+            text = tail + decoder.decode(chunk)
+            cut = text.rfind("\n") + 1  # sections only split at line starts
+            extend(text[:cut])
+            tail = text[cut:]
+    extend(tail + decoder.decode(b"", final=True))
+
+    unterminated = bool(rows) and last != "\n"
+    if unterminated:
+        rows[-1][2] += 1  # an unterminated last line still counts
+    return {
+        "fingerprint": FINGERPRINT_VERSION,
+        "hash": digest.hexdigest(),
+        "chars": chars,
+        "tokens": chars // 4,  # estimate_tokens() without the text
+        "lines": newlines + unterminated,  # len(text.splitlines()), the sum of the section rows
+        "sections": [[heading, line, count, size, size // 4] for heading, line, count, size in rows],
+    }
+
+
+def fingerprint_files(paths: list[Path], workers: int | None = None) -> dict[Path, dict]:
+    """fingerprint_file() over many files on a thread pool. Returns {path: fingerprint}."""
+    if workers == 1 or len(paths) <= 1:
+        return {p: fingerprint_file(p) for p in paths}
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(paths, pool.map(fingerprint_file, paths)))
+
+
+def _lsh_bands(signature: str) -> list[str]:
+    width = len(signature) // MINHASH_BANDS
+    return [f"{b}:{signature[b * width:(b + 1) * width]}" for b in range(MINHASH_BANDS)]
+
+
+def build_lsh_index(manifest: dict) -> dict[str, list[str]]:
+    """Bucket records by LSH band from scratch. Returns {band key: [relative paths]}."""
+    buckets: dict[str, list[str]] = {}
+    for rel, info in manifest.items():
+        if info.get("minhash"):
+            for band in _lsh_bands(info["minhash"]):
+                buckets.setdefault(band, []).append(rel)
+    return buckets
+
+
+def lsh_add(lsh: dict[str, list[str]], rel_path: str, signature: str):
+    """Add one record to an index from build_lsh_index() (e.g. within a batch)."""
+    if signature:
+        for band in _lsh_bands(signature):
+            lsh.setdefault(band, []).append(rel_path)
+
+
+def query_near_duplicates(
+    signature: str,
+    manifest: dict,
+    lsh: dict[str, list[str]],
+    threshold: float = NEAR_DUP_THRESHOLD,
+    exclude: str | None = None,
+) -> list[dict]:
+    """Near-duplicates of `signature` among the LSH candidates.
+
+    Only records sharing at least one band are compared, so the cost tracks
+    the number of similar files rather than the size of the brain.
+    Returns [{path, id, similarity}] with similarity >= threshold, best first.
+    """
+    if not signature:
+        return []
+    candidates = {rel for band in _lsh_bands(signature) for rel in lsh.get(band, ())}
+    candidates.discard(exclude)
+    matches = []
+    for rel in candidates:
+        similarity = minhash_similarity(signature, manifest[rel].get("minhash", ""))
+        if similarity >= threshold:
+            matches.append({"path": rel, "id": manifest[rel].get("id", ""), "similarity": similarity})
+    return sorted(matches, key=lambda m: (-m["similarity"], m["path"]))
+
+
+def find_near_duplicates(
+    brain_root: Path, file_path: Path, threshold: float = NEAR_DUP_THRESHOLD
+) -> list[dict]:
+    """Near-duplicates of a file (which need not be inside the brain) in the manifest."""
+    records, lsh = minhash_index(brain_root, load_manifest(brain_root))
+    try:
+        rel = file_path.resolve().relative_to(brain_root.resolve()).as_posix()
+    except ValueError:
+        rel = None
+    return query_near_duplicates(minhash_signature(read_file(file_path)), records, lsh, threshold, exclude=rel)
 
 
 def _expand_abbreviated_id(short_id: str) -> str:
@@ -343,33 +1089,77 @@ def _parse_markdown_entries(index_text: str) -> list[dict]:
     return entries
 
 
+@pipeline_stage("parse")
 def collect_all_entries(brain_root: Path) -> list[dict]:
-    """Collect fat index entries from INDEX-MASTER and all sub-indexes."""
+    """Collect fat index entries from INDEX-MASTER and all sub-indexes.
+
+    Pending index journal ops are merged in. Each entry gains an "index"
+    key naming the index file (or journal) it came from.
+    """
     entries = []
     master_path = brain_root / INDEX_MASTER
     if master_path.exists():
-        entries.extend(parse_index_entries(read_file(master_path)))
+        for entry in parse_index_entries(read_file(master_path)):
+            entry["index"] = master_path.name
+            entries.append(entry)
     index_dir = brain_root / "knowledge" / "indexes"
     if index_dir.exists():
         for idx_file in index_dir.glob("INDEX-*.md"):
             if idx_file.name == "INDEX-MASTER.md":
                 continue  # already read above
-            entries.extend(parse_index_entries(read_file(idx_file)))
-    return entries
+            for entry in parse_index_entries(read_file(idx_file)):
+                entry["index"] = idx_file.name
+                entries.append(entry)
+    return apply_index_journal(entries, read_index_journal(brain_root))
+
+
+def parse_sub_index_refs(index_text: str) -> list[dict]:
+    """Parse @SUB: lines from INDEX-MASTER.
+
+    Format: @SUB:name|file|count|member IDs|description
+    Returns dicts with keys: name, file, count, members (full IDs).
+    """
+    subs = []
+    for line in index_text.split("\n"):
+        line = line.strip()
+        if not line.startswith("@SUB:"):
+            continue
+        parts = line[len("@SUB:"):].split("|")
+        if len(parts) < 4:
+            continue
+        subs.append({
+            "name": parts[0].strip(),
+            "file": parts[1].strip(),
+            "count": int(parts[2].strip()) if parts[2].strip().isdigit() else -1,
+            "members": [lid.strip() for lid in _expand_link_ids(parts[3]).split(",") if lid.strip()],
+        })
+    return subs
 
 
 LINK_INDEX = "knowledge/indexes/LINK-INDEX.md"
 
 
+_LINK_MEMO: dict[Path, tuple[tuple, list[dict]]] = {}
+
+
+@pipeline_stage("link graph")
 def parse_link_index(brain_root: Path) -> list[dict]:
     """Parse LINK-INDEX.md into a list of edge dicts.
 
     Each dict has: source, target, type, hop_depth.
-    Returns empty list if LINK-INDEX.md doesn't exist.
+    Returns empty list if LINK-INDEX.md doesn't exist. Memoized on the
+    file's stat for long-lived callers (MCP server, `brain serve`); treat
+    the result as read-only.
     """
     link_path = brain_root / LINK_INDEX
-    if not link_path.exists():
+    try:
+        st = link_path.stat()
+    except FileNotFoundError:
         return []
+    key = (st.st_size, st.st_mtime_ns)
+    memo = _LINK_MEMO.get(brain_root)
+    if memo and memo[0] == key:
+        return memo[1]
     text = read_file(link_path)
     edges = []
     for line in text.split("\n"):
@@ -391,9 +1181,335 @@ def parse_link_index(brain_root: Path) -> list[dict]:
             "hop_depth": int(parts[3].strip()) if parts[3].strip().isdigit() else -1,
         }
         edges.append(edge)
+    _LINK_MEMO[brain_root] = (key, edges)
     return edges
 
 
+# ---------------------------------------------------------------------------
+# Graph maintenance — derived backlinks (←inlinks)
+# ---------------------------------------------------------------------------
+
+# Backlink counts at or above this get the "(N←hub)" annotation (S003/L033).
+HUB_BACKLINK_MIN = 10
+
+
+def _abbreviate_id(full_id: str) -> str:
+    """Compress a full ID to index form: LEARN-044→L044, SPEC-001→S001, etc."""
+    abbrev_prefix = {"SPEC": "S", "CODE": "C", "RULE": "R", "LEARN": "L", "LOG": "G"}
+    type_prefix, _, num = full_id.partition("-")
+    if type_prefix in abbrev_prefix and num:
+        return f"{abbrev_prefix[type_prefix]}{num}"
+    return full_id
+
+
+def _split_link_ids(links_str: str) -> list[str]:
+    """Split an expanded links string ("LEARN-001, SPEC-000") into IDs."""
+    return [lid.strip() for lid in re.split(r"[,;]+", links_str or "") if lid.strip()]
+
+
+def compute_backlinks(entries: list[dict]) -> dict[str, list[str]]:
+    """Invert the fat-index outlink adjacency once: {target_id: [source_ids]}.
+
+    Sources are listed in index order; self-links and duplicates are dropped.
+    """
+    backlinks: dict[str, list[str]] = {}
+    seen: set[tuple[str, str]] = set()
+    for entry in entries:
+        source = entry.get("id", "")
+        for target in _split_link_ids(entry.get("links", "")):
+            if target == source or (target, source) in seen:
+                continue
+            seen.add((target, source))
+            backlinks.setdefault(target, []).append(source)
+    return backlinks
+
+
+def _format_backlinks_field(current: list[str], derived: list[str]) -> str:
+    """Render a ←backlinks field, keeping the existing order of surviving IDs.
+
+    New sources are appended so incremental updates produce minimal diffs.
+    """
+    derived_set = set(derived)
+    ordered = [lid for lid in current if lid in derived_set]
+    kept = set(ordered)
+    ordered += [lid for lid in derived if lid not in kept]
+    if not ordered:
+        return "←∅"
+    field = "←" + ",".join(_abbreviate_id(lid) for lid in ordered)
+    if len(ordered) >= HUB_BACKLINK_MIN:
+        field += f" ({len(ordered)}←hub)"
+    return field
+
+
+def _index_files(brain_root: Path) -> list[Path]:
+    """INDEX-MASTER followed by all sub-indexes (INDEX-*.md)."""
+    files = []
+    master_path = brain_root / INDEX_MASTER
+    if master_path.exists():
+        files.append(master_path)
+    index_dir = brain_root / "knowledge" / "indexes"
+    if index_dir.exists():
+        files.extend(
+            f for f in sorted(index_dir.glob("INDEX-*.md"))
+            if f.name != "INDEX-MASTER.md"
+        )
+    return files
+
+
+def _rewrite_backlinks(
+    texts: dict[Path, str], affected_ids: set[str] | None = None
+) -> dict[Path, tuple[str, list[str]]]:
+    """Recompute ←backlinks across in-memory index texts.
+
+    Returns {path: (new text, [changed IDs])} for texts that changed.
+    """
+    entries = []
+    for text in texts.values():
+        entries.extend(parse_index_entries(text))
+    backlinks = compute_backlinks(entries)
+
+    changes: dict[Path, tuple[str, list[str]]] = {}
+    for path, text in texts.items():
+        if _detect_index_format(text) != "compressed":
+            continue  # legacy markdown entries have no backlinks field
+        lines = text.split("\n")
+        changed_ids = []
+        for i, line in enumerate(lines):
+            entry = _parse_compressed_entry(line.strip())
+            if entry is None:
+                continue
+            entry_id = entry["id"]
+            if affected_ids is not None and entry_id not in affected_ids:
+                continue
+            parts = line.split("|")
+            new_field = _format_backlinks_field(
+                _split_link_ids(entry["backlinks"]), backlinks.get(entry_id, [])
+            )
+            if parts[3].strip() == new_field:
+                continue
+            parts[3] = new_field
+            lines[i] = "|".join(parts)
+            changed_ids.append(entry_id)
+        if changed_ids:
+            changes[path] = ("\n".join(lines), changed_ids)
+    return changes
+
+
+def update_backlinks(
+    brain_root: Path, affected_ids: set[str] | None = None, dry_run: bool = False
+) -> dict[str, list[str]]:
+    """Rewrite derived ←backlinks fields in INDEX-MASTER and sub-indexes.
+
+    The adjacency is inverted once over all entries. Only entries in
+    `affected_ids` (default: every entry) are considered, only lines whose
+    backlinks actually change are rewritten, and each index file is written
+    at most once. Returns {relative_index_path: [changed IDs]}.
+    """
+    texts = {path: read_file(path) for path in _index_files(brain_root)}
+    changes: dict[str, list[str]] = {}
+    for path, (new_text, changed_ids) in _rewrite_backlinks(texts, affected_ids).items():
+        changes[str(path.relative_to(brain_root)).replace("\\", "/")] = changed_ids
+        if not dry_run:
+            write_file(path, new_text)
+    return changes
+
+
+# ---------------------------------------------------------------------------
+# Index journal — append-only entry mutations, folded in by `brain compact`
+# ---------------------------------------------------------------------------
+
+# Ops: {"op": "add", "id", "type", "entry": "<compressed-v1 line>"}  new entry
+#      {"op": "update", "id", "entry": "<compressed-v1 line>"}  replace an indexed entry
+#      {"op": "retire", "id"}  drop the entry from every index
+# An add of an ID that is already indexed replaces its line; an update of an
+# ID that is not indexed (e.g. retired meanwhile) is dropped rather than added.
+# Deposits append here in O(1); readers merge pending ops on load; compaction
+# folds them into the canonical markdown right after each deposit, so
+# INDEX-MASTER.md — which sessions read directly (INIT.md) — stays current.
+# Small indexes are compacted inline (a few ms); past INDEX_COMPACT_INLINE_BYTES
+# a detached `brain compact` does it so deposit latency stays constant.
+INDEX_JOURNAL = "knowledge/indexes/INDEX-MASTER.journal.jsonl"
+INDEX_JOURNAL_OPS = ("add", "update", "retire")
+INDEX_COMPACT_INLINE_BYTES = 1024 * 1024
+
+
+def journal_append(brain_root: Path, ops: list[dict]) -> int:
+    """Append index mutations to the journal in one write. Returns journal size."""
+    journal_path = brain_root / INDEX_JOURNAL
+    if not ops:  # don't leave an empty journal behind for compaction to miss
+        with contextlib.suppress(FileNotFoundError):
+            return journal_path.stat().st_size
+        return 0
+    stamp = datetime.datetime.now().isoformat(timespec="seconds")
+    payload = "".join(
+        json.dumps({**op, "ts": stamp}, ensure_ascii=False) + "\n" for op in ops
+    ).encode("utf-8")
+    with brain_lock(brain_root):
+        fd = os.open(journal_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, payload)
+            os.fsync(fd)
+            return os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+
+
+def read_index_journal(brain_root: Path) -> list[dict]:
+    """Load pending journal ops (a torn trailing line from a crash is skipped)."""
+    journal_path = brain_root / INDEX_JOURNAL
+    try:
+        text = read_file(journal_path)
+    except FileNotFoundError:
+        return []
+    ops = []
+    for line in text.splitlines():
+        try:
+            op = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(op, dict) and op.get("op") in INDEX_JOURNAL_OPS and op.get("id"):
+            ops.append(op)
+    return ops
+
+
+def apply_index_journal(entries: list[dict], ops: list[dict]) -> list[dict]:
+    """Merge pending journal ops into parsed entries (reader side)."""
+    if not ops:
+        return entries
+    merged: list[dict | None] = list(entries)
+    position = {e.get("id", ""): i for i, e in enumerate(merged)}
+    for op in ops:
+        entry_id = op["id"]
+        if op["op"] == "retire":
+            if entry_id in position:
+                merged[position.pop(entry_id)] = None
+            continue
+        entry = _parse_compressed_entry(op.get("entry", "").strip())
+        if entry is None:
+            continue
+        if entry_id in position:
+            entry["index"] = merged[position[entry_id]].get("index", INDEX_JOURNAL.rsplit("/", 1)[-1])
+            merged[position[entry_id]] = entry
+        elif op["op"] == "add":
+            entry["index"] = INDEX_JOURNAL.rsplit("/", 1)[-1]
+            position[entry_id] = len(merged)
+            merged.append(entry)
+    return [e for e in merged if e is not None]
+
+
+def _find_entry_line(texts: dict[Path, str], short_id: str) -> tuple[Path, re.Match] | None:
+    """Locate the compressed-v1 line for `short_id` across index texts."""
+    pattern = re.compile(rf"^{re.escape(short_id)}\|.*$", re.MULTILINE)
+    for path, text in texts.items():
+        match = pattern.search(text)
+        if match:
+            return path, match
+    return None
+
+
+def compact_index_journal(brain_root: Path) -> dict | None:
+    """Fold the journal into INDEX-MASTER / sub-indexes and remove it.
+
+    Ops are applied idempotently (add of an existing ID replaces its line,
+    retire of a missing ID is a no-op), so replay after a crash between the
+    index writes and the removal is safe. Each index file is written at
+    most once; backlinks of touched entries are re-derived. Returns a summary
+    dict, or None if the journal was empty.
+    """
+    with brain_lock(brain_root):
+        ops = read_index_journal(brain_root)
+        if not ops:
+            # Nothing to fold in; drop a journal holding only a torn line
+            with contextlib.suppress(FileNotFoundError):
+                (brain_root / INDEX_JOURNAL).unlink()
+            return None
+        master_path = brain_root / INDEX_MASTER
+        texts = {path: read_file(path) for path in _index_files(brain_root)}
+        new_texts = dict(texts)
+        added = updated = retired = retired_from_master = 0
+        affected: set[str] = set()
+
+        for op in ops:
+            entry_id = op["id"]
+            short_id = _abbreviate_id(entry_id)
+            found = _find_entry_line(new_texts, short_id)
+            affected.add(entry_id)
+            if found:
+                old_entry = _parse_compressed_entry(found[1].group(0).strip())
+                if old_entry:
+                    affected.update(_split_link_ids(old_entry["links"]))
+            if op["op"] == "retire":
+                if found:
+                    path, match = found
+                    end = match.end() + len(re.match(r"\n*", new_texts[path][match.end():]).group(0))
+                    new_texts[path] = new_texts[path][:match.start()] + new_texts[path][end:]
+                    retired += 1
+                    retired_from_master += path == master_path
+                continue
+            line = op.get("entry", "").strip()
+            new_entry = _parse_compressed_entry(line)
+            if new_entry is None:
+                continue
+            affected.update(_split_link_ids(new_entry["links"]))
+            if found:
+                path, match = found
+                new_texts[path] = new_texts[path][:match.start()] + line + new_texts[path][match.end():]
+                updated += 1
+            elif op["op"] == "add":
+                file_type = op.get("type") or new_entry["type"]
+                new_texts[master_path] = _insert_fat_entry(new_texts[master_path], file_type, line)
+                added += 1
+
+        new_texts[master_path], total_files = _bump_index_header(
+            new_texts[master_path], added - retired, added - retired_from_master
+        )
+        for path, (text, _ids) in _rewrite_backlinks(new_texts, affected).items():
+            new_texts[path] = text
+        for path, text in new_texts.items():
+            if text != texts[path]:
+                write_file(path, text)
+        (brain_root / INDEX_JOURNAL).unlink()
+
+    return {"ops": len(ops), "added": added, "updated": updated, "retired": retired, "total_files": total_files}
+
+
+def maybe_compact_index_journal(brain_root: Path, background: bool = True) -> str | None:
+    """Fold pending journal ops into the indexes after a deposit.
+
+    Inline while the index files total under INDEX_COMPACT_INLINE_BYTES;
+    above that (and with `background`) a detached `brain compact` process
+    does the rewrite so the caller's write latency stays constant. Returns
+    "inline", "background", or None if the journal was empty.
+    """
+    if not (brain_root / INDEX_JOURNAL).exists():
+        return None
+    index_bytes = sum(path.stat().st_size for path in _index_files(brain_root))
+    if index_bytes < INDEX_COMPACT_INLINE_BYTES or not background:
+        return "inline" if compact_index_journal(brain_root) else None
+    kwargs = {"creationflags": 0x00000008} if os.name == "nt" else {"start_new_session": True}  # DETACHED_PROCESS
+    subprocess.Popen(
+        [sys.executable, str(Path(__file__).resolve()), "compact", "--quiet"],
+        cwd=brain_root, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL, **kwargs,
+    )
+    return "background"
+
+
+def read_index_master(brain_root: Path) -> str:
+    """INDEX-MASTER text plus any pending (uncompacted) journal entries."""
+    content = read_file(brain_root / INDEX_MASTER)
+    ops = read_index_journal(brain_root)
+    if not ops:
+        return content
+    lines = [op.get("entry", "").strip() for op in ops]
+    return (
+        content.rstrip("\n")
+        + "\n\n---\n\n## Pending Entries (journal, not yet compacted)\n\n"
+        + "\n\n".join(lines)
+        + "\n"
+    )
+
+
 # ---------------------------------------------------------------------------
 # Text processing — stopwords, stemming, tokenization
 # ---------------------------------------------------------------------------
@@ -544,58 +1660,123 @@ def entry_to_corpus_doc(entry: dict) -> list[str]:
     return tokenize(" ".join(parts))
 
 
-def build_bm25_index(entries: list[dict]):
+# Parameters tuned for fat-index corpus (LEARN-030):
+# - k1=1.0 (lower than default 1.5 — short docs, term repetition rare)
+# - b=0.4  (lower than default 0.75 — entries are similar length)
+BM25_K1 = 1.0
+BM25_B = 0.4
+
+
+@pipeline_stage("bm25 build")
+def build_bm25_index(
+    entries: list[dict], corpus: list[list[str]] | None = None, k1: float = BM25_K1, b: float = BM25_B
+):
     """Build a BM25 index from fat index entries. Returns BM25Okapi instance.
 
-    Parameters tuned for fat-index corpus (LEARN-030):
-    - k1=1.0 (lower than default 1.5 — short docs, term repetition rare)
-    - b=0.4  (lower than default 0.75 — entries are similar length)
+    `corpus` is the already-tokenized entries, e.g. from the BM25 cache.
     """
     from rank_bm25 import BM25Okapi
 
-    corpus = [entry_to_corpus_doc(e) for e in entries]
-    bm25 = BM25Okapi(corpus, k1=1.0, b=0.4)
+    if corpus is None:
+        corpus = [entry_to_corpus_doc(e) for e in entries]
+    bm25 = BM25Okapi(corpus, k1=k1, b=b)
     return bm25
 
 
-def score_entries_bm25(
-    entries: list[dict], query_terms: list[str]
-) -> list[tuple[float, dict]]:
-    """Score all entries using BM25 + structural boosts + link propagation.
+# Tokenized corpus cache. Stemming every entry dominates index build time,
+# so each entry's tokens are kept in a sidecar keyed by a hash of its raw
+# index text: a deposit or hand edit only tokenizes the lines it touched.
+# Bump BM25_CACHE_SCHEME when entry_to_corpus_doc() or tokenize() change.
+# The in-process memo (long-lived MCP server) is keyed by the stat of every
+# index file and the journal, which skips even the parse while unchanged.
+BM25_CACHE = ".bm25-cache.json"
+BM25_CACHE_SCHEME = 2
+_BM25_MEMO: dict[Path, tuple[str, list[dict], object]] = {}
 
-    Returns a sorted list of (score, entry) tuples, highest first.
-    Only entries with score > 0 are included.
-    """
-    bm25 = build_bm25_index(entries)
-    query_tokens = tokenize(" ".join(query_terms))
 
-    if not query_tokens:
-        return []
+def _bm25_cache_key(brain_root: Path) -> str:
+    parts = []
+    for path in _index_files(brain_root) + [brain_root / INDEX_JOURNAL]:
+        with contextlib.suppress(FileNotFoundError):
+            st = path.stat()
+            parts.append(f"{path.name}:{st.st_size}:{st.st_mtime_ns}")
+    return "|".join(parts)
 
-    # Stage 1: BM25 scores
-    raw_scores = bm25.get_scores(query_tokens)
 
-    # Stage 2: Structural boosts (exact tag match, ID match)
+def _entry_digest(entry: dict) -> str:
+    """BM25 cache key of one entry: SHA-1 of the index text it was parsed from."""
+    return hashlib.sha1(entry.get("raw", "").encode("utf-8")).hexdigest()
+
+
+def cached_bm25_index(brain_root: Path) -> tuple[list[dict], object]:
+    """Return (entries, BM25 index) for the brain, reusing cached tokens.
+
+    Checks an in-process memo first (long-lived MCP server), then the
+    BM25_CACHE sidecar; entries missing from it are tokenized and the
+    sidecar is rewritten with exactly the current entries' tokens.
+    """
+    key = _bm25_cache_key(brain_root)
+    memo = _BM25_MEMO.get(brain_root)
+    if memo and memo[0] == key:
+        return memo[1], memo[2]
+
+    entries = collect_all_entries(brain_root)
+    digests = [_entry_digest(e) for e in entries]
+    cache_path = brain_root / BM25_CACHE
+    try:
+        cached = json.loads(cache_path.read_text(encoding="utf-8"))
+        tokens = cached["tokens"] if cached.get("scheme") == BM25_CACHE_SCHEME else {}
+    except (OSError, ValueError, KeyError, AttributeError):
+        tokens = {}
+    missing = [(digest, e) for digest, e in zip(digests, entries) if digest not in tokens]
+    if missing:
+        with pipeline_stage("tokenize"):
+            for digest, entry in missing:
+                tokens[digest] = entry_to_corpus_doc(entry)
+    if missing or len(tokens) != len(set(digests)):
+        with contextlib.suppress(OSError):
+            write_file(cache_path, json.dumps(
+                {"scheme": BM25_CACHE_SCHEME, "tokens": {digest: tokens[digest] for digest in digests}}
+            ))
+    corpus = [tokens[digest] for digest in digests]
+
+    bm25 = build_bm25_index(entries, corpus) if entries else None
+    _BM25_MEMO[brain_root] = (key, entries, bm25)
+    return entries, bm25
+
+
+def structural_boosts(entry: dict, query_terms: list[str]) -> tuple[float, float]:
+    """(tag boost, ID boost) of one entry: +5 per exact tag match, +4 per ID match."""
+    tags = [t.strip().lower() for t in entry.get("tags", "").split(",")]
+    entry_id = entry.get("id", "").lower()
+    tag_boost = id_boost = 0.0
+    for term in query_terms:
+        term_lower = term.lower()
+        # Exact tag match — curated metadata, strongest signal
+        if term_lower in tags:
+            tag_boost += 5.0
+        # ID match (e.g., searching "LEARN-008")
+        if term_lower in entry_id:
+            id_boost += 4.0
+    return tag_boost, id_boost
+
+
+@pipeline_stage("boost")
+def apply_structural_boosts(entries: list[dict], raw_scores, query_terms: list[str]) -> list[tuple[float, dict]]:
+    """Add exact tag-match (+5) and ID-match (+4) boosts to raw BM25 scores."""
     boosted = []
     for i, entry in enumerate(entries):
-        score = float(raw_scores[i])
-        for term in query_terms:
-            term_lower = term.lower()
-            # Exact tag match — curated metadata, strongest signal
-            tags = [t.strip().lower() for t in entry.get("tags", "").split(",")]
-            if term_lower in tags:
-                score += 5.0
-            # ID match (e.g., searching "LEARN-008")
-            if term_lower in entry.get("id", "").lower():
-                score += 4.0
-        boosted.append((score, entry))
-
-    # Stage 3: Link propagation — files linked by high-scoring results get a boost.
-    # This is the "neuron connection" effect: if LEARN-008 scores high and links
-    # to LEARN-005, LEARN-005 gets a relevance boost even if the query terms
-    # don't appear as strongly there.
-    id_to_score = {e.get("id", ""): s for s, e in boosted}
-    link_boost = {}
+        tag_boost, id_boost = structural_boosts(entry, query_terms)
+        boosted.append((float(raw_scores[i]) + tag_boost + id_boost, entry))
+    return boosted
+
+
+LINK_PROPAGATION = 0.15
+
+
+def link_contributions(boosted: list[tuple[float, dict]]) -> dict[str, dict[str, float]]:
+    """target ID -> {source ID: score propagated along the source's →links}."""
+    contributions: dict[str, dict[str, float]] = {}
     for score, entry in boosted:
         if score <= 0:
             continue
@@ -605,8 +1786,20 @@ def score_entries_bm25(
         linked_ids = [lid.strip() for lid in re.split(r"[,;]+", links_str) if lid.strip()]
         for lid in linked_ids:
             # Propagate a fraction of this entry's score to linked entries
-            propagated = score * 0.15
-            link_boost[lid] = link_boost.get(lid, 0.0) + propagated
+            sources = contributions.setdefault(lid, {})
+            sources[entry["id"]] = sources.get(entry["id"], 0.0) + score * LINK_PROPAGATION
+    return contributions
+
+
+@pipeline_stage("propagate")
+def propagate_link_scores(boosted: list[tuple[float, dict]]) -> list[tuple[float, dict]]:
+    """Propagate 15% of each scoring entry's score along its →links.
+
+    This is the "neuron connection" effect: if LEARN-008 scores high and links
+    to LEARN-005, LEARN-005 gets a relevance boost even if the query terms
+    don't appear as strongly there. Returns entries with score > 0, highest first.
+    """
+    link_boost = {lid: sum(sources.values()) for lid, sources in link_contributions(boosted).items()}
 
     # Apply link boosts
     final = []
@@ -620,6 +1813,720 @@ def score_entries_bm25(
     return final
 
 
+@pipeline_stage("score")
+def score_entries_bm25(
+    entries: list[dict], query_terms: list[str], bm25=None, vectors=None, trace: dict | None = None
+) -> list[tuple[float, dict]]:
+    """Score all entries using BM25 + structural boosts + link propagation.
+
+    Returns a sorted list of (score, entry) tuples, highest first.
+    Only entries with score > 0 are included. Pass `bm25` (built over the
+    same `entries`, e.g. from cached_bm25_index) to skip building the index.
+    Pass `vectors` (row-aligned with `entries`, from cached_embeddings) to
+    add the semantic stage: the scores are then fused scores (see
+    fuse_hybrid) and entries found only by the vector stage are included
+    too. Pass a `trace` dict to keep each stage's output for
+    explain_search: {tokens, boosted, lexical, vector}.
+    """
+    bm25 = bm25 or build_bm25_index(entries)
+    query_tokens = tokenize(" ".join(query_terms))
+    if trace is not None:
+        trace.update(tokens=query_tokens, boosted=[], lexical=[], vector=None)
+
+    if not query_tokens:
+        return []
+
+    # Stage 1: BM25 scores
+    with pipeline_stage("bm25 score"):
+        raw_scores = bm25.get_scores(query_tokens)
+    # Stage 2: Structural boosts (exact tag match, ID match)
+    boosted = apply_structural_boosts(entries, raw_scores, query_terms)
+    # Stage 3: Link propagation
+    final = propagate_link_scores(boosted)
+    if trace is not None:
+        trace.update(boosted=boosted, lexical=final)
+
+    # Stage 4: Semantic stage — hashed-embedding neighbours, fused by score
+    if vectors is not None:
+        neighbours = vector_search(vectors, entries, query_terms)
+        if trace is not None:
+            trace["vector"] = neighbours
+        final = fuse_hybrid(final, neighbours)
+    return final
+
+
+# ---------------------------------------------------------------------------
+# Semantic stage — hashed n-gram embeddings, brute-force top-k, score fusion
+# ---------------------------------------------------------------------------
+#
+# No model and no network: each text becomes a signed feature-hashing
+# vector of its stemmed words plus the character trigrams of each word, so
+# inflections, compounds and shared word parts ("dedup" / "deduplication")
+# land near each other even when BM25's exact tokens miss. Vectors are
+# built by `brain reindex --vectors` into EMBED_CACHE and searched with one
+# matrix product. Fusion is by score, not rank: lexical scores are scaled to
+# the best one and each neighbour's cosine is added at EMBED_FUSION_WEIGHT,
+# so BM25's margins survive and the vectors settle near-ties and surface
+# files BM25 misses. Rank fusion (RRF), even weighted 4:1 toward BM25, cost
+# MRR on benchmarks/search_eval.py; this fusion raises nDCG@10 (.480 → .493)
+# and recall@10 (.496 → .504) over lexical search at equal MRR (.782 → .784).
+# The stage stays opt-in (search/recall --hybrid, MCP hybrid=True) because
+# it needs the vector cache.
+
+EMBED_DIMS = 512
+EMBED_TRIGRAM_WEIGHT = 0.5
+EMBED_BODY_WEIGHT = 0.5  # file body vs. the curated fat-index entry
+EMBED_BODY_CHARS = 20_000
+EMBED_TOP_K = 20
+EMBED_MIN_SIMILARITY = 0.2  # weaker neighbours are noise, not evidence
+EMBED_FUSION_WEIGHT = 0.3   # cosine bonus on the 0-1 scaled lexical score
+EMBED_PARAMS = f"hashed-v1:{EMBED_DIMS}:{EMBED_TRIGRAM_WEIGHT}:{EMBED_BODY_WEIGHT}"
+EMBED_CACHE = ".embed-cache.npz"
+_EMBED_MEMO: dict[Path, tuple] = {}
+
+
+def _embed_features(text: str, features: dict[int, float]):
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    counts: dict[str, int] = {}
+    for word in words:
+        if word not in STOPWORDS and len(word) > 1:
+            counts[word] = counts.get(word, 0) + 1
+    for word, count in counts.items():
+        tf = 1.0 + math.log(count)  # sublinear, so repeated words don't dominate
+        grams = [f"w:{stem(word)}"]
+        padded = f"#{word}#"
+        grams += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+        for n, gram in enumerate(grams):
+            h = zlib.crc32(gram.encode())
+            bucket = (h >> 1) % EMBED_DIMS
+            value = tf if n == 0 else tf * EMBED_TRIGRAM_WEIGHT / (len(grams) - 1)
+            features[bucket] = features.get(bucket, 0.0) + (value if h & 1 else -value)
+
+
+def embed_text(text: str, body: str = ""):
+    """Hashed-feature embedding of `text`, L2-normalised float32.
+
+    A `body` is embedded separately and added at EMBED_BODY_WEIGHT, so a
+    long file body enriches the curated entry without drowning it.
+    """
+    import numpy as np
+
+    vec = np.zeros(EMBED_DIMS, dtype=np.float32)
+    for part, weight in ((text, 1.0), (body[:EMBED_BODY_CHARS], EMBED_BODY_WEIGHT)):
+        features: dict[int, float] = {}
+        _embed_features(part, features)
+        if features:
+            part_vec = np.zeros(EMBED_DIMS, dtype=np.float32)
+            part_vec[list(features)] = list(features.values())
+            vec += weight * part_vec / np.linalg.norm(part_vec)
+    norm = float(np.linalg.norm(vec))
+    return vec / norm if norm else vec
+
+
+def _entry_embed_text(entry: dict) -> str:
+    return " ".join(entry.get(k, "") for k in ("id", "tags", "summary", "decisions"))
+
+
+def _entry_body(brain_root: Path, entry: dict, stats: dict) -> str:
+    record = stats.get(entry["id"])
+    path = brain_root / record["path"] if record else None
+    return read_file(path) if path and path.exists() else ""
+
+
+def _load_embed_cache(brain_root: Path):
+    """(ids, keys, matrix) from EMBED_CACHE, or None if missing or stale params."""
+    import numpy as np
+
+    try:
+        with np.load(brain_root / EMBED_CACHE, allow_pickle=False) as data:
+            if str(data["params"]) != EMBED_PARAMS:
+                return None
+            return data["ids"].tolist(), data["keys"].tolist(), data["matrix"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def build_embeddings(brain_root: Path) -> tuple[int, int]:
+    """Embed every index entry (with its file body) into EMBED_CACHE.
+
+    Called by `brain reindex --vectors`, and by every reindex once the cache
+    exists. Rows are keyed by the entry text and the file's manifest hash,
+    so only new or changed entries are re-embedded.
+    Returns (vectors written, vectors re-embedded), or (-1, 0) if NumPy is
+    unavailable (the semantic stage then stays off).
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        return -1, 0
+    entries = collect_all_entries(brain_root)
+    stats = file_stats(brain_root)
+    hashes = {info["id"]: info["hash"] for info in load_manifest(brain_root).values() if "id" in info}
+    previous = _load_embed_cache(brain_root)
+    old_rows = {}
+    if previous:
+        old_rows = {(i, k): row for row, (i, k) in enumerate(zip(previous[0], previous[1]))}
+
+    keys, embedded = [], 0
+    matrix = np.zeros((len(entries), EMBED_DIMS), dtype=np.float32)
+    for i, entry in enumerate(entries):
+        text = _entry_embed_text(entry)
+        key = hashlib.sha256(f"{text}|{hashes.get(entry['id'], '')}".encode()).hexdigest()[:16]
+        keys.append(key)
+        row = old_rows.get((entry["id"], key))
+        if row is not None:
+            matrix[i] = previous[2][row]
+        else:
+            matrix[i] = embed_text(text, _entry_body(brain_root, entry, stats))
+            embedded += 1
+
+    fd, tmp = tempfile.mkstemp(dir=brain_root, prefix=f"{EMBED_CACHE}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            np.savez(fh, params=np.array(EMBED_PARAMS), ids=np.array([e["id"] for e in entries]),
+                     keys=np.array(keys), matrix=matrix)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, brain_root / EMBED_CACHE)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp)
+        raise
+    _EMBED_MEMO.pop(brain_root, None)
+    return len(entries), embedded
+
+
+@pipeline_stage("embeddings")
+def cached_embeddings(brain_root: Path, entries: list[dict]):
+    """Return a vector matrix row-aligned with `entries`, or None.
+
+    None (BM25 only) when NumPy is missing or `brain reindex --vectors` has
+    not built EMBED_CACHE yet. Entries deposited since the last reindex are embedded
+    from their index entry alone; the result is memoized per entry list.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    cache_path = brain_root / EMBED_CACHE
+    try:
+        st = cache_path.stat()
+    except FileNotFoundError:
+        return None
+    ids = tuple(e["id"] for e in entries)
+    key = (st.st_size, st.st_mtime_ns, ids)
+    memo = _EMBED_MEMO.get(brain_root)
+    if memo and memo[0] == key:
+        return memo[1]
+    cached = _load_embed_cache(brain_root)
+    if cached is None:
+        return None
+    rows = {file_id: i for i, file_id in enumerate(cached[0])}
+    stored = cached[2]
+    matrix = np.empty((len(entries), EMBED_DIMS), dtype=np.float32)
+    for i, entry in enumerate(entries):
+        row = rows.get(entry["id"])
+        matrix[i] = stored[row] if row is not None else embed_text(_entry_embed_text(entry))
+    _EMBED_MEMO[brain_root] = (key, matrix)
+    return matrix
+
+
+def hybrid_vectors(brain_root: Path, entries: list[dict]):
+    """cached_embeddings() for --hybrid, with a note when there is no cache."""
+    vectors = cached_embeddings(brain_root, entries)
+    if vectors is None:
+        print("NOTE: no vector cache (run `brain reindex --vectors`); searching BM25 only.", file=sys.stderr)
+    return vectors
+
+
+@pipeline_stage("vector search")
+def vector_search(
+    vectors, entries: list[dict], query_terms: list[str], k: int = EMBED_TOP_K
+) -> list[tuple[float, dict]]:
+    """Brute-force cosine top-k: one matrix-vector product plus argpartition."""
+    import numpy as np
+
+    if not len(entries):
+        return []
+    sims = vectors @ embed_text(" ".join(query_terms))
+    k = min(k, len(sims))
+    top = np.argpartition(-sims, k - 1)[:k]
+    top = top[np.argsort(-sims[top])]
+    return [(float(sims[i]), entries[i]) for i in top if sims[i] >= EMBED_MIN_SIMILARITY]
+
+
+def fuse_hybrid(
+    lexical: list[tuple[float, dict]], neighbours: list[tuple[float, dict]], weight: float = EMBED_FUSION_WEIGHT
+) -> list[tuple[float, dict]]:
+    """Score fusion: lexical score / best lexical score + `weight` x cosine.
+
+    `lexical` is the ranked output of the lexical stages, `neighbours` that
+    of vector_search. A file found by the vector stage alone scores only its
+    cosine bonus, so it ranks below every file with lexical evidence unless
+    that evidence is weak.
+    """
+    top = lexical[0][0] if lexical and lexical[0][0] > 0 else 1.0
+    fused = {entry["id"]: [score / top, entry] for score, entry in lexical}
+    for similarity, entry in neighbours:
+        fused.setdefault(entry["id"], [0.0, entry])[0] += weight * similarity
+    return sorted(((score, entry) for score, entry in fused.values()), key=lambda x: x[0], reverse=True)
+
+
+# ---------------------------------------------------------------------------
+# Explain — per-result score decomposition and stage timings
+# ---------------------------------------------------------------------------
+#
+# `brain search --explain`, `brain recall --explain` and
+# search_brain(explain=True) break each top result's score down from the
+# stage outputs score_entries_bm25 kept in its `trace`: BM25 per query
+# token, tag and ID boosts, link propagation by source, and with vectors
+# the lexical score and cosine that were fused. No stage runs twice, so the stage timings and
+# the MCP latency histograms see each stage once per query.
+
+EXPLAIN_TOP = 10
+
+
+@contextlib.contextmanager
+def record_stage_timings():
+    """Collect (stage, seconds) for every pipeline stage that ends in the block."""
+    timings: list[tuple[str, float]] = []
+
+    def observer(name: str, seconds: float):
+        timings.append((name, seconds))
+
+    add_stage_observer(observer)
+    try:
+        yield timings
+    finally:
+        remove_stage_observer(observer)
+
+
+def bm25_term_scores(bm25, index: int, query_tokens: list[str]) -> dict[str, float]:
+    """BM25 contribution of each query token to document `index`.
+
+    Same formula as BM25Okapi.get_scores, so the values sum to its score.
+    """
+    freqs = bm25.doc_freqs[index]
+    norm = bm25.k1 * (1 - bm25.b + bm25.b * bm25.doc_len[index] / bm25.avgdl)
+    scores: dict[str, float] = {}
+    for token in query_tokens:
+        freq = freqs.get(token, 0)
+        scores[token] = scores.get(token, 0.0) + (bm25.idf.get(token) or 0) * freq * (bm25.k1 + 1) / (freq + norm)
+    return scores
+
+
+def explain_search(
+    entries: list[dict],
+    query_terms: list[str],
+    scored: list[tuple[float, dict]],
+    bm25,
+    trace: dict,
+    timings: list[tuple[str, float]] = (),
+    top: int = EXPLAIN_TOP,
+) -> dict:
+    """Explain payload for the first `top` results of score_entries_bm25.
+
+    `bm25` and `trace` are the index and trace dict that ranking call used.
+    {query_terms, tokens, hybrid, stages: [{stage, ms}], results: [{rank, id,
+    score, bm25: {token: score}, bm25_total, tag_boost, id_boost,
+    propagated: {source ID: score}, lexical, lexical_rank, vector, vector_rank}]}.
+    `lexical` is BM25 + boosts + propagation; with vectors, `score` is
+    fuse_hybrid's scaled lexical score plus the weighted `vector` cosine.
+    """
+    query_tokens = trace.get("tokens", [])
+    position = {id(entry): i for i, entry in enumerate(entries)}
+    contributions = link_contributions(trace.get("boosted", []))
+    lexical_ranks = {e["id"]: (rank, score) for rank, (score, e) in enumerate(trace.get("lexical", []), 1)}
+    vector_ranks = {e["id"]: (rank, sim) for rank, (sim, e) in enumerate(trace.get("vector") or [], 1)}
+
+    results = []
+    for rank, (score, entry) in enumerate(scored[:top], 1):
+        terms = bm25_term_scores(bm25, position[id(entry)], query_tokens)
+        tag_boost, id_boost = structural_boosts(entry, query_terms)
+        lexical_rank, lexical = lexical_ranks.get(entry["id"], (None, 0.0))
+        vector_rank, vector = vector_ranks.get(entry["id"], (None, None))
+        results.append({
+            "rank": rank,
+            "id": entry["id"],
+            "score": score,
+            "bm25": terms,
+            "bm25_total": sum(terms.values()),
+            "tag_boost": tag_boost,
+            "id_boost": id_boost,
+            "propagated": contributions.get(entry["id"], {}),
+            "lexical": lexical,
+            "lexical_rank": lexical_rank,
+            "vector": vector,
+            "vector_rank": vector_rank,
+        })
+    return {
+        "query_terms": query_terms,
+        "tokens": query_tokens,
+        "hybrid": trace.get("vector") is not None,
+        "stages": [{"stage": name, "ms": seconds * 1e3} for name, seconds in timings],
+        "results": results,
+    }
+
+
+def format_explanation(payload: dict) -> str:
+    """Render an explain_search payload as text."""
+    mode = "BM25 + boosts + link propagation" + (", fused with vectors" if payload["hybrid"] else "")
+    lines = [f"Explain: tokens [{', '.join(payload['tokens'])}] — {mode}", ""]
+    for r in payload["results"]:
+        lines.append(f"{r['rank']:>2}. {r['id']}  score {r['score']:.3f}")
+        terms = ", ".join(f"{token} {value:.2f}" for token, value in r["bm25"].items() if value)
+        lines.append(f"      bm25       {r['bm25_total']:7.2f}" + (f"  ({terms})" if terms else ""))
+        lines.append(f"      tag boost  {r['tag_boost']:+7.2f}   id boost {r['id_boost']:+.2f}")
+        if r["propagated"]:
+            sources = ", ".join(f"{src} {value:.2f}" for src, value in
+                                sorted(r["propagated"].items(), key=lambda kv: -kv[1]))
+            lines.append(f"      links      {sum(r['propagated'].values()):+7.2f}  (← {sources})")
+        if payload["hybrid"]:
+            lexical = f"#{r['lexical_rank']} ({r['lexical']:.2f})" if r["lexical_rank"] else "-"
+            vector = f"#{r['vector_rank']} (cos {r['vector']:.2f})" if r["vector_rank"] else "-"
+            lines.append(f"      fused      lexical {lexical}, vector {vector}")
+    if payload["stages"]:
+        lines += ["", "Stage timings (in completion order; score includes its sub-stages):"]
+        lines += [f"  {s['stage']:<16} {s['ms']:9.2f} ms" for s in payload["stages"]]
+    return "\n".join(lines)
+
+
+# ---------------------------------------------------------------------------
+# Link suggestions — BM25 neighbours + LINK-INDEX relationship statistics
+# ---------------------------------------------------------------------------
+
+LINK_SUGGESTIONS_DEFAULT = 3  # SCHEMAS links_min for LEARN/SPEC/CODE
+LINK_QUERY_BODY_TERMS = 12
+
+
+def link_type_stats(edges: list[dict]) -> dict[tuple[str, str], dict[str, int]]:
+    """Count LINK-INDEX relationship types per (source type, target type) pair."""
+    stats: dict[tuple[str, str], dict[str, int]] = {}
+    for edge in edges:
+        pair = (edge["source"].split("-")[0], edge["target"].split("-")[0])
+        counts = stats.setdefault(pair, {})
+        counts[edge["type"]] = counts.get(edge["type"], 0) + 1
+    return stats
+
+
+def likely_link_type(stats: dict, source_type: str, target_id: str) -> str:
+    """Most common relationship from `source_type` files to the target's type."""
+    counts = stats.get((source_type, target_id.split("-")[0]))
+    if not counts:
+        return "extends"  # LINK-INDEX default
+    return max(sorted(counts), key=counts.get)
+
+
+def salient_words(text: str, n: int) -> list[str]:
+    """The `n` most frequent non-stopword body words of `text`."""
+    counts: dict[str, int] = {}
+    for word in shingle_words(text):
+        if len(word) > 2 and word not in STOPWORDS and not word.isdigit():
+            counts[word] = counts.get(word, 0) + 1
+    return sorted(counts, key=lambda w: (-counts[w], w))[:n]
+
+
+def link_query_terms(title: str, tags: str, text: str = "") -> list[str]:
+    """Query for a new file: title and tags plus its most frequent body words."""
+    terms = re.findall(r"[\w-]+", f"{title} {tags.replace(',', ' ')}")
+    return terms + salient_words(text, LINK_QUERY_BODY_TERMS)
+
+
+def suggest_links(
+    brain_root: Path, file_id: str, query_terms: list[str], k: int = LINK_SUGGESTIONS_DEFAULT
+) -> list[dict]:
+    """Top-k existing entries most similar to a new file, as proposed →links.
+
+    Scores with score_entries_bm25 over the cached index. Returns
+    [{id, relation, score}], where relation is the type LINK-INDEX most
+    often uses between these two file types.
+    """
+    if k <= 0:
+        return []
+    entries, bm25 = cached_bm25_index(brain_root)
+    if not entries or not query_terms:
+        return []
+    stats = link_type_stats(parse_link_index(brain_root))
+    source_type = file_id.split("-")[0]
+    suggestions = []
+    for score, entry in score_entries_bm25(entries, query_terms, bm25):
+        if entry["id"] == file_id or entry.get("type") == "RESET":
+            continue
+        suggestions.append({
+            "id": entry["id"],
+            "relation": likely_link_type(stats, source_type, entry["id"]),
+            "score": round(score, 2),
+        })
+        if len(suggestions) == k:
+            break
+    return suggestions
+
+
+# ---------------------------------------------------------------------------
+# Recall packing — relevance per token under a context budget
+# ---------------------------------------------------------------------------
+
+RECALL_TOP_FILES = 10        # without --budget: plain top-N, as before
+RECALL_CANDIDATES = 50       # top hits considered for packing under --budget
+RESET_FILE_TOKENS = 500      # estimate for the RESET file itself
+USABLE_CONTEXT_TOKENS = 140000
+KNAPSACK_RESOLUTION = 1000   # DP capacity steps; weights round up to budget/1000
+
+
+def recall_candidates(
+    brain_root: Path,
+    scored: list[tuple[float, dict]],
+    stats: dict[str, dict],
+    sections: bool = False,
+    query_terms: list[str] | tuple = (),
+) -> list[dict]:
+    """Turn scored entries into packing items sized from file_stats().
+
+    Items: {id, entry, score, rank, path, heading, order, tokens, lines, value},
+    plus the file's section count as "sections" on section items.
+    A whole file is one item (heading None) worth its score. With `sections`,
+    each "## " section is an item worth its token share of the file's score,
+    doubled when the heading matches the query. Sizes come from the
+    manifest; only files deposited since the last reindex are read. Entries
+    with no file on disk get path None.
+    """
+    query_tokens = set(tokenize(" ".join(query_terms)))
+    items = []
+    for rank, (score, entry) in enumerate(scored):
+        base = {"id": entry["id"], "entry": entry, "score": score, "rank": rank, "order": 0}
+        record = stats.get(entry["id"])
+        if record is None:
+            matches = sorted(brain_root.glob(f"{entry.get('file', '')}_*.md"))
+            if not matches:
+                items.append({**base, "path": None, "heading": None, "tokens": 0, "lines": 0, "value": 0.0})
+                continue
+            fingerprint = fingerprint_file(matches[0])
+            record = {
+                "path": matches[0].relative_to(brain_root).as_posix(),
+                **fingerprint,
+                "sections": [dict(zip(SECTION_FIELDS, row)) for row in fingerprint["sections"]],
+            }
+        base["path"] = record["path"]
+        parts = record["sections"] if sections else None
+        if not parts:
+            items.append({**base, "heading": None, "tokens": record["tokens"],
+                          "lines": record["lines"], "value": score})
+            continue
+        total = sum(part["tokens"] for part in parts) or 1
+        base["sections"] = len(parts)
+        for order, part in enumerate(parts):
+            value = score * part["tokens"] / total
+            if query_tokens & set(tokenize(part["heading"])):
+                value *= 2
+            items.append({**base, "heading": part["heading"], "order": order,
+                          "tokens": part["tokens"], "lines": part["lines"], "value": value})
+    return items
+
+
+def pack_budget(items: list[dict], budget: int) -> list[dict]:
+    """0/1 knapsack: the items with the most total value in `budget` tokens.
+
+    Greedy by value per token (or the best single item, if worth more) is
+    the fast 1/2-approximation; a DP over token weights rounded up to
+    budget/KNAPSACK_RESOLUTION is always feasible and usually better.
+    Returns the higher-valued selection, by descending score.
+    """
+    fits = [it for it in items if it["path"] and it["tokens"] <= budget]
+    if not fits:
+        return []
+
+    greedy, used = [], 0
+    for it in sorted(fits, key=lambda it: it["value"] / max(it["tokens"], 1), reverse=True):
+        if used + it["tokens"] <= budget:
+            greedy.append(it)
+            used += it["tokens"]
+    best_single = max(fits, key=lambda it: it["value"])
+    if best_single["value"] > sum(it["value"] for it in greedy):
+        greedy = [best_single]
+
+    unit = max(1, -(-budget // KNAPSACK_RESOLUTION))
+    capacity = budget // unit
+    weights = [-(-it["tokens"] // unit) for it in fits]
+    best = [0.0] * (capacity + 1)
+    taken = []
+    for it, weight in zip(fits, weights):
+        row = bytearray(capacity + 1)
+        for c in range(capacity, weight - 1, -1):
+            candidate = best[c - weight] + it["value"]
+            if candidate > best[c]:
+                best[c] = candidate
+                row[c] = 1
+        taken.append(row)
+    dp, c = [], capacity
+    for i in range(len(fits) - 1, -1, -1):
+        if taken[i][c]:
+            dp.append(fits[i])
+            c -= weights[i]
+
+    chosen = max((dp, greedy), key=lambda sel: sum(it["value"] for it in sel))
+    return sorted(chosen, key=lambda it: (it["rank"], it["order"]))
+
+
+# ---------------------------------------------------------------------------
+# Ingestion — streaming, heading-chunked source processing
+# ---------------------------------------------------------------------------
+
+INGEST_CHUNK_MAX_TOKENS = 2000  # longer sections are split at a paragraph break
+INGEST_CHUNK_MIN_TOKENS = 50    # shorter sections fold into the next one
+INGEST_KNOWN_COVERAGE = 0.6     # share of a chunk's key terms its best brain match already has
+INGEST_MAX_STUBS = 10           # "a 40-page chapter should become ~5 files"
+INGEST_TEXT_BLOCK_LINES = 200   # text sources stream in blocks of about this many lines
+INGEST_STUB_TAGS = 5
+
+_PDF_DOCS: dict[str, object] = {}  # open documents, per pool worker
+
+
+def _pdf_page_markdown(job: tuple[str, int]) -> str:
+    """Convert one PDF page to markdown with pymupdf4llm (process-pool worker)."""
+    import pymupdf
+    import pymupdf4llm
+
+    path, page = job
+    doc = _PDF_DOCS.get(path)
+    if doc is None:
+        doc = _PDF_DOCS[path] = pymupdf.open(path)
+    return pymupdf4llm.to_markdown(doc, pages=[page], show_progress=False)
+
+
+def _bounded_map(pool, fn, jobs, window: int):
+    """Like pool.map, in order, but with at most `window` tasks in flight."""
+    from collections import deque
+
+    pending = deque()
+    for job in jobs:
+        pending.append(pool.submit(fn, job))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def iter_source_pages(source_path: Path, workers: int | None = None):
+    """Yield (position, markdown) blocks of a source without loading it whole.
+
+    PDFs are converted page by page on a process pool, at most 2x workers
+    pages in flight; position is the 1-based page. Anything else is read
+    as text, INGEST_TEXT_BLOCK_LINES lines at a time (cut at a blank line);
+    position is the block's first line.
+    """
+    if source_path.suffix.lower() != ".pdf":
+        with open(source_path, encoding="utf-8", errors="replace") as fh:
+            block, start = [], 1
+            for line_no, line in enumerate(fh, 1):
+                block.append(line)
+                if len(block) >= INGEST_TEXT_BLOCK_LINES and not line.strip():
+                    yield start, "".join(block)
+                    block, start = [], line_no + 1
+            if block:
+                yield start, "".join(block)
+        return
+
+    import pymupdf
+    from concurrent.futures import ProcessPoolExecutor
+
+    with pymupdf.open(source_path) as doc:
+        page_count = doc.page_count
+    jobs = ((str(source_path), page) for page in range(page_count))
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for page, job in enumerate(jobs, 1):
+            yield page, _pdf_page_markdown(job)
+        _PDF_DOCS.pop(str(source_path), None)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from enumerate(_bounded_map(pool, _pdf_page_markdown, jobs, 2 * workers), 1)
+
+
+def chunk_on_headings(pages, line_positions: bool = False):
+    """Re-cut streamed blocks into heading-led chunks.
+
+    Yields {heading, start, end, text, tokens}. A chunk starts at each
+    #/##/### heading once the current one holds INGEST_CHUNK_MIN_TOKENS,
+    and is split at a blank line past INGEST_CHUNK_MAX_TOKENS. start/end
+    are pages, or lines when `line_positions` (text sources).
+    """
+    heading, start, last, lines, chars = "", None, None, [], 0
+    in_fence = False  # "# comments" inside ``` blocks are not headings
+
+    def emit():
+        text = "".join(lines)
+        return {"heading": heading, "start": start, "end": last, "text": text,
+                "tokens": estimate_tokens(text)}
+
+    for page_start, text in pages:
+        for offset, line in enumerate(text.splitlines(keepends=True)):
+            position = page_start + offset if line_positions else page_start
+            if line.lstrip().startswith("```"):
+                in_fence = not in_fence
+            match = None if in_fence else re.match(r"#{1,3}\s+(.+)", line)
+            if match and chars // 4 >= INGEST_CHUNK_MIN_TOKENS:
+                yield emit()
+                heading, start, lines, chars = "", None, [], 0
+            elif not line.strip() and chars // 4 >= INGEST_CHUNK_MAX_TOKENS:
+                yield emit()
+                heading, start, lines, chars = f"{heading} (cont.)".strip(), None, [], 0
+            if match and not heading:
+                heading = match.group(1).strip("#* ").strip()
+            if start is None:
+                start = position
+            last = position
+            lines.append(line)
+            chars += len(line)
+    if "".join(lines).strip():
+        yield emit()
+
+
+def ingest_context(brain_root: Path) -> dict:
+    """Everything assess_chunk() compares against, loaded once per ingest."""
+    entries, bm25 = cached_bm25_index(brain_root)
+    records, lsh = minhash_index(brain_root, load_manifest(brain_root))
+    return {
+        "brain_root": brain_root,
+        "entries": entries,
+        "bm25": bm25,
+        "minhash": records,
+        "lsh": lsh,
+        "stats": file_stats(brain_root),
+        "bodies": {},  # id -> token set of matched brain files, read on first match
+    }
+
+
+def _body_tokens(ctx: dict, file_id: str) -> set[str]:
+    if file_id not in ctx["bodies"]:
+        record = ctx["stats"].get(file_id)
+        path = ctx["brain_root"] / record["path"] if record else None
+        ctx["bodies"][file_id] = set(tokenize(read_file(path))) if path and path.exists() else set()
+    return ctx["bodies"][file_id]
+
+
+def assess_chunk(chunk: dict, ctx: dict) -> dict:
+    """Score a chunk against the brain: is this material already known?
+
+    Known when a brain file is a MinHash near-duplicate of the chunk, or when
+    one of the top 3 BM25 matches (fat-index entry or file body) already
+    contains INGEST_KNOWN_COVERAGE of the chunk's key terms.
+    Returns {matches, coverage, near, known}.
+    """
+    terms = link_query_terms(chunk["heading"], "", chunk["text"])
+    scored = score_entries_bm25(ctx["entries"], terms, ctx["bm25"])[:3] if ctx["entries"] else []
+    key_terms = set(tokenize(" ".join(terms)))
+    coverage = 0.0
+    for _, entry in scored if key_terms else ():
+        known_terms = set(entry_to_corpus_doc(entry)) | _body_tokens(ctx, entry["id"])
+        coverage = max(coverage, len(key_terms & known_terms) / len(key_terms))
+    near = query_near_duplicates(minhash_signature(chunk["text"]), ctx["minhash"], ctx["lsh"])
+    return {
+        "matches": [entry["id"] for _, entry in scored],
+        "coverage": coverage,
+        "near": near[0] if near else None,
+        "known": bool(near) or coverage >= INGEST_KNOWN_COVERAGE,
+    }
+
+
 # ---------------------------------------------------------------------------
 # Commands
 # ---------------------------------------------------------------------------
@@ -820,34 +2727,381 @@ def cmd_init(args):
 
     ## Brain Skills
 
-    - `/brain-search <query>` — Search fat indexes, return ranked results without opening files
-    - `/brain-deposit [TYPE] [desc]` — Guided deposit with dedup check
-    - `/brain-handoff` — Write SESSION-HANDOFF.md immediately
-    - `/brain-checkpoint` — Scan for undeposited knowledge, add to queue
-    - `/brain-status` — File counts, orphans, index health
+    - `/brain-search <query>` — Search fat indexes, return ranked results without opening files
+    - `/brain-deposit [TYPE] [desc]` — Guided deposit with dedup check
+    - `/brain-handoff` — Write SESSION-HANDOFF.md immediately
+    - `/brain-checkpoint` — Scan for undeposited knowledge, add to queue
+    - `/brain-status` — File counts, orphans, index health
+
+    ## Stop Rules
+
+    - Two failures on same approach → stop, explain, ask for direction.
+    - Going in circles → write SESSION-HANDOFF.md, tell the user.
+    - If you haven't searched the brain, you haven't started.
+    """)
+    write_file(claude_md_path, claude_content)
+    print("Created CLAUDE.md with Identity & Purpose section.")
+
+    # Copy brain.py into the brain root
+    script_path = Path(__file__).resolve()
+    dest_script = brain_root / "brain.py"
+    if script_path != dest_script:
+        shutil.copy2(script_path, dest_script)
+        print("Copied brain.py into project-brain/.")
+
+    print(f'\nProject Brain initialized for "{project_name}".')
+    print("Next: deposit your first knowledge file with `brain deposit`.")
+
+
+def _insert_fat_entry(index_content: str, file_type: str, fat_entry: str) -> str:
+    """Insert a fat index entry at the end of the `## TYPE Files` section."""
+    section_header = f"## {file_type} Files"
+    placeholder = f"_None yet._"
+
+    # Find the section and insert
+    if section_header in index_content:
+        section_idx = index_content.index(section_header)
+        # Find the placeholder or the next section — only within this
+        # section, so a later section's placeholder is never mistaken for ours
+        body_start = section_idx + len(section_header)
+        next_section = re.search(r"\n## ", index_content[body_start:])
+        body_end = body_start + next_section.start() if next_section else len(index_content)
+        if index_content[body_start:body_end].strip().startswith(placeholder):
+            # Replace placeholder with entry
+            index_content = index_content.replace(
+                section_header + "\n" + placeholder,
+                section_header + "\n\n" + fat_entry.strip(),
+                1,
+            )
+        elif next_section:
+            # Append entry before next section (## heading), ahead of any
+            # trailing --- separator
+            section_body = index_content[body_start:body_end]
+            trailing_rule = re.search(r"\n+---\s*$", section_body)
+            insert_pos = body_start + trailing_rule.start() if trailing_rule else body_end
+            index_content = (
+                index_content[:insert_pos].rstrip("\n")
+                + "\n\n"
+                + fat_entry.strip()
+                + "\n\n"
+                + index_content[insert_pos:].lstrip("\n")
+            )
+        else:
+            index_content = index_content.rstrip("\n") + "\n\n" + fat_entry.strip() + "\n"
+    return index_content
+
+
+def _bump_index_header(
+    index_content: str, added: int, in_master: int | None = None
+) -> tuple[str, int | None]:
+    """Add `added` to the total-files header and refresh the updated date.
+
+    Also bumps an "(N in INDEX-MASTER + ...)" breakdown if present, by
+    `in_master` (default `added`, since new entries land in INDEX-MASTER).
+    Returns (new content, new total or None if the header is missing).
+    """
+    if in_master is None:
+        in_master = added
+    total = None
+    count_match = re.search(r"<!-- total-files: (\d+)(.*?) -->", index_content)
+    if count_match:
+        total = int(count_match.group(1)) + added
+        detail = re.sub(
+            r"\b(\d+)( in INDEX-MASTER)",
+            lambda m: f"{int(m.group(1)) + in_master}{m.group(2)}",
+            count_match.group(2),
+            count=1,
+        )
+        index_content = (
+            index_content[:count_match.start()]
+            + f"<!-- total-files: {total}{detail} -->"
+            + index_content[count_match.end():]
+        )
+
+    # Update timestamp
+    index_content = re.sub(
+        r"<!-- updated: .* -->",
+        f"<!-- updated: {TODAY} -->",
+        index_content,
+    )
+    return index_content, total
+
+
+def render_template(
+    brain_root: Path,
+    file_type: str,
+    file_id: str,
+    title: str,
+    tags: str,
+    links: list[str] | None = None,
+    source: str = "",
+) -> str:
+    """Fill TEMPLATE-<TYPE>.md for a new file (minimal header if no template)."""
+    template_path = brain_root / "templates" / f"TEMPLATE-{file_type}.md"
+    if template_path.exists():
+        content = read_file(template_path)
+        # Fill in template placeholders
+        content = content.replace(f"{file_type}-NNN", file_id)
+        content = content.replace("[Title]", title)
+        content = content.replace("[Module/Script Name]", title)
+        content = content.replace("[Rule Name]", title)
+        content = content.replace("[What Was Learned]", title)
+        content = content.replace("[Decision / Event Title]", title)
+        content = content.replace("[Task Name]", title)
+        content = content.replace("[comma-separated tags]", tags)
+        content = content.replace("YYYY-MM-DD", TODAY)
+    else:
+        content = f"# {file_id} — {title}\n<!-- type: {file_type} -->\n<!-- tags: {tags} -->\n<!-- created: {TODAY} -->\n\n"
+    if links:
+        content = re.sub(r"<!-- links: .*? -->", f"<!-- links: {', '.join(links)} -->", content, count=1)
+    if source:
+        content = re.sub(r"<!-- source: .*? -->", f"<!-- source: {source} -->", content, count=1)
+    return content
+
+
+def make_fat_entry(file_id: str, tags: str, links: list[str] | None = None, summary: str = "") -> str:
+    """Generate a compressed-v1 fat index entry line for a new file."""
+    outlinks = ",".join(_abbreviate_id(lid) for lid in links) if links else "∅"
+    summary = summary or "[TODO: summary answering 'do I need this file?']"
+    return f"{_abbreviate_id(file_id)}|{tags}|→{outlinks}|←∅|{summary}|!none\n"
+
+
+def _is_str_or_str_list(value) -> bool:
+    return isinstance(value, str) or (isinstance(value, list) and all(isinstance(v, str) for v in value))
+
+
+def _parse_deposit_record(record: dict) -> dict:
+    """Validate and normalize one JSONL deposit record. Raises ValueError."""
+    file_type = str(record.get("type", "")).upper()
+    if file_type not in FILE_TYPES or file_type == "RESET":
+        raise ValueError(f"unknown or unsupported type '{record.get('type', '')}'")
+    title = str(record.get("title", "")).strip()
+    if not title:
+        raise ValueError("title is required")
+    tags = record.get("tags", "")
+    if not _is_str_or_str_list(tags):
+        raise ValueError("tags must be a list of strings or a comma-separated string")
+    if isinstance(tags, list):
+        tags = ",".join(t.strip() for t in tags)
+    if not tags.strip():
+        raise ValueError("tags are required")
+    links = record.get("links", [])
+    if not _is_str_or_str_list(links):
+        raise ValueError("links must be a list of IDs or a comma-separated string")
+    if isinstance(links, str):
+        links = _parse_link_ids_from_field(links)
+    else:
+        links = [_expand_abbreviated_id(lid.strip()) for lid in links if lid.strip()]
+    return {
+        "type": file_type,
+        "title": title,
+        "slug": re.sub(r"[^a-z0-9]+", "-", title.lower()).strip("-"),
+        "tags": str(tags).strip(),
+        "links": links,
+        "summary": " ".join(str(record.get("summary", "")).split()).replace("|", "/"),
+        "source": str(record.get("source", "")).strip(),
+        "body": str(record.get("body", "")),
+    }
+
+
+def _index_ops(created: list[tuple]) -> list[dict]:
+    return [
+        {"op": "add", "id": file_id, "type": file_type, "entry": fat_entry.strip()}
+        for file_type, file_id, _rel, _path, fat_entry, _links in created
+    ]
+
+
+def register_new_files(brain_root: Path, created: list[tuple], journaled: bool = False) -> int | None:
+    """Index and fingerprint a batch of freshly written files at once.
+
+    `created` holds (file_type, file_id, rel_path, file_path, fat_entry, links)
+    tuples. Journals their fat entries (unless `journaled`), adds their
+    manifest records in one locked read-modify-write, then compacts the
+    journal: one splice per type section and one write per index file.
+    Returns the new total-files count, if known.
+    """
+    if not journaled:
+        journal_append(brain_root, _index_ops(created))
+
+    with brain_lock(brain_root):
+        manifest = load_manifest(brain_root)
+        fingerprints = fingerprint_files([c[3] for c in created])
+        for _type, _id, rel_path, file_path, _entry, _links in created:
+            manifest[rel_path] = _manifest_record(file_path, file_path.stat(), fingerprints[file_path])
+        save_manifest(brain_root, manifest)
+
+    summary = compact_index_journal(brain_root)
+    return summary["total_files"] if summary else None
+
+
+def _id_masked_hash(text: str, file_id: str, placeholder: str) -> str:
+    """SHA-256 of a file's text with its own ID replaced by `placeholder`."""
+    return hashlib.sha256(text.replace(file_id, placeholder).encode("utf-8")).hexdigest()
+
+
+def find_identical_body(
+    brain_root: Path, manifest: dict, file_type: str, content: str, placeholder: str, cache: dict
+) -> str | None:
+    """Existing file of `file_type` whose text equals `content` up to its ID.
+
+    `content` is rendered with `placeholder` in place of an ID. Only files
+    whose size matches what `content` would weigh under their ID are read;
+    their masked hashes are kept in `cache` (rel_path -> hash) for the run.
+    """
+    data = content.encode("utf-8")
+    wanted = hashlib.sha256(data).hexdigest()
+    occurrences = content.count(placeholder)
+    for rel, info in manifest.items():
+        file_id = info.get("id", "")
+        if not file_id.startswith(f"{file_type}-"):
+            continue
+        if rel not in cache:
+            size = info.get("size")
+            if size is None:
+                try:
+                    size = (brain_root / rel).stat().st_size
+                except OSError:
+                    continue
+            if size != len(data) + occurrences * (len(file_id.encode()) - len(placeholder.encode())):
+                continue
+            try:
+                cache[rel] = _id_masked_hash(read_file(brain_root / rel), file_id, placeholder)
+            except OSError:
+                continue
+        if cache[rel] == wanted:
+            return file_id
+    return None
+
+
+def cmd_deposit_bulk(args):
+    """Non-interactive bulk deposit from a JSONL stream (`deposit --from`).
+
+    One JSON object per line: {"type", "title", "tags", and optionally
+    "summary", "links", "source", "body"}. Records whose type+title slug
+    already exists in the manifest (or earlier in the batch) are skipped, as
+    are bodies identical to an existing file up to its ID, and
+    near-duplicates (MinHash, see NEAR_DUP_THRESHOLD) unless
+    --allow-near-duplicates; skipped records reserve no ID. Records without
+    "links" are shown the --suggest-links most similar existing entries,
+    which are written as their →links only with --accept-links.
+    All fat-index entries are journaled in one append and compacted once,
+    so backlinks, total-files and each index file are written once; the
+    manifest is saved once.
+    """
+    brain_root = require_brain_root()
+    source_path = Path(args.from_file)
+    if str(source_path) != "-" and not source_path.exists():
+        print(f"ERROR: Deposit stream not found: {source_path}")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    stream = sys.stdin if str(source_path) == "-" else open(source_path, encoding="utf-8")
+    records = []
+    errors = 0
+    with stream:
+        for line_no, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                records.append(_parse_deposit_record(json.loads(line)))
+            except (ValueError, AttributeError) as exc:
+                errors += 1
+                print(f"WARN line {line_no}: {exc}")
 
-    ## Stop Rules
+    # De-duplicate on (type, title slug) against the manifest and the batch
+    manifest = load_manifest(brain_root)
+    existing = set()
+    for rel in manifest:
+        name = rel.rsplit("/", 1)[-1][:-3]
+        file_id, _, slug = name.partition("_")
+        existing.add((file_id.split("-")[0], slug))
+    signatures, lsh = minhash_index(brain_root, manifest)
+    masked_hashes: dict[str, str] = {}  # rel_path -> hash with its ID masked
+
+    created = []  # (file_type, file_id, rel_path, path, fat_entry, links)
+    skipped = 0
+    for rec in records:
+        key = (rec["type"], rec["slug"])
+        if key in existing:
+            skipped += 1
+            print(f"  = skip (exists): {rec['type']} {rec['title']}")
+            continue
+        existing.add(key)
+
+        # Render and check for duplicates under the template's own ID
+        # placeholder; an ID is only reserved once the record is kept
+        placeholder = f"{rec['type']}-NNN"
+        proposed = []
+        if not rec["links"] and args.suggest_links:
+            suggestions = suggest_links(
+                brain_root, placeholder,
+                link_query_terms(rec["title"], rec["tags"], f"{rec['summary']}\n{rec['body']}"),
+                args.suggest_links,
+            )
+            proposed = [sug["id"] for sug in suggestions]
+            if args.accept_links:
+                rec["links"], proposed = proposed, []
+        content = render_template(
+            brain_root, rec["type"], placeholder, rec["title"], rec["tags"], rec["links"], rec["source"]
+        )
+        if rec["body"]:
+            # Keep the title + frontmatter header, replace the template body
+            header = content.split("\n## ", 1)[0].rstrip("\n")
+            content = header + "\n\n" + rec["body"].strip("\n") + "\n"
+        identical = find_identical_body(brain_root, manifest, rec["type"], content, placeholder, masked_hashes)
+        if identical:
+            skipped += 1
+            print(f"  = skip (identical to {identical}): {rec['type']} {rec['title']}")
+            continue
+        signature = minhash_signature(content)
+        near = query_near_duplicates(signature, signatures, lsh)
+        if near and not args.allow_near_duplicates:
+            skipped += 1
+            print(f"  = skip (near-duplicate of {near[0]['id']}, "
+                  f"{near[0]['similarity']:.0%} similar): {rec['type']} {rec['title']}")
+            continue
 
-    - Two failures on same approach → stop, explain, ask for direction.
-    - Going in circles → write SESSION-HANDOFF.md, tell the user.
-    - If you haven't searched the brain, you haven't started.
-    """)
-    write_file(claude_md_path, claude_content)
-    print("Created CLAUDE.md with Identity & Purpose section.")
+        file_id = allocate_id(brain_root, rec["type"])
+        content = content.replace(placeholder, file_id)
+        filename = f"{file_id}_{rec['slug']}.md"
+        rel_path = f"{FILE_TYPES[rec['type']]['dir']}/{filename}"
+        # Later records in the batch are checked against this one too
+        manifest[rel_path] = {"id": file_id}
+        signatures[rel_path] = {"id": file_id, "minhash": signature}
+        masked_hashes[rel_path] = _id_masked_hash(content, file_id, placeholder)
+        lsh_add(lsh, rel_path, signature)
+        file_path = brain_root / rel_path
+        write_file(file_path, content)
+        note_id_written(brain_root, rec["type"])
+        fat_entry = make_fat_entry(file_id, rec["tags"], rec["links"], rec["summary"])
+        created.append((rec["type"], file_id, rel_path, file_path, fat_entry, rec["links"]))
+        print(f"  + {rel_path}" + (f"  →{','.join(rec['links'])}" if rec["links"] else "")
+              + (f"  (suggested →{','.join(proposed)})" if proposed else ""))
+
+    if not created:
+        print(f"\nNo new files deposited ({skipped} skipped, {errors} invalid).")
+        return
 
-    # Copy brain.py into the brain root
-    script_path = Path(__file__).resolve()
-    dest_script = brain_root / "brain.py"
-    if script_path != dest_script:
-        shutil.copy2(script_path, dest_script)
-        print("Copied brain.py into project-brain/.")
+    total_files = register_new_files(brain_root, created)
 
-    print(f'\nProject Brain initialized for "{project_name}".')
-    print("Next: deposit your first knowledge file with `brain deposit`.")
+    elapsed = time.perf_counter() - started
+    print(f"\nDeposited {len(created)} files ({skipped} skipped, {errors} invalid) "
+          f"in {elapsed:.2f}s — {len(created) / elapsed:.1f} files/sec")
+    print(f"Updated {INDEX_MASTER} (total files: {total_files if total_files is not None else '?'}) "
+          f"and {HASH_MANIFEST}.")
+    todo = sum(1 for c in created if "[TODO:" in c[4])
+    if todo:
+        print(f"IMPORTANT: {todo} entries have [TODO] summaries in INDEX-MASTER.md.")
 
 
 def cmd_deposit(args):
     """Add a new knowledge file to the brain."""
+    if args.from_file:
+        return cmd_deposit_bulk(args)
+    if not args.type or not args.tags:
+        print("ERROR: --type and --tags are required (or use --from entries.jsonl).")
+        sys.exit(1)
+
     brain_root = require_brain_root()
     file_type = args.type.upper()
 
@@ -856,7 +3110,7 @@ def cmd_deposit(args):
         sys.exit(1)
 
     tags = args.tags
-    file_id = next_id(brain_root, file_type)
+    file_id = allocate_id(brain_root, file_type)
 
     # Prompt for title
     title = input(f"Title for {file_id}: ").strip()
@@ -870,23 +3124,10 @@ def cmd_deposit(args):
     type_dir = brain_root / FILE_TYPES[file_type]["dir"]
     file_path = type_dir / filename
 
-    template_path = brain_root / "templates" / f"TEMPLATE-{file_type}.md"
-    if template_path.exists():
-        content = read_file(template_path)
-        # Fill in template placeholders
-        content = content.replace(f"{file_type}-NNN", file_id)
-        content = content.replace("[Title]", title)
-        content = content.replace("[Module/Script Name]", title)
-        content = content.replace("[Rule Name]", title)
-        content = content.replace("[What Was Learned]", title)
-        content = content.replace("[Decision / Event Title]", title)
-        content = content.replace("[Task Name]", title)
-        content = content.replace("[comma-separated tags]", tags)
-        content = content.replace("YYYY-MM-DD", TODAY)
-    else:
-        content = f"# {file_id} — {title}\n<!-- type: {file_type} -->\n<!-- tags: {tags} -->\n<!-- created: {TODAY} -->\n\n"
+    content = render_template(brain_root, file_type, file_id, title, tags)
 
     write_file(file_path, content)
+    note_id_written(brain_root, file_type)
     print(f"Created: {file_path}")
 
     # Open in editor
@@ -901,86 +3142,85 @@ def cmd_deposit(args):
         print(f"\nWARNING: Content hash matches existing file(s):")
         for dup in duplicates:
             print(f"  - {dup}")
+    near = [m for m in find_near_duplicates(brain_root, file_path) if m["path"] not in duplicates]
+    if near:
+        print(f"\nWARNING: Near-duplicate of existing file(s):")
+        for match in near[:5]:
+            print(f"  - {match['id']} ({match['path']}) ~{match['similarity']:.0%} similar")
+    if duplicates or near:
         proceed = input("Continue with deposit anyway? (y/N): ").strip().lower()
         if proceed != "y":
             file_path.unlink()
             print("Deposit aborted. File removed.")
             return
 
+    # Propose →links from the BM25 neighbours of what was just written
+    authored_links = _parse_link_ids_from_field(_parse_frontmatter(final_content).get("links", ""))
+    suggestions = suggest_links(
+        brain_root, file_id, link_query_terms(title, tags, final_content), args.suggest_links
+    )
+    if suggestions:
+        print(f"\n--- Suggested links (most similar entries; prune as needed) ---")
+        for sug in suggestions:
+            print(f"  → {sug['id']:<10} {sug['relation']:<11} (score {sug['score']})")
+        if authored_links:
+            print("  (not applied: the file already lists its links)")
+        elif not args.accept_links:
+            print("  (not applied: add them to the links: header, or deposit with --accept-links)")
+    links = authored_links or ([sug["id"] for sug in suggestions] if args.accept_links else [])
+    if links and not authored_links:
+        # Only fill the header while it still holds the template placeholder
+        linked = re.sub(r"<!-- links: \[[^\]]*\] -->", f"<!-- links: {', '.join(links)} -->", final_content, count=1)
+        if linked != final_content:
+            write_file(file_path, linked)
+
     print(f"\n--- Fat Index Entry (auto-generated, edit as needed) ---")
     # Generate compressed-v1 format entry
-    abbrev_prefix = {"SPEC": "S", "CODE": "C", "RULE": "R", "LEARN": "L", "LOG": "G"}
-    short_prefix = abbrev_prefix.get(file_type, file_type[0])
-    num = file_id.split("-")[1]
-    short_id = f"{short_prefix}{num}"
-    fat_entry = f"{short_id}|{tags}|→∅|←∅|[TODO: summary answering 'do I need this file?']|!none\n"
+    fat_entry = make_fat_entry(file_id, tags, links)
     print(fat_entry)
 
-    # Append to INDEX-MASTER.md under the correct section
-    master_path = brain_root / INDEX_MASTER
-    master_content = read_file(master_path)
-
-    section_header = f"## {file_type} Files"
-    placeholder = f"_None yet._"
-
-    # Find the section and insert
-    if section_header in master_content:
-        section_idx = master_content.index(section_header)
-        # Find the placeholder or the next section
-        rest = master_content[section_idx:]
-        if placeholder in rest:
-            # Replace placeholder with entry
-            master_content = master_content.replace(
-                section_header + "\n" + placeholder,
-                section_header + "\n\n" + fat_entry.strip(),
-                1,
-            )
-        else:
-            # Append entry before next section (## heading)
-            next_section = re.search(r"\n## ", rest[len(section_header):])
-            if next_section:
-                insert_pos = section_idx + len(section_header) + next_section.start()
-                master_content = (
-                    master_content[:insert_pos]
-                    + "\n\n"
-                    + fat_entry.strip()
-                    + "\n"
-                    + master_content[insert_pos:]
-                )
-            else:
-                master_content += "\n\n" + fat_entry.strip() + "\n"
-
-    # Update total-files count
-    count_match = re.search(r"<!-- total-files: (\d+) -->", master_content)
-    if count_match:
-        old_count = int(count_match.group(1))
-        master_content = master_content.replace(
-            f"<!-- total-files: {old_count} -->",
-            f"<!-- total-files: {old_count + 1} -->",
-        )
-
-    # Update timestamp
-    master_content = re.sub(
-        r"<!-- updated: .* -->",
-        f"<!-- updated: {TODAY} -->",
-        master_content,
+    # Journal the index entry (O(1) append) instead of splicing INDEX-MASTER
+    # under the lock; it is folded in right after the manifest update.
+    journal_append(
+        brain_root, [{"op": "add", "id": file_id, "type": file_type, "entry": fat_entry.strip()}]
     )
 
-    write_file(master_path, master_content)
-    print(f"Updated {INDEX_MASTER} (total files: {old_count + 1 if count_match else '?'}).")
-    print(f"Estimated tokens for this file: ~{tokens}")
-    print("\nIMPORTANT: Edit the [TODO] summary in INDEX-MASTER.md to complete the fat index entry.")
-
-    # Update content hash manifest
-    manifest = load_manifest(brain_root)
+    # Manifest update is read-modify-write: hold the brain lock so concurrent
+    # deposits (SPEC-001 multi-brain, SPEC-004 mailbox) can't lose records.
     rel_path = f"{FILE_TYPES[file_type]['dir']}/{filename}"
-    manifest[rel_path] = {
-        "hash": hash_file(file_path),
-        "id": file_id,
-        "updated": TODAY,
-    }
-    save_manifest(brain_root, manifest)
+    with brain_lock(brain_root):
+        manifest = load_manifest(brain_root)
+        manifest[rel_path] = manifest_record(file_path)
+        save_manifest(brain_root, manifest)
+
+    compacted = maybe_compact_index_journal(brain_root)
+    if compacted == "background":
+        print(f"Journaled index entry; compacting into {INDEX_MASTER} in the background.")
+    else:
+        print(f"Updated {INDEX_MASTER}.")
+    print(f"Estimated tokens for this file: ~{tokens}")
     print(f"Updated {HASH_MANIFEST} with content hash.")
+    print(f"\nIMPORTANT: Edit the [TODO] summary of {_abbreviate_id(file_id)} in "
+          "INDEX-MASTER.md to complete the fat index entry.")
+
+
+@pipeline_stage("format")
+def format_search_results(query: str, scored: list[tuple[float, dict]], precision: int = 1) -> str:
+    """Render ranked (score, entry) results as `brain search` prints them."""
+    lines = [f'Search results for "{query}" ({len(scored)} matches):\n']
+    for rank, (score, entry) in enumerate(scored, 1):
+        lines.append(f"  {rank}. [{score:5.{precision}f}] {entry['id']}")
+        if "file" in entry:
+            lines.append(f"       File: {entry['file']}")
+        if "tags" in entry:
+            lines.append(f"       Tags: {entry['tags']}")
+        if "summary" in entry:
+            summary = entry["summary"]
+            if len(summary) > 120:
+                summary = summary[:117] + "..."
+            lines.append(f"       {summary}")
+        lines.append("")
+    return "\n".join(lines)
 
 
 def cmd_search(args):
@@ -993,81 +3233,94 @@ def cmd_search(args):
         print("ERROR: Empty query.")
         sys.exit(1)
 
-    entries = collect_all_entries(brain_root)
-    if not entries:
-        print("No index entries found. Deposit some files first.")
-        return
+    trace = {} if args.explain else None
+    with record_stage_timings() if args.explain else contextlib.nullcontext([]) as timings:
+        entries, bm25 = cached_bm25_index(brain_root)
+        if not entries:
+            print("No index entries found. Deposit some files first.")
+            return
 
-    # BM25 + structural boosts + link propagation
-    scored = score_entries_bm25(entries, query_terms)
+        # BM25 + structural boosts + link propagation, fused with the semantic
+        # stage when --hybrid asks for it and `reindex --vectors` built it
+        vectors = hybrid_vectors(brain_root, entries) if args.hybrid else None
+        scored = score_entries_bm25(entries, query_terms, bm25, vectors, trace)
+        output = format_search_results(query, scored, precision=2 if vectors is not None else 1) if scored else ""
 
     if not scored:
         print(f'No results for "{query}".')
         print(f"Searched {len(entries)} index entries.")
         return
 
-    print(f'Search results for "{query}" ({len(scored)} matches):\n')
-    for rank, (score, entry) in enumerate(scored, 1):
-        print(f"  {rank}. [{score:5.1f}] {entry['id']}")
-        if "file" in entry:
-            print(f"       File: {entry['file']}")
-        if "tags" in entry:
-            print(f"       Tags: {entry['tags']}")
-        if "summary" in entry:
-            summary = entry["summary"]
-            if len(summary) > 120:
-                summary = summary[:117] + "..."
-            print(f"       {summary}")
-        print()
+    print(output)
+    if args.explain:
+        print("\n" + format_explanation(explain_search(entries, query_terms, scored, bm25, trace, timings)))
 
 
 def cmd_recall(args):
-    """Search for relevant files and generate a RESET file."""
+    """Search for relevant files and generate a RESET file.
+
+    With --budget N, files (or, with --sections, individual sections) are
+    chosen by relevance per token so the RESET context fits in N tokens.
+    """
     brain_root = require_brain_root()
     task = args.task
     query_terms = [t.strip() for t in re.split(r"[\s,]+", task) if t.strip()]
 
-    entries = collect_all_entries(brain_root)
-    scored = score_entries_bm25(entries, query_terms)
-
-    # Take top results (up to 10)
-    top = scored[:10]
+    trace = {} if args.explain else None
+    with record_stage_timings() if args.explain else contextlib.nullcontext([]) as timings:
+        entries, bm25 = cached_bm25_index(brain_root)
+        vectors = hybrid_vectors(brain_root, entries) if args.hybrid else None
+        scored = score_entries_bm25(entries, query_terms, bm25, vectors, trace) if entries else []
+    stats = file_stats(brain_root)
+
+    usable_context = args.budget or USABLE_CONTEXT_TOKENS
+    if args.budget:
+        items = recall_candidates(brain_root, scored[:RECALL_CANDIDATES], stats, args.sections, query_terms)
+        chosen = pack_budget(items, max(args.budget - RESET_FILE_TOKENS, 0))
+    else:
+        chosen = recall_candidates(brain_root, scored[:RECALL_TOP_FILES], stats)
 
-    # Estimate token costs
+    # One line per file, in descending relevance (sections kept in file order)
+    by_file: dict[str, list[dict]] = {}
+    for it in chosen:
+        by_file.setdefault(it["id"], []).append(it)
     total_tokens = 0
     file_lines = []
-    for _score, entry in top:
-        file_path = brain_root / entry.get("file", "")
-        if file_path.exists():
-            content = read_file(file_path)
-            tokens = estimate_tokens(content)
-            total_tokens += tokens
-            line_count = content.count("\n") + 1
-            file_lines.append(
-                f"1. `{entry['id']}` — (full file, ~{line_count} lines, ~{tokens} tokens) — {entry.get('summary', 'no summary')[:80]}"
-            )
+    for file_id, parts in by_file.items():
+        entry = parts[0]["entry"]
+        summary = entry.get("summary", "no summary")[:80]
+        if parts[0]["path"] is None:
+            file_lines.append(f"1. `{file_id}` — (file not found: {entry.get('file', '?')}) — {summary}")
+            continue
+        tokens = sum(it["tokens"] for it in parts)
+        line_count = sum(it["lines"] for it in parts)
+        total_tokens += tokens
+        if parts[0]["heading"] is None or len(parts) == parts[0]["sections"]:
+            scope = "full file"
         else:
-            file_lines.append(
-                f"1. `{entry['id']}` — (file not found: {entry.get('file', '?')}) — {entry.get('summary', 'no summary')[:80]}"
-            )
+            scope = ", ".join(f"§ {it['heading'] or 'header'}" for it in parts)
+        file_lines.append(
+            f"1. `{file_id}` `{parts[0]['path']}` — ({scope}, ~{line_count} lines, ~{tokens} tokens) — {summary}"
+        )
+
+    empty_note = "_Nothing fits in the token budget._" if scored else "_No matching files found._"
 
     slug = re.sub(r"[^a-z0-9]+", "-", task.lower()).strip("-")[:40]
     reset_filename = f"RESET-{slug}-{TODAY}.md"
     reset_path = brain_root / "reset-files" / reset_filename
 
-    reset_tokens = 500  # estimate for the reset file itself
-    usable_context = 140000  # rough usable tokens
+    reset_tokens = RESET_FILE_TOKENS
 
     reset_content = textwrap.dedent(f"""\
     # RESET — {task}
     <!-- generated: {TODAY} -->
-    <!-- search-session: found {len(top)} relevant entries from {len(entries)} total -->
+    <!-- search-session: found {len(scored)} relevant entries from {len(entries)} total -->
 
     ## Task Objective
     {task}
 
     ## Required Context Files (load these)
-    {chr(10).join(file_lines) if file_lines else '_No matching files found._'}
+    {(chr(10) + "    ").join(file_lines) if file_lines else empty_note}
 
     ## Key Decisions Already Made
     - [Review the files above and fill in relevant decisions]
@@ -1085,11 +3338,14 @@ def cmd_recall(args):
     - Remaining for work: ~{usable_context - total_tokens - reset_tokens:,} tokens
     """)
 
+    reset_path.parent.mkdir(parents=True, exist_ok=True)
     write_file(reset_path, reset_content)
     print(f"Generated: {reset_path}")
-    print(f"Included {len(top)} files, estimated ~{total_tokens + reset_tokens} tokens.")
+    print(f"Included {len(by_file)} files, estimated ~{total_tokens + reset_tokens} tokens.")
     print(f"Remaining context budget: ~{usable_context - total_tokens - reset_tokens:,} tokens.")
     print("\nReview and edit the RESET file before using it in a work session.")
+    if args.explain and scored:
+        print("\n" + format_explanation(explain_search(entries, query_terms, scored, bm25, trace, timings)))
 
 
 def cmd_status(args):
@@ -1098,12 +3354,13 @@ def cmd_status(args):
 
     print(f"Project Brain: {brain_root}\n")
 
+    # One filesystem walk feeds every check below
+    snapshot = scan_brain(brain_root)
+
     # Count files by type
     total = 0
     for file_type, info in FILE_TYPES.items():
-        type_dir = brain_root / info["dir"]
-        files = list(type_dir.glob(f"{file_type}-*.md"))
-        count = len(files)
+        count = len(snapshot["by_type"][file_type])
         total += count
         status = f"  {file_type:6s}  {count:3d} files   ({info['dir']}/)"
         print(status)
@@ -1113,52 +3370,53 @@ def cmd_status(args):
     # Index health
     entries = collect_all_entries(brain_root)
     print(f"\nIndex entries: {len(entries)}")
+    pending = read_index_journal(brain_root)
+    if pending:
+        print(f"Index journal: {len(pending)} pending ops (run `brain compact`)")
+
+    # Orphan and stale detection: one ID-keyed join between the filesystem
+    # snapshot and the parsed entries. Compressed-v1 entries only carry a
+    # derived path prefix ("knowledge/LEARN-001"), so IDs are the join key.
+    # @SUB member lists in INDEX-MASTER give sub-index membership.
+    sub_membership: dict[str, list[str]] = {}
+    master_path = brain_root / INDEX_MASTER
+    if master_path.exists():
+        for sub in parse_sub_index_refs(read_file(master_path)):
+            for member in sub["members"]:
+                sub_membership.setdefault(member, []).append(sub["name"])
 
-    # Check for orphans (files without index entries)
-    # Build set of indexed file prefixes to handle both exact paths and
-    # compressed-v1 derived paths (e.g., "learnings/LEARN-001" matches
-    # "learnings/LEARN-001_freqtrade-istrategy-technical-reference.md")
-    indexed_files = set()
-    indexed_prefixes = set()
-    for e in entries:
-        if "file" in e:
-            indexed_files.add(e["file"])
-            indexed_prefixes.add(e["file"])
+    indexed_ids = {e["id"] for e in entries if "id" in e}
 
     orphans = []
-    for file_type, info in FILE_TYPES.items():
+    for file_type in FILE_TYPES:
         if file_type == "RESET":
             continue  # RESET files don't need index entries
-        type_dir = brain_root / info["dir"]
-        for f in type_dir.glob(f"{file_type}-*.md"):
-            relative = f"{info['dir']}/{f.name}"
-            if relative in indexed_files:
-                continue
-            # Check prefix match for compressed-v1 derived paths
-            if any(relative.startswith(p) for p in indexed_prefixes):
-                continue
-            orphans.append(relative)
+        for relative in snapshot["by_type"][file_type]:
+            file_id = snapshot["files"][relative]["id"]
+            if file_id not in indexed_ids:
+                orphans.append((relative, sub_membership.get(file_id, [])))
 
     if orphans:
         print(f"\nOrphans (files without index entries): {len(orphans)}")
-        for o in orphans:
-            print(f"  - {o}")
+        for o, subs in orphans:
+            note = f"  (listed in @SUB:{', @SUB:'.join(subs)} but has no entry)" if subs else ""
+            print(f"  - {o}{note}")
     else:
         print("\nNo orphans detected. All files are indexed.")
 
-    # Check for stale entries (index entries pointing to missing files)
-    # For compressed-v1, derived paths are prefixes (e.g., "learnings/LEARN-001")
-    # so we glob for matches instead of checking exact path existence.
+    # Stale entries (index entries pointing to missing files)
     stale = []
     for e in entries:
-        if "file" in e:
-            file_path = brain_root / e["file"]
-            if file_path.exists():
-                continue
-            # Try glob match for compressed-v1 derived paths (prefix + wildcard)
-            matches = list(file_path.parent.glob(f"{file_path.name}*")) if file_path.parent.exists() else []
-            if not matches:
-                stale.append(f"{e['id']} -> {e['file']}")
+        if "file" not in e or e.get("id") in snapshot["by_id"]:
+            continue
+        # Legacy markdown entries may name an exact path outside the type dirs
+        if (brain_root / e["file"]).is_file():
+            continue
+        where = e.get("index", "?")
+        subs = sub_membership.get(e["id"], [])
+        if subs:
+            where += f", @SUB:{', @SUB:'.join(subs)}"
+        stale.append(f"{e['id']} -> {e['file']}  [{where}]")
 
     if stale:
         print(f"\nStale entries (index points to missing file): {len(stale)}")
@@ -1168,15 +3426,15 @@ def cmd_status(args):
     # Content hash manifest health
     manifest = load_manifest(brain_root)
     if manifest:
-        # Count files on disk
-        disk_files = build_manifest(brain_root)
+        # Hash files on disk (stat-cached: only changed files are re-hashed)
+        disk_files = disk_hashes(brain_root, manifest, full=args.full, workers=args.jobs, snapshot=snapshot)
         mismatches = []
         missing_from_manifest = []
         deleted_from_disk = []
-        for rel, info in disk_files.items():
+        for rel, file_hash in disk_files.items():
             if rel not in manifest:
                 missing_from_manifest.append(rel)
-            elif manifest[rel]["hash"] != info["hash"]:
+            elif manifest[rel]["hash"] != file_hash:
                 mismatches.append(rel)
         for rel in manifest:
             if rel not in disk_files:
@@ -1197,29 +3455,46 @@ def cmd_status(args):
                 print(f"    - {d}")
         if not mismatches and not missing_from_manifest and not deleted_from_disk:
             print("  All hashes up to date.")
+
+        # Size totals come from the manifest's fingerprints, not file bodies;
+        # changed and new files count once `brain reindex` records them
+        sized = [info for rel, info in manifest.items() if rel in disk_files and "tokens" in info]
+        if sized:
+            tokens = sum(info["tokens"] for info in sized)
+            lines = sum(info["lines"] for info in sized)
+            chars = sum(info["chars"] for info in sized)
+            as_of = " (as of last reindex)" if mismatches or missing_from_manifest else ""
+            print(f"\nBrain size{as_of}: ~{tokens:,} tokens, {lines:,} lines, {chars:,} chars")
+            largest = sorted(sized, key=lambda info: info["tokens"], reverse=True)[:3]
+            print("  Largest: " + ", ".join(f"{info['id']} (~{info['tokens']:,} tokens)" for info in largest))
     else:
         print(f"\nNo content hash manifest. Run `brain reindex` to create one.")
 
     # Last modified
-    all_md = list(brain_root.rglob("*.md"))
-    if all_md:
-        newest = max(all_md, key=lambda p: p.stat().st_mtime)
-        mod_time = datetime.datetime.fromtimestamp(newest.stat().st_mtime)
+    if snapshot["newest"]:
+        newest, newest_mtime = snapshot["newest"]
+        mod_time = datetime.datetime.fromtimestamp(newest_mtime)
         print(f"\nLast modified: {newest.name} ({mod_time.strftime('%Y-%m-%d %H:%M')})")
 
     # Token budget estimate
     master_path = brain_root / INDEX_MASTER
     if master_path.exists():
-        master_tokens = estimate_tokens(read_file(master_path))
+        master_tokens = estimate_tokens(read_index_master(brain_root))
         print(f"INDEX-MASTER.md: ~{master_tokens} tokens")
 
 
 def cmd_reindex(args):
-    """Rebuild the content hash manifest from all brain files on disk."""
+    """Rebuild the content hash manifest (and, with --vectors, the entry embeddings) from disk."""
     brain_root = require_brain_root()
 
-    old_manifest = load_manifest(brain_root)
-    new_manifest = build_manifest(brain_root)
+    # Hold the lock across load→build→save so a concurrent deposit's
+    # manifest record can't be dropped by this rewrite
+    with brain_lock(brain_root):
+        snapshot = scan_brain(brain_root)
+        old_manifest = load_manifest(brain_root)
+        new_manifest = build_manifest(brain_root, old_manifest, full=args.full, workers=args.jobs, snapshot=snapshot)
+        save_manifest(brain_root, new_manifest)
+    pruned = prune_id_reservations(brain_root, snapshot)
 
     # Compute diff
     new_files = []
@@ -1260,88 +3535,391 @@ def cmd_reindex(args):
     if not new_files and not changed_files and not deleted_files:
         print("No changes detected.")
 
-    # Save updated manifest
-    save_manifest(brain_root, new_manifest)
+    # Entries of files that were deleted since the last reindex (and not
+    # re-added under another name) are retired through the index journal
+    on_disk = {info.get("id") for info in new_manifest.values()}
+    gone = {old_manifest[rel].get("id") for rel in deleted_files} - on_disk
+    indexed = {e.get("id") for e in collect_all_entries(brain_root)}
+    retire = sorted(gone & indexed)
+    if retire:
+        journal_append(brain_root, [{"op": "retire", "id": file_id} for file_id in retire])
+        compact_index_journal(brain_root)
+        print(f"Retired {len(retire)} index entries of deleted files: {', '.join(retire)}")
+
     print(f"\nManifest saved: {HASH_MANIFEST} ({len(new_manifest)} entries)")
+    if pruned:
+        print(f"Pruned {pruned} stale ID reservations from {ID_RESERVATIONS_DIR}/")
+
+    # Vectors are opt-in; once built, every reindex keeps them current
+    if args.vectors or (brain_root / EMBED_CACHE).exists():
+        n_vectors, n_embedded = build_embeddings(brain_root)
+        if n_vectors >= 0:
+            print(f"Embeddings saved: {EMBED_CACHE} ({n_vectors} entries, {n_embedded} re-embedded, {EMBED_DIMS} dims)")
+        else:
+            print("Embeddings skipped: NumPy not installed (search stays BM25-only).")
+
+
+def cmd_compact(args):
+    """Fold the append-only index journal into INDEX-MASTER and sub-indexes."""
+    brain_root = require_brain_root()
+    summary = compact_index_journal(brain_root)
+    if args.quiet:
+        return
+    if summary is None:
+        print("Index journal empty — nothing to compact.")
+        return
+    print(f"Compacted {summary['ops']} journal ops into {INDEX_MASTER}: "
+          f"{summary['added']} added, {summary['updated']} updated, {summary['retired']} retired.")
+    if summary["total_files"] is not None:
+        print(f"Total files: {summary['total_files']}")
+
+
+def cmd_backlinks(args):
+    """Recompute derived ←backlinks from fat-index outlinks and rewrite changed entries."""
+    brain_root = require_brain_root()
+    if not args.dry_run:
+        compact_index_journal(brain_root)  # pending entries' outlinks count too
+    affected = {_expand_abbreviated_id(i.strip().upper()) for i in args.ids} if args.ids else None
+
+    with brain_lock(brain_root):
+        changes = update_backlinks(brain_root, affected, dry_run=args.dry_run)
+    if not changes:
+        print("Backlinks up to date.")
+        return
+
+    verb = "Would update" if args.dry_run else "Updated"
+    for rel, ids in changes.items():
+        print(f"{verb} {len(ids)} entries in {rel}:")
+        for entry_id in ids:
+            print(f"  ~ {entry_id}")
+
+
+def scan_source(source_path: Path, ctx: dict, max_stubs: int = INGEST_MAX_STUBS,
+                workers: int | None = None, verbose: bool = True) -> dict:
+    """Stream, chunk and assess one source. Returns its stats and stub candidates.
+
+    Only a bounded heap of the `max_stubs` most substantial new chunks is
+    kept (by novel tokens), so memory does not grow with the source.
+    Returns {chunks, known, tokens, seconds, stubs: [{title, where, tokens, tags, links}]}.
+    """
+    import heapq
+
+    is_pdf = source_path.suffix.lower() == ".pdf"
+    unit = "p." if is_pdf else "l."
+    source_tag = re.sub(r"[^a-z0-9]+", "-", source_path.stem.lower()).strip("-")
+    started = time.perf_counter()
+    n_chunks = n_known = total_tokens = 0
+    candidates = []  # min-heap of (novel tokens, seq, stub)
+    pages = iter_source_pages(source_path, workers)
+    for chunk in chunk_on_headings(pages, line_positions=not is_pdf):
+        n_chunks += 1
+        total_tokens += chunk["tokens"]
+        where = f"{unit}{chunk['start']}" + (f"-{chunk['end']}" if chunk["end"] != chunk["start"] else "")
+        title = chunk["heading"] or f"{source_path.stem} {where}"
+        verdict = assess_chunk(chunk, ctx)
+        if verdict["known"]:
+            n_known += 1
+            if verbose:
+                match = verdict["near"]["id"] if verdict["near"] else verdict["matches"][0]
+                print(f"  = known  {where:<12} {title[:50]}  → {match} ({verdict['coverage']:.0%} of key terms)")
+            continue
+        tags = ", ".join(salient_words(chunk["text"], INGEST_STUB_TAGS) + ["ingested", source_tag])
+        stub = {"title": title, "where": where, "tokens": chunk["tokens"], "tags": tags,
+                "links": verdict["matches"], "seq": n_chunks}
+        item = (chunk["tokens"] * (1 - verdict["coverage"]), n_chunks, stub)
+        if len(candidates) < max_stubs:
+            heapq.heappush(candidates, item)
+        elif candidates and item > candidates[0]:
+            heapq.heapreplace(candidates, item)
+    return {
+        "chunks": n_chunks,
+        "known": n_known,
+        "tokens": total_tokens,
+        "seconds": time.perf_counter() - started,
+        "stubs": sorted((stub for _, _, stub in candidates), key=lambda stub: stub["seq"]),
+    }
+
+
+def write_ingest_stubs(
+    brain_root: Path, source_path: Path, scan: dict, types: list[str],
+    resume_key: str | None = None, recorded: dict[str, dict] | None = None,
+) -> list[tuple]:
+    """Write stubs for one scanned source; no index or manifest writes.
+
+    LEARN gets one stub per candidate chunk (in source order); every other
+    type one stub for the whole source. IDs come from allocate_id(), so
+    concurrent ingest workers never collide. With `resume_key`, each stub is
+    recorded in INGEST_JOURNAL before its file is written; `recorded` holds
+    an interrupted run's records for the source ({stub key: record}), whose
+    stubs are kept (or rewritten under their recorded ID) instead of being
+    created again. Returns register_new_files() tuples.
+    """
+    source_tag = re.sub(r"[^a-z0-9]+", "-", source_path.stem.lower()).strip("-")
+    recorded = recorded or {}
+    created = []
+
+    def write_stub(file_type, title, slug, tags, links, where, tokens):
+        stub_key = f"{file_type} {where}".strip()
+        prior = recorded.get(stub_key)
+        if prior:
+            file_id, rel_path, fat_entry = prior["id"], prior["file"], prior["entry"]
+            if (brain_root / rel_path).exists():
+                created.append((file_type, file_id, rel_path, brain_root / rel_path, fat_entry, links))
+                return
+        else:
+            file_id = allocate_id(brain_root, file_type)
+            rel_path = f"{FILE_TYPES[file_type]['dir']}/{file_id}_{slug}.md"
+            fat_entry = make_fat_entry(file_id, tags, links)
+            if resume_key:
+                ingest_journal_append(brain_root, {
+                    "key": resume_key, "stub": stub_key, "type": file_type,
+                    "id": file_id, "file": rel_path, "entry": fat_entry.strip(),
+                })
+        content = render_template(
+            brain_root, file_type, file_id, title, tags, links, f"{source_path.name} {where}".strip()
+        )
+        location = f"{where}, " if where else ""
+        content += f"\n\n<!-- Ingested from: {source_path.name} ({location}~{tokens:,} tokens) -->\n"
+        write_file(brain_root / rel_path, content)
+        note_id_written(brain_root, file_type)
+        created.append((file_type, file_id, rel_path, brain_root / rel_path, fat_entry, links))
+
+    for file_type in types:
+        if file_type == "LEARN":
+            for stub in scan["stubs"]:
+                slug = re.sub(r"[^a-z0-9]+", "-", stub["title"].lower()).strip("-")[:60]
+                write_stub(file_type, stub["title"], slug, stub["tags"], stub["links"], stub["where"], stub["tokens"])
+        else:
+            write_stub(file_type, source_path.stem, f"from-{source_tag}", f"ingested, {source_tag}",
+                       [], "", scan["tokens"])
+    return created
+
+
+def _parse_ingest_types(types_input: str) -> list[str]:
+    types = []
+    for file_type in (t.strip().upper() for t in types_input.split(",") if t.strip()):
+        if file_type not in FILE_TYPES or file_type == "RESET":
+            print(f"WARNING: Unknown type '{file_type}', skipping.")
+            continue
+        types.append(file_type)
+    return types
+
+
+# Sources `ingest --dir` picks up, and its resume journal. Two record kinds:
+# {"key", "stub", "type", "id", "file", "entry"} written by a worker just
+# before each stub file, and {"key", "source", "files", "at"} once the
+# whole source is done.
+INGEST_SUFFIXES = {".md", ".markdown", ".txt", ".rst", ".pdf"}
+INGEST_JOURNAL = ".ingest-journal.jsonl"
+_INGEST_WORKER_CTX: dict[str, dict] = {}
+
+
+def _ingest_source_key(path: Path) -> str:
+    """Resume key: a source is done if this exact file (path, size, mtime) was."""
+    st = path.stat()
+    return f"{path.resolve()}|{st.st_size}|{st.st_mtime_ns}"
+
+
+def ingest_journal_append(brain_root: Path, record: dict):
+    """Append one record to INGEST_JOURNAL in a single O_APPEND write.
+
+    Workers and the parent append concurrently; one write per line keeps
+    their records from interleaving.
+    """
+    line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+    fd = os.open(brain_root / INGEST_JOURNAL, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+def read_ingest_journal(brain_root: Path) -> tuple[dict[str, dict], dict[str, dict[str, dict]]]:
+    """({key: done record}, {key: {stub key: stub record}}) from INGEST_JOURNAL."""
+    done: dict[str, dict] = {}
+    stubs: dict[str, dict[str, dict]] = {}
+    try:
+        text = read_file(brain_root / INGEST_JOURNAL)
+    except FileNotFoundError:
+        return done, stubs
+    for line in text.splitlines():
+        with contextlib.suppress(ValueError, KeyError, TypeError):
+            record = json.loads(line)
+            if "stub" in record:
+                stubs.setdefault(record["key"], {})[record["stub"]] = record
+            else:
+                done[record["key"]] = record
+    return done, stubs
+
+
+def _ingest_worker(job: tuple[str, str, list[str], int, str, dict]) -> dict:
+    """Process-pool worker for `ingest --dir`: scan one source and write its stubs."""
+    brain_root, source, types, max_stubs, key, recorded = job
+    brain_root, source_path = Path(brain_root), Path(source)
+    ctx = _INGEST_WORKER_CTX.get(str(brain_root))
+    if ctx is None:
+        ctx = _INGEST_WORKER_CTX[str(brain_root)] = ingest_context(brain_root)
+    scan = scan_source(source_path, ctx, max_stubs, workers=1, verbose=False)
+    created = write_ingest_stubs(brain_root, source_path, scan, types, key, recorded)
+    return {"source": source, **{k: scan[k] for k in ("chunks", "known", "tokens", "seconds")},
+            "created": [(t, i, rel, str(p), entry, links) for t, i, rel, p, entry, links in created]}
+
+
+def cmd_ingest_dir(args):
+    """Ingest every source under a directory on a process pool (`ingest --dir`).
+
+    Each worker scans a whole document (PDF pages serially inside it) and
+    records each stub in INGEST_JOURNAL as it writes it. As documents
+    finish, their fat entries are journaled and a done record is added; a
+    rerun skips done sources and resumes partial ones without duplicating
+    their recorded stubs. Manifest records and index compaction are batched
+    once at the end, including stubs left unregistered by an interrupted run.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    brain_root = require_brain_root()
+    source_dir = Path(args.dir)
+    if not source_dir.is_dir():
+        print(f"ERROR: Source directory not found: {source_dir}")
+        sys.exit(1)
+    types = _parse_ingest_types(args.types or "LEARN")
+    if not types:
+        print("No valid types selected. Exiting.")
+        return
+
+    done, recorded = read_ingest_journal(brain_root)
+    sources = sorted(p for p in source_dir.rglob("*") if p.is_file() and p.suffix.lower() in INGEST_SUFFIXES)
+    keys = {p: _ingest_source_key(p) for p in sources}
+    todo = [p for p in sources if keys[p] not in done]
+    resumed = sum(1 for p in todo if keys[p] in recorded)
+    print(f"Sources: {len(sources)} in {source_dir} ({len(sources) - len(todo)} already ingested, "
+          f"{len(todo)} to go" + (f", {resumed} resumed" if resumed else "") + f") — types: {', '.join(types)}")
+
+    # Build the BM25 sidecar once so workers only load it
+    cached_bm25_index(brain_root)
+
+    started = time.perf_counter()
+    totals = {"chunks": 0, "known": 0, "tokens": 0, "stubs": 0, "failed": 0}
+    jobs = [(str(brain_root), str(p), types, args.max_stubs, keys[p], recorded.get(keys[p], {})) for p in todo]
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = {pool.submit(_ingest_worker, job): Path(job[1]) for job in jobs}
+        for n, future in enumerate(as_completed(futures), 1):
+            source_path = futures[future]
+            try:
+                result = future.result()
+            except Exception as exc:  # one bad source must not stop the batch
+                totals["failed"] += 1
+                print(f"[{n}/{len(jobs)}] FAILED {source_path.name}: {exc}")
+                continue
+            created = result["created"]
+            # Stubs resumed from an earlier run are indexed (if at all) by the
+            # batch below; re-adding them here could overwrite edited entries
+            earlier = {r["id"] for r in recorded.get(keys[source_path], {}).values()}
+            journal_append(brain_root, _index_ops([c for c in created if c[1] not in earlier]))
+            ingest_journal_append(brain_root, {
+                "key": keys[source_path],
+                "source": str(source_path),
+                "files": [rel for _t, _i, rel, _p, _e, _l in created],
+                "at": datetime.datetime.now().isoformat(timespec="seconds"),
+            })
+            for key in ("chunks", "known", "tokens"):
+                totals[key] += result[key]
+            totals["stubs"] += len(created)
+            rate = result["tokens"] / result["seconds"] if result["seconds"] else 0
+            print(f"[{n}/{len(jobs)}] {source_path.name}: {result['chunks']} chunks "
+                  f"({result['known']} known), {len(created)} stubs — "
+                  f"{result['seconds']:.1f}s, {rate:,.0f} tokens/s")
+
+    # One batched manifest update + compaction for every recorded stub not yet
+    # fingerprinted (this run's, and any from an interrupted earlier run);
+    # stubs whose source never finished are indexed from their own records
+    manifest = load_manifest(brain_root)
+    done, recorded = read_ingest_journal(brain_root)
+    indexed = {e.get("id") for e in collect_all_entries(brain_root)}
+    pending, unindexed = {}, []
+    for record in [*(r for stubs in recorded.values() for r in stubs.values()), *done.values()]:
+        for rel in record.get("files", [record.get("file")]):
+            path = brain_root / rel if rel else None
+            if path and rel not in manifest and rel not in pending and path.exists():
+                pending[rel] = ("", "", rel, path, "", [])
+                if record.get("id") and record["id"] not in indexed:
+                    unindexed.append((record["type"], record["id"], rel, path, record["entry"], []))
+    if unindexed:
+        journal_append(brain_root, _index_ops(unindexed))
+    total_files = register_new_files(brain_root, list(pending.values()), journaled=True) if pending else None
+
+    elapsed = time.perf_counter() - started
+    print(f"\nIngested {len(jobs) - totals['failed']} sources ({totals['failed']} failed) in {elapsed:.1f}s "
+          f"— {(len(jobs) - totals['failed']) / elapsed if elapsed else 0:.2f} docs/sec")
+    print(f"  {totals['chunks']} chunks, ~{totals['tokens']:,} tokens: {totals['known']} already known, "
+          f"{totals['stubs']} stubs created")
+    if total_files is not None:
+        print(f"Updated {INDEX_MASTER} (total files: {total_files}) and {HASH_MANIFEST}.")
+    print("\nIMPORTANT: Stubs have [TODO] summaries — extract the knowledge, then fill them in.")
 
 
 def cmd_ingest(args):
-    """Process a source document into LTM files.
+    """Process a source document into LTM stubs.
 
     NOTE: Full AI-powered ingestion requires an LLM API call.
-    This command provides the scaffolding: reads the source, estimates size,
-    and creates stub files for manual or AI-assisted extraction.
+    This command streams the source (PDF page by page via pymupdf4llm on a
+    process pool, text block by block), chunks it on headings, and flags
+    chunks the brain already knows. The most substantial new chunks become
+    LEARN stubs with pre-filled tags, links and source location, ready for
+    manual or AI-assisted extraction. Memory stays bounded by the page
+    window and the stub count, not the source size. With --dir, a whole
+    directory is ingested in parallel (cmd_ingest_dir).
     """
+    if args.dir:
+        return cmd_ingest_dir(args)
+    if not args.source:
+        print("ERROR: Give a source file, or --dir for a directory of sources.")
+        sys.exit(1)
+
     brain_root = require_brain_root()
     source_path = Path(args.source)
 
     if not source_path.exists():
         print(f"ERROR: Source file not found: {source_path}")
         sys.exit(1)
-
-    content = read_file(source_path)
-    tokens = estimate_tokens(content)
-    lines = content.count("\n") + 1
+    if source_path.suffix.lower() == ".pdf":
+        try:
+            import pymupdf4llm  # noqa: F401
+        except ImportError:
+            print("ERROR: PDF ingestion needs pymupdf4llm (pip install pymupdf4llm).")
+            sys.exit(1)
 
     print(f"Source: {source_path.name}")
-    print(f"  Size: {len(content):,} chars, ~{lines} lines, ~{tokens:,} estimated tokens")
+    scan = scan_source(source_path, ingest_context(brain_root), args.max_stubs, args.jobs)
+    print(f"\n  {scan['chunks']} chunks, ~{scan['tokens']:,} tokens in {scan['seconds']:.1f}s: "
+          f"{scan['known']} already known, {scan['chunks'] - scan['known']} new")
     print()
 
-    if tokens > 100000:
-        print("WARNING: Source is very large. Consider splitting it into sections first.")
-        print()
-
     print("Ingestion is EXTRACTION, not storage.")
     print("A 40-page chapter should become ~5 files totaling ~300 lines.")
     print()
-    print("Recommended process:")
-    print("  1. Load this source into an LLM session")
-    print("  2. Extract knowledge relevant to YOUR project")
-    print("  3. Create typed LTM files using `brain deposit`")
-    print("  4. Each file gets its own fat index entry")
-    print()
 
-    # Ask what types of knowledge to extract
-    print("What types of knowledge should be extracted?")
-    for ft, info in FILE_TYPES.items():
-        if ft != "RESET":
-            print(f"  {ft}: {info['purpose']}")
+    if args.types:
+        types_input = args.types
+    else:
+        # Ask what types of knowledge to extract
+        print("What types of knowledge should be extracted?")
+        for ft, info in FILE_TYPES.items():
+            if ft != "RESET":
+                print(f"  {ft}: {info['purpose']}")
+        print()
+        types_input = input("Types to extract (comma-separated, default LEARN): ").strip() or "LEARN"
 
-    print()
-    types_input = input("Types to extract (comma-separated, e.g. LEARN,RULE,SPEC): ").strip()
-    if not types_input:
-        print("No types selected. Exiting.")
+    created = write_ingest_stubs(brain_root, source_path, scan, _parse_ingest_types(types_input))
+    if not created:
+        print("No stubs created.")
         return
+    for _type, _id, rel_path, _path, _entry, _links in created:
+        print(f"  Created stub: {rel_path}")
+    total_files = register_new_files(brain_root, created)
 
-    selected_types = [t.strip().upper() for t in types_input.split(",")]
-    for st in selected_types:
-        if st not in FILE_TYPES:
-            print(f"WARNING: Unknown type '{st}', skipping.")
-            continue
-
-        file_id = next_id(brain_root, st)
-        slug = re.sub(r"[^a-z0-9]+", "-", source_path.stem.lower()).strip("-")
-        filename = f"{file_id}_from-{slug}.md"
-        type_dir = brain_root / FILE_TYPES[st]["dir"]
-        file_path = type_dir / filename
-
-        template_path = brain_root / "templates" / f"TEMPLATE-{st}.md"
-        if template_path.exists():
-            tmpl_content = read_file(template_path)
-            tmpl_content = tmpl_content.replace(f"{st}-NNN", file_id)
-            tmpl_content = tmpl_content.replace("YYYY-MM-DD", TODAY)
-            tmpl_content = tmpl_content.replace("[comma-separated tags]", f"ingested, {source_path.stem}")
-        else:
-            tmpl_content = f"# {file_id}\n<!-- type: {st} -->\n<!-- created: {TODAY} -->\n<!-- source: {source_path.name} -->\n\n"
-
-        # Add source reference
-        tmpl_content += f"\n\n<!-- Ingested from: {source_path.name} ({tokens:,} tokens) -->\n"
-
-        write_file(file_path, tmpl_content)
-        print(f"  Created stub: {file_path}")
-
-    print(f"\nStub files created. Open them and extract knowledge from {source_path.name}.")
-    print("Then update INDEX-MASTER.md with fat index entries for each new file.")
+    print(f"\nStub files created and indexed (total files: {total_files if total_files is not None else '?'}).")
+    print(f"Open them and extract knowledge from {source_path.name}, then replace the [TODO] summaries.")
 
 
 # ---------------------------------------------------------------------------
@@ -1384,6 +3962,19 @@ SCHEMAS = {
 }
 
 
+# Bump when validate_file's checks change; schema_version() also hashes
+# SCHEMAS, so editing a schema invalidates cached results by itself.
+VALIDATOR_VERSION = 1
+VALIDATE_CACHE = ".validate-cache.json"
+VALIDATE_POOL_MIN = 64  # below this many uncached files, a process pool costs more than it saves
+
+
+def schema_version() -> str:
+    """Fingerprint of SCHEMAS + VALIDATOR_VERSION, the validation cache key."""
+    payload = json.dumps([VALIDATOR_VERSION, SCHEMAS], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
 def _parse_frontmatter(content: str) -> dict[str, str]:
     """Parse HTML-comment-style frontmatter: <!-- key: value -->."""
     fm = {}
@@ -1485,6 +4076,168 @@ def validate_file(file_path: Path, strict: bool = False) -> list[str]:
     return warnings
 
 
+def validate_files(
+    brain_root: Path,
+    files: list[Path],
+    full: bool = False,
+    workers: int | None = None,
+    stats: dict[Path, os.stat_result] | None = None,
+) -> tuple[dict[Path, list[str]], int]:
+    """Validate many files, reusing cached results. Returns ({path: warnings}, cached count).
+
+    Results are cached in VALIDATE_CACHE per file under its content hash and
+    schema_version(). An unchanged stat signature is trusted without reading
+    the file; otherwise the file is hashed, and only new content is
+    validated, on a process pool when there are VALIDATE_POOL_MIN or more.
+    `full` ignores the cache; `stats` reuses stat results from scan_brain().
+    """
+    cache_path = brain_root / VALIDATE_CACHE
+    version = schema_version()
+    cached_files = {}
+    if not full:
+        try:
+            cache = json.loads(cache_path.read_text(encoding="utf-8"))
+            if cache.get("schema") == version:
+                cached_files = cache.get("files", {})
+        except (OSError, ValueError):
+            pass
+
+    root_prefix = os.path.abspath(brain_root) + os.sep
+
+    def cache_key(path: Path) -> str:
+        # abspath, not resolve(): no syscalls, this runs for every file
+        absolute = os.path.abspath(path)
+        if absolute.startswith(root_prefix):
+            return absolute[len(root_prefix):].replace(os.sep, "/")
+        return absolute
+
+    results: dict[Path, list[str]] = {}
+    fresh: dict[str, dict] = {}
+    unsure = []  # (path, key, stat) whose stat signature changed
+    for path in files:
+        key = cache_key(path)
+        st = stats[path] if stats and path in stats else path.stat()
+        signature = _stat_signature(st)
+        record = cached_files.get(key)
+        if record and all(record.get(k) == v for k, v in signature.items()):
+            results[path] = record["warnings"]
+            fresh[key] = record
+        else:
+            unsure.append((path, key, signature))
+    cached = len(results)
+
+    # Touched but identical content (checkout, copy) still hits by hash
+    hashes = hash_files([path for path, _, _ in unsure], workers)
+    todo = []
+    for path, key, signature in unsure:
+        record = cached_files.get(key)
+        if record and record.get("hash") == hashes[path]:
+            results[path] = record["warnings"]
+            fresh[key] = {**record, **signature}
+            cached += 1
+        else:
+            todo.append((path, key, signature))
+
+    paths = [path for path, _, _ in todo]
+    if len(paths) >= VALIDATE_POOL_MIN and workers != 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            validated = list(pool.map(validate_file, paths, chunksize=32))
+    else:
+        validated = [validate_file(path) for path in paths]
+    for (path, key, signature), warnings in zip(todo, validated):
+        results[path] = warnings
+        fresh[key] = {"hash": hashes[path], "warnings": warnings, **signature}
+
+    # Keep entries for files outside this run (single-file validation)
+    merged = {**cached_files, **fresh} if not full else fresh
+    if todo or unsure or merged.keys() != cached_files.keys():
+        with contextlib.suppress(OSError):
+            write_file(cache_path, json.dumps({"schema": version, "files": merged}, sort_keys=True))
+    return results, cached
+
+
+def validate_graph(brain_root: Path, snapshot: dict | None = None) -> dict[str, list[str]]:
+    """Check link integrity across the whole brain in one pass.
+
+    Loads the live ID set, frontmatter links, fat-index →links/←backlinks
+    and LINK-INDEX edges into sets once, then reports:
+      dangling:   links or edges to IDs with no file
+      asymmetric: ←backlinks that don't match the →links pointing at an entry
+      drift:      frontmatter vs fat-index →links, and links vs LINK-INDEX edges
+    Returns {category: [message, ...]}.
+    """
+    snapshot = snapshot or scan_brain(brain_root)
+    live = set(snapshot["by_id"])
+
+    frontmatter: dict[str, set[str]] = {}
+    for file_id, rel in snapshot["by_id"].items():
+        if snapshot["files"][rel]["type"] == "RESET":
+            continue
+        fm = _parse_frontmatter(read_file(snapshot["files"][rel]["path"]))
+        frontmatter[file_id] = set(_parse_link_ids_from_field(fm.get("links", ""))) - {file_id}
+
+    # Sub-indexes may repeat an entry; merge its fields
+    outlinks: dict[str, set[str]] = {}
+    backlinks: dict[str, set[str]] = {}
+    for entry in collect_all_entries(brain_root):
+        entry_id = entry.get("id", "")
+        outlinks.setdefault(entry_id, set()).update(_split_link_ids(entry.get("links", "")))
+        backlinks.setdefault(entry_id, set()).update(_split_link_ids(entry.get("backlinks", "")))
+    for entry_id in outlinks:
+        outlinks[entry_id].discard(entry_id)
+
+    link_index = {(e["source"], e["target"]) for e in parse_link_index(brain_root)}
+    edges = {(src, dst) for src, dsts in frontmatter.items() for dst in dsts}
+    edges |= {(src, dst) for src, dsts in outlinks.items() for dst in dsts}
+
+    report: dict[str, list[str]] = {"dangling": [], "asymmetric": [], "drift": []}
+
+    for file_id, targets in sorted(frontmatter.items()):
+        for target in sorted(targets - live):
+            report["dangling"].append(f"{file_id} links: {target} (no such file)")
+    for entry_id, targets in sorted(outlinks.items()):
+        if entry_id not in live:
+            continue  # stale entry; `brain status` reports those
+        for target in sorted(targets - live):
+            report["dangling"].append(f"{entry_id} →{target} in fat index (no such file)")
+    for source, target in sorted(link_index):
+        dead = [i for i in (source, target) if i not in live]
+        if dead:
+            report["dangling"].append(f"LINK-INDEX {source}|{target} (no such file: {', '.join(dead)})")
+
+    expected = {target: set(sources) for target, sources in compute_backlinks(
+        [{"id": i, "links": ", ".join(sorted(t))} for i, t in outlinks.items()]
+    ).items()}
+    for entry_id in sorted(backlinks):
+        want = expected.get(entry_id, set())
+        have = backlinks[entry_id]
+        for source in sorted(want - have):
+            report["asymmetric"].append(f"{entry_id} ← missing {source} ({source} →{entry_id})")
+        for source in sorted(have - want):
+            report["asymmetric"].append(f"{entry_id} ← lists {source}, but {source} has no →{entry_id}")
+
+    for file_id in sorted(frontmatter.keys() & outlinks.keys()):
+        only_fm = frontmatter[file_id] - outlinks[file_id]
+        only_index = outlinks[file_id] - frontmatter[file_id]
+        if only_fm or only_index:
+            parts = []
+            if only_fm:
+                parts.append(f"frontmatter only: {', '.join(sorted(only_fm))}")
+            if only_index:
+                parts.append(f"fat index only: {', '.join(sorted(only_index))}")
+            report["drift"].append(f"{file_id} links vs →: " + "; ".join(parts))
+    if link_index:
+        for source, target in sorted(edges - link_index):
+            if source in live and target in live:
+                report["drift"].append(f"{source}→{target} missing from LINK-INDEX")
+        for source, target in sorted(link_index - edges):
+            if source in live and target in live:
+                report["drift"].append(f"LINK-INDEX {source}|{target} not in frontmatter or fat index")
+    return report
+
+
 def cmd_validate(args):
     """Validate brain files against type-specific schemas.
 
@@ -1495,15 +4248,39 @@ def cmd_validate(args):
     target = args.path
     strict = args.strict
 
+    if args.graph:
+        if target != "all":
+            print("ERROR: --graph checks the whole brain; drop the path argument.")
+            sys.exit(1)
+        report = validate_graph(brain_root)
+        total_issues = sum(len(issues) for issues in report.values())
+        for category, issues in report.items():
+            if issues:
+                print(f"{category.upper()} ({len(issues)}):")
+                for issue in issues:
+                    print(f"  - {issue}")
+            elif not args.quiet:
+                print(f"  OK {category}")
+        print(f"\nGraph check: {total_issues} issues "
+              f"({', '.join(f'{len(v)} {k}' for k, v in report.items())})")
+        if report["asymmetric"]:
+            print("Run `brain backlinks` to re-derive ←backlinks from →links.")
+        if strict and total_issues > 0:
+            sys.exit(1)
+        return
+
     # Collect files to validate
     files_to_check = []
+    stats = {}
     if target == "all":
-        for file_type, info in FILE_TYPES.items():
+        snapshot = scan_brain(brain_root)
+        for file_type in FILE_TYPES:
             if file_type == "RESET":
                 continue
-            type_dir = brain_root / info["dir"]
-            if type_dir.exists():
-                files_to_check.extend(type_dir.glob(f"{file_type}-*.md"))
+            for rel in snapshot["by_type"][file_type]:
+                rec = snapshot["files"][rel]
+                files_to_check.append(rec["path"])
+                stats[rec["path"]] = rec["stat"]
     else:
         target_path = Path(target)
         if not target_path.is_absolute():
@@ -1523,8 +4300,11 @@ def cmd_validate(args):
     total_warnings = 0
     files_with_warnings = 0
 
+    results, cached = validate_files(
+        brain_root, files_to_check, full=args.full, workers=args.jobs, stats=stats
+    )
     for fp in sorted(files_to_check):
-        warnings = validate_file(fp, strict)
+        warnings = results[fp]
         if warnings:
             files_with_warnings += 1
             total_warnings += len(warnings)
@@ -1535,7 +4315,7 @@ def cmd_validate(args):
             if not args.quiet:
                 print(f"  OK {fp.name}")
 
-    print(f"\nValidated {len(files_to_check)} files: "
+    print(f"\nValidated {len(files_to_check)} files ({cached} unchanged, from cache): "
           f"{files_with_warnings} with warnings, "
           f"{total_warnings} total warnings")
 
@@ -1543,6 +4323,296 @@ def cmd_validate(args):
         sys.exit(1)
 
 
+# ---------------------------------------------------------------------------
+# Daemon — `brain serve` keeps warm state behind a Unix socket
+# ---------------------------------------------------------------------------
+#
+# Each CLI run otherwise pays for imports, the index parse and the BM25
+# build. `brain serve` runs in the foreground and answers DAEMON_COMMANDS
+# for one brain: the client (brain_client.py, which owns the wire protocol
+# and routes argv before this module loads) sends {argv, cwd} as one JSON
+# message and gets {stdout, stderr, code} back. The warm state is the
+# existing stat-keyed memos (cached_bm25_index, cached_embeddings,
+# parse_link_index, file_stats), so edits made by other processes are picked
+# up on the next request. Interactive and write-heavy commands always run
+# in-process, as does everything when the daemon is down, slow to answer,
+# older than brain.py, or BRAIN_NO_DAEMON=1 is set.
+
+DAEMON_TIMEOUT = 30  # seconds a connection may take to send its request
+DAEMON_POLL = 0.5    # accept() wake-up interval, to notice a stop request
+# Commands share the process's cwd, stdout and memos: one runs at a time,
+# while each connection's I/O gets its own thread
+_DAEMON_EXEC_LOCK = threading.Lock()
+_DAEMON_PARSER: dict[str, argparse.ArgumentParser] = {}  # built once: ~5 ms per request otherwise
+
+
+def _daemon_request(request: dict) -> dict:
+    """Run one client command in this process, capturing its output and exit code."""
+    global TODAY
+    TODAY = datetime.date.today().isoformat()  # the daemon outlives the day it started
+    out, err = io.StringIO(), io.StringIO()
+    code = 0
+    cwd = os.getcwd()
+    try:
+        os.chdir(request["cwd"])
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            if "cli" not in _DAEMON_PARSER:
+                _DAEMON_PARSER["cli"] = build_parser()
+            args = _DAEMON_PARSER["cli"].parse_args(request["argv"])
+            if args.command not in DAEMON_COMMANDS or args.profile or args.profile_memory:
+                return {"code": None}
+            run_command(args)
+    except SystemExit as exc:
+        if isinstance(exc.code, str):
+            err.write(exc.code + "\n")
+        code = exc.code if isinstance(exc.code, int) else int(exc.code is not None)
+    except Exception:
+        err.write(traceback.format_exc())
+        code = 1
+    finally:
+        os.chdir(cwd)
+    return {"stdout": out.getvalue(), "stderr": err.getvalue(), "code": code}
+
+
+def warm_brain(brain_root: Path) -> int:
+    """Load everything the daemon keeps resident; returns the entry count."""
+    entries, _ = cached_bm25_index(brain_root)
+    cached_embeddings(brain_root, entries)
+    parse_link_index(brain_root)
+    file_stats(brain_root)
+    return len(entries)
+
+
+def _daemon_reply(request, retire) -> dict:
+    """The reply to one decoded request; calls `retire()` to stop the daemon."""
+    if not isinstance(request, dict):
+        return {"error": "request must be a JSON object"}
+    if request.get("stop"):
+        retire()
+        return {}
+    if request.get("ping"):
+        return {}
+    if not isinstance(request.get("cwd"), str) or not (
+        isinstance(request.get("argv"), list) and all(isinstance(a, str) for a in request["argv"])
+    ):
+        return {"error": "request needs argv (list of strings) and cwd (string)"}
+    with _DAEMON_EXEC_LOCK:
+        return _daemon_request(request)
+
+
+def _daemon_connection(conn: socket.socket, reply_for):
+    """Serve one client connection on its own thread; never raises."""
+    try:
+        with conn:
+            conn.settimeout(DAEMON_TIMEOUT)
+            try:
+                request = recv_message(conn)
+            except ValueError:
+                request = None
+            conn.sendall(json.dumps(reply_for(request)).encode("utf-8"))
+    except OSError:
+        pass  # the client timed out or went away
+    except Exception as exc:  # one bad connection must not stop the daemon
+        print(f"WARN: dropped a connection: {exc!r}", file=sys.__stderr__, flush=True)
+
+
+def cmd_serve(args):
+    """Serve DAEMON_COMMANDS for this brain from warm state until stopped."""
+    brain_root = require_brain_root()
+    path = Path(daemon_socket_path(brain_root))
+
+    if args.stop:
+        if daemon_call(path, {"stop": True}, timeout=DAEMON_TIMEOUT) is None:
+            print(f"No daemon running on {path}.")
+        else:
+            print(f"Stopped the daemon on {path}.")
+        return
+
+    if not hasattr(socket, "AF_UNIX"):
+        print("ERROR: `brain serve` needs Unix domain sockets, which this platform lacks.")
+        sys.exit(1)
+    if daemon_call(path, {"ping": True}) is not None:
+        print(f"ERROR: A daemon is already serving {brain_root} on {path}.")
+        sys.exit(1)
+    with contextlib.suppress(FileNotFoundError):
+        path.unlink()  # left behind by a daemon that was killed
+
+    started = time.perf_counter()
+    entries = warm_brain(brain_root)
+    sources = {p: p.stat().st_mtime_ns for p in (Path(__file__).resolve(), Path(brain_client.__file__).resolve())}
+    stopping = threading.Event()
+
+    def reply_for(request) -> dict:
+        if isinstance(request, dict) and "argv" in request and any(
+            p.stat().st_mtime_ns != mtime for p, mtime in sources.items()
+        ):
+            # The code changed under us: hand back and retire
+            stopping.set()
+            return {"code": None}
+        return _daemon_reply(request, stopping.set)
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))  # `kill` cleans up the socket too
+    try:
+        server.bind(str(path))
+        os.chmod(path, 0o600)
+        server.listen()
+        server.settimeout(DAEMON_POLL)
+        print(f"Serving {brain_root} on {path}: {entries} entries warm in "
+              f"{(time.perf_counter() - started) * 1e3:.0f} ms. Stop with Ctrl-C or `brain serve --stop`.",
+              flush=True)
+        with contextlib.suppress(KeyboardInterrupt):
+            while not stopping.is_set():
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    continue
+                threading.Thread(target=_daemon_connection, args=(conn, reply_for), daemon=True).start()
+    finally:
+        server.close()
+        with contextlib.suppress(FileNotFoundError):
+            path.unlink()
+    with _DAEMON_EXEC_LOCK:
+        pass  # let a command in flight finish writing its reply
+    print("Daemon stopped.")
+
+
+# ---------------------------------------------------------------------------
+# Profiling — per-stage memory (tracemalloc) and CPU (cProfile) reports
+# ---------------------------------------------------------------------------
+#
+# Memory profiling is enabled by `--profile-memory` on any command, or
+# BRAIN_PROFILE_MEMORY=1 for the MCP server, where the per-stage totals make
+# slow leaks visible over hours. `--profile` runs any command under
+# cProfile instead.
+
+MEMORY_TOP_ALLOCATORS = 10
+MEMORY_TRACE_FRAMES = 1
+_MEMORY_PROFILE: dict | None = None
+
+
+def start_memory_profile():
+    """Start tracemalloc and per-stage accounting (idempotent)."""
+    global _MEMORY_PROFILE
+    import tracemalloc
+
+    if _MEMORY_PROFILE is not None:
+        return
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(MEMORY_TRACE_FRAMES)
+    _MEMORY_PROFILE = {"stages": {}, "depth": 0, "baseline": _memory_snapshot(), "started": time.time()}
+
+
+def _memory_snapshot():
+    import tracemalloc
+
+    return tracemalloc.take_snapshot()
+
+
+def _allocator_stats(stats: list) -> list:
+    """Drop tracemalloc's own bookkeeping from snapshot statistics."""
+    import tracemalloc
+
+    return [stat for stat in stats if stat.traceback[0].filename != tracemalloc.__file__]
+
+
+def peak_rss_bytes() -> int | None:
+    """Peak resident set size of this process, or None where unsupported."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@contextlib.contextmanager
+def _memory_stage(name: str):
+    """Account the memory a pipeline stage allocates and retains.
+
+    Stages don't nest: an inner stage is folded into the enclosing one.
+    Per stage name: calls, bytes retained in total (steady growth across
+    calls suggests a leak), largest peak above the starting level, and the
+    source lines that allocated the most in its last run.
+    """
+    profile = _MEMORY_PROFILE
+    if profile["depth"]:
+        yield
+        return
+    import tracemalloc
+
+    profile["depth"] += 1
+    before = _memory_snapshot()
+    tracemalloc.reset_peak()
+    start, _ = tracemalloc.get_traced_memory()
+    try:
+        yield
+    finally:
+        current, peak = tracemalloc.get_traced_memory()
+        growth = _allocator_stats(_memory_snapshot().compare_to(before, "lineno"))
+        stage = profile["stages"].setdefault(name, {"calls": 0, "retained": 0, "peak": 0, "top": []})
+        stage["calls"] += 1
+        stage["retained"] += current - start
+        stage["peak"] = max(stage["peak"], peak - start)
+        stage["top"] = [
+            (_allocator_label(stat.traceback), stat.size_diff, stat.count_diff)
+            for stat in growth[:MEMORY_TOP_ALLOCATORS] if stat.size_diff > 0
+        ]
+        profile["depth"] -= 1
+
+
+def _allocator_label(traceback) -> str:
+    frame = traceback[0]
+    return f"{Path(frame.filename).name}:{frame.lineno}"
+
+
+PROFILE_TOP_FUNCTIONS = 25
+
+
+def cpu_profile_report(profiler, top: int = PROFILE_TOP_FUNCTIONS) -> str:
+    """Top functions of a cProfile run by cumulative time."""
+    import pstats
+
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).strip_dirs().sort_stats("cumulative").print_stats(top)
+    return "CPU profile (cumulative)\n" + out.getvalue().strip("\n")
+
+
+def memory_report() -> str:
+    """Per-stage table, top allocators still alive, growth since start, peak RSS."""
+    profile = _MEMORY_PROFILE
+    if profile is None:
+        return "Memory profiling is off (use --profile-memory, or BRAIN_PROFILE_MEMORY=1 for the MCP server)."
+    import tracemalloc
+
+    def mb(n: int) -> str:
+        return f"{n / 1e6:,.2f} MB"
+
+    current, peak = tracemalloc.get_traced_memory()
+    rss = peak_rss_bytes()
+    snapshot = _memory_snapshot()
+    lines = [
+        "Memory profile",
+        f"  traced now: {mb(current)}   traced peak (last stage): {mb(peak)}"
+        + (f"   peak RSS: {mb(rss)}" if rss is not None else ""),
+        f"  profiling for {time.time() - profile['started']:.0f}s",
+        "",
+        f"  {'Stage':<14} {'Calls':>6} {'Retained':>12} {'Peak':>12}  Top allocator (last run)",
+    ]
+    for name, stage in profile["stages"].items():
+        top = f"{stage['top'][0][0]} +{mb(stage['top'][0][1])}" if stage["top"] else "-"
+        lines.append(f"  {name:<14} {stage['calls']:>6} {mb(stage['retained']):>12} {mb(stage['peak']):>12}  {top}")
+    lines += ["", f"  Top {MEMORY_TOP_ALLOCATORS} live allocators:"]
+    for stat in _allocator_stats(snapshot.statistics("lineno"))[:MEMORY_TOP_ALLOCATORS]:
+        lines.append(f"    {_allocator_label(stat.traceback):<32} {mb(stat.size):>12}  {stat.count:>8,} blocks")
+    lines += ["", "  Growth since profiling started:"]
+    for stat in _allocator_stats(snapshot.compare_to(profile["baseline"], "lineno"))[:MEMORY_TOP_ALLOCATORS]:
+        if stat.size_diff > 0:
+            lines.append(f"    {_allocator_label(stat.traceback):<32} +{mb(stat.size_diff):>11}  "
+                         f"{stat.count_diff:>+8,} blocks")
+    return "\n".join(lines)
+
+
 # ---------------------------------------------------------------------------
 # CLI Argument Parser
 # ---------------------------------------------------------------------------
@@ -1561,44 +4631,93 @@ def build_parser() -> argparse.ArgumentParser:
 
     # deposit
     p_dep = subparsers.add_parser("deposit", help="Add a new knowledge file")
-    p_dep.add_argument("--type", "-t", required=True, help="File type (SPEC, CODE, RULE, LEARN, LOG)")
-    p_dep.add_argument("--tags", required=True, help="Comma-separated tags")
+    p_dep.add_argument("--type", "-t", help="File type (SPEC, CODE, RULE, LEARN, LOG)")
+    p_dep.add_argument("--tags", help="Comma-separated tags")
+    p_dep.add_argument("--from", dest="from_file", metavar="JSONL",
+                       help="Bulk, non-interactive: one JSON entry per line ('-' for stdin)")
+    p_dep.add_argument("--suggest-links", type=int, default=LINK_SUGGESTIONS_DEFAULT, metavar="K",
+                       help=f"Propose the K most similar entries as →links (default {LINK_SUGGESTIONS_DEFAULT}; 0 disables)")
+    p_dep.add_argument("--accept-links", action="store_true",
+                       help="Write the suggested links into files without links (default: only print them)")
+    p_dep.add_argument("--allow-near-duplicates", action="store_true",
+                       help="With --from: deposit records even if near-duplicates of existing files")
 
     # search
     p_search = subparsers.add_parser("search", help="Search fat indexes")
     p_search.add_argument("query", help="Search query (tags, keywords)")
+    p_search.add_argument("--hybrid", action="store_true",
+                          help="Fuse BM25 with the vector cache from `reindex --vectors`")
+    p_search.add_argument("--explain", action="store_true",
+                          help="Break down each top result's score and time each pipeline stage")
 
     # recall
     p_recall = subparsers.add_parser("recall", help="Generate a RESET file for a task")
     p_recall.add_argument("task", help="Task description")
+    p_recall.add_argument("--budget", "-b", type=int, default=None, metavar="N",
+                          help="Pack the most relevant context into N tokens (incl. the RESET file)")
+    p_recall.add_argument("--sections", action="store_true",
+                          help="With --budget: pack individual ## sections, not just whole files")
+    p_recall.add_argument("--hybrid", action="store_true",
+                          help="Fuse BM25 with the vector cache from `reindex --vectors`")
+    p_recall.add_argument("--explain", action="store_true",
+                          help="Break down each top result's score and time each pipeline stage")
 
     # status
-    subparsers.add_parser("status", help="Project overview and health check")
+    p_status = subparsers.add_parser("status", help="Project overview and health check")
+    p_status.add_argument("--full", action="store_true", help="Re-hash every file instead of trusting the stat cache")
+    p_status.add_argument("--jobs", "-j", type=int, default=None, help="Hashing threads (default: auto)")
 
     # reindex
-    subparsers.add_parser("reindex", help="Rebuild content hash manifest from all brain files")
+    p_reindex = subparsers.add_parser("reindex", help="Rebuild content hash manifest from all brain files")
+    p_reindex.add_argument("--full", action="store_true", help="Re-hash every file instead of trusting the stat cache")
+    p_reindex.add_argument("--jobs", "-j", type=int, default=None, help="Hashing threads (default: auto)")
+    p_reindex.add_argument("--vectors", action="store_true",
+                           help="Also build the embedding cache used by search/recall --hybrid")
+
+    # compact
+    p_compact = subparsers.add_parser("compact", help="Fold the index journal into INDEX-MASTER.md")
+    p_compact.add_argument("--quiet", "-q", action="store_true", help="No output (used by auto-compaction)")
+
+    # backlinks
+    p_back = subparsers.add_parser("backlinks", help="Rebuild derived backlinks in fat indexes")
+    p_back.add_argument("ids", nargs="*", help="Only update these entries (e.g. S000 LEARN-044); default: all")
+    p_back.add_argument("--dry-run", action="store_true", help="Report changes without writing")
 
     # ingest
     p_ingest = subparsers.add_parser("ingest", help="Process source material into LTM files")
-    p_ingest.add_argument("source", help="Path to source file")
+    p_ingest.add_argument("source", nargs="?", help="Path to source file (markdown/text or PDF)")
+    p_ingest.add_argument("--dir", help="Ingest every source under this directory in parallel (resumable)")
+    p_ingest.add_argument("--types", help="Comma-separated types to extract, e.g. LEARN,RULE (default: ask; LEARN with --dir)")
+    p_ingest.add_argument("--jobs", "-j", type=int, default=None,
+                          help="Worker processes: PDF pages, or documents with --dir (default: CPU count)")
+    p_ingest.add_argument("--max-stubs", type=int, default=INGEST_MAX_STUBS,
+                          help=f"LEARN stubs to create from new chunks (default {INGEST_MAX_STUBS})")
+
+    # serve
+    p_serve = subparsers.add_parser("serve", help="Keep indexes warm and answer search/status/validate")
+    p_serve.add_argument("--stop", action="store_true", help="Stop the daemon serving this brain")
 
     # validate
     p_validate = subparsers.add_parser("validate", help="Validate brain files against schemas")
     p_validate.add_argument("path", nargs="?", default="all", help="File path, directory, or 'all' (default: all)")
     p_validate.add_argument("--strict", action="store_true", help="Exit with error code on validation failures")
     p_validate.add_argument("--quiet", "-q", action="store_true", help="Only show files with warnings")
+    p_validate.add_argument("--full", action="store_true", help="Re-validate every file, ignoring the cache")
+    p_validate.add_argument("--graph", action="store_true",
+                            help="Check link integrity: dangling links, asymmetric backlinks, frontmatter/index/LINK-INDEX drift")
+    p_validate.add_argument("--jobs", "-j", type=int, default=None, help="Validation processes (default: auto)")
+
+    # Shared by every command
+    for p_cmd in subparsers.choices.values():
+        p_cmd.add_argument("--profile-memory", action="store_true",
+                           help="Trace allocations per pipeline stage; print top allocators and peak RSS")
+        p_cmd.add_argument("--profile", action="store_true",
+                           help=f"Run under cProfile; print the top {PROFILE_TOP_FUNCTIONS} functions by cumulative time")
 
     return parser
 
 
-def main():
-    parser = build_parser()
-    args = parser.parse_args()
-
-    if not args.command:
-        parser.print_help()
-        sys.exit(0)
-
+def run_command(args):
     commands = {
         "init": cmd_init,
         "deposit": cmd_deposit,
@@ -1606,12 +4725,40 @@ def main():
         "recall": cmd_recall,
         "status": cmd_status,
         "reindex": cmd_reindex,
+        "compact": cmd_compact,
+        "backlinks": cmd_backlinks,
         "ingest": cmd_ingest,
         "validate": cmd_validate,
+        "serve": cmd_serve,
     }
-
     commands[args.command](args)
 
 
+def main():
+    parser = build_parser()
+    args = parser.parse_args()
+
+    if not args.command:
+        parser.print_help()
+        sys.exit(0)
+
+    if args.profile_memory:
+        start_memory_profile()
+    profiler = None
+    if args.profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        run_command(args)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            print("\n" + cpu_profile_report(profiler))
+        if args.profile_memory:
+            print("\n" + memory_report())
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+brain_client.py — thin client for `brain serve`
+The `brain` entry point. Read-only commands (search, status, validate) are
+handed to a running daemon over its Unix socket before brain.py is
+imported, so a hook pays for this module and one round trip instead of
+loading the whole CLI. Anything else — or any failure to get a reply in
+time — falls through to brain.main() in-process. Because a late daemon
+reply is answered again in-process, only commands that are safe to run
+twice are routed: recall (which writes a RESET file) and every other
+writer always run in-process.
+
+Standard library only, and nothing that brain.py builds at import time:
+paths are plain os.path strings (pathlib pulls in re/fnmatch/urllib) and
+hashlib/tempfile load only for over-long socket paths. What remains of a
+routed run is interpreter startup, which this module cannot shrink; hooks
+that want the floor can run it as `python -S brain_client.py`, since
+site-packages is only needed — and added back — for the in-process path.
+"""
+
+import json
+import os
+import socket
+import sys
+
+# Mirrors brain.py's brain layout; duplicated so this module stays import-light
+BRAIN_DIR_NAME = "project-brain"
+INDEX_MASTER = "knowledge/indexes/INDEX-MASTER.md"
+
+DAEMON_SOCKET = ".brain.sock"
+DAEMON_COMMANDS = {"search", "status", "validate"}  # read-only: a timed-out one may rerun
+DAEMON_CONNECT_TIMEOUT = 0.5  # seconds to reach the daemon before running in-process
+DAEMON_REPLY_TIMEOUT = 2.0    # seconds to wait for its answer before running in-process
+_SOCKET_PATH_MAX = 100        # sun_path is 104-108 bytes depending on the OS
+
+
+def find_brain_root(start: str | None = None) -> str | None:
+    """Same walk as brain.find_brain_root(), on os.path strings."""
+    parent = os.path.abspath(start or os.getcwd())
+    while True:
+        candidate = os.path.join(parent, BRAIN_DIR_NAME)
+        if os.path.isdir(candidate) and os.path.exists(os.path.join(candidate, INDEX_MASTER)):
+            return candidate
+        if os.path.basename(parent) == BRAIN_DIR_NAME and os.path.exists(os.path.join(parent, INDEX_MASTER)):
+            return parent
+        if os.path.dirname(parent) == parent:
+            return None
+        parent = os.path.dirname(parent)
+
+
+def daemon_socket_path(brain_root) -> str:
+    """The daemon's socket: in the brain root, or the temp dir if that path is too long."""
+    root = os.path.realpath(brain_root)
+    path = os.path.join(root, DAEMON_SOCKET)
+    if len(path.encode()) <= _SOCKET_PATH_MAX:
+        return path
+    import hashlib
+    import tempfile
+
+    digest = hashlib.sha1(root.encode()).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"brain-{digest}.sock")
+
+
+def recv_message(conn: socket.socket):
+    """Read one JSON message: everything until the peer shuts down its side."""
+    chunks = []
+    while chunk := conn.recv(65536):
+        chunks.append(chunk)
+    return json.loads(b"".join(chunks).decode("utf-8"))
+
+
+def daemon_call(path, request: dict, timeout: float = DAEMON_REPLY_TIMEOUT) -> dict | None:
+    """Send one request to the daemon at `path`.
+
+    None if it can't be reached within DAEMON_CONNECT_TIMEOUT, doesn't
+    answer within `timeout`, or answers with something other than an object.
+    """
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(path):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.settimeout(DAEMON_CONNECT_TIMEOUT)
+            conn.connect(os.fspath(path))
+            conn.settimeout(timeout)
+            conn.sendall(json.dumps(request).encode("utf-8"))
+            conn.shutdown(socket.SHUT_WR)
+            reply = recv_message(conn)
+    except (OSError, ValueError):
+        return None
+    return reply if isinstance(reply, dict) else None
+
+
+def run_via_daemon(argv: list[str]) -> int | None:
+    """Run a CLI command on the daemon for the brain above cwd.
+
+    Returns its exit code, or None when the command must run in-process:
+    not a DAEMON_COMMANDS command, profiled (profiling measures this
+    process), BRAIN_NO_DAEMON=1, or no daemon answering in time.
+    """
+    if os.environ.get("BRAIN_NO_DAEMON", "").lower() in ("1", "true", "yes"):
+        return None
+    if not argv or argv[0] not in DAEMON_COMMANDS or any(a.startswith("--profile") for a in argv):
+        return None
+    brain_root = find_brain_root()
+    if brain_root is None:
+        return None
+    reply = daemon_call(daemon_socket_path(brain_root), {"argv": argv, "cwd": os.getcwd()})
+    if reply is None or not isinstance(reply.get("code"), int):
+        return None
+    sys.stdout.write(reply.get("stdout", ""))
+    sys.stderr.write(reply.get("stderr", ""))
+    return reply["code"]
+
+
+def main():
+    code = run_via_daemon(sys.argv[1:])
+    if code is not None:
+        sys.exit(code)
+    if sys.flags.no_site:  # launched with -S for a fast daemon path
+        import site
+
+        site.main()
+    import brain
+
+    brain.main()
+
+
+if __name__ == "__main__":
+    main()